@@ -0,0 +1,50 @@
+#version 330 core
+out vec4 FragColor;
+
+in vec3 TexCoord;
+in vec3 Normal;
+in vec3 FragPos;
+
+uniform sampler2DArray bodyTextures;
+
+layout (std140) uniform FrameData // Shared per-frame data, see rendering/shaderProgram.FrameUniforms
+{
+    mat4 projection;
+    mat4 view;
+    vec4 viewPos;        // Camera position (xyz)
+    vec4 lightDirection; // Direction TO the light source, normalized (xyz)
+    vec4 lightColor;     // Color of the light (rgb)
+};
+
+uniform float ambientStrength;
+uniform float diffuseStrength;
+uniform float specularStrength;
+uniform float shininess;
+
+void main()
+{
+    // Texture sampling
+    vec4 texColor = texture(bodyTextures, TexCoord);
+
+    // Normalize interpolated normal
+    vec3 norm = normalize(Normal);
+    
+    // Light direction (from fragment to light source)
+    vec3 lightDir = normalize(lightDirection.xyz); 
+
+    // 1. Ambient lighting
+    vec3 ambient = ambientStrength * lightColor.rgb * texColor.rgb;
+
+    // 2. Diffuse lighting
+    float diff = max(dot(norm, lightDir), 0.0);
+    vec3 diffuse = diff * lightColor.rgb * texColor.rgb;
+
+    // 3. Specular lighting
+    vec3 viewDir = normalize(viewPos.xyz - FragPos);
+    vec3 reflectDir = reflect(-lightDir, norm); // Reflect light direction
+    float spec = pow(max(dot(viewDir, reflectDir), 0.0), shininess);
+    vec3 specular = specularStrength * spec * lightColor.rgb * texColor.rgb;
+
+    // Final result
+    FragColor = vec4(ambient + diffuse + specular, texColor.a);
+}
\ No newline at end of file
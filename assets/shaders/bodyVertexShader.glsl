@@ -0,0 +1,31 @@
+#version 330 core
+layout (location = 0) in vec3 aPos;
+layout (location = 1) in vec2 aTexCoord;
+layout (location = 2) in vec3 aNormal;
+// Per instance (one per body), see rendering/bodyRenderer.py
+layout (location = 3) in mat4 aModel; // Occupies locations 3-6
+layout (location = 7) in float aLayer; // Layer of the body's texture in the texture array
+
+out vec3 TexCoord; // (u, v, layer)
+out vec3 Normal;
+out vec3 FragPos;
+
+layout (std140) uniform FrameData // Shared per-frame data, see rendering/shaderProgram.FrameUniforms
+{
+    mat4 projection;
+    mat4 view;
+    vec4 viewPos;        // Camera position (xyz)
+    vec4 lightDirection; // Direction TO the light source, normalized (xyz)
+    vec4 lightColor;     // Color of the light (rgb)
+};
+
+void main()
+{
+    FragPos = vec3(aModel * vec4(aPos, 1.0));
+    // Instance models are a translation and a uniform scale, so the normal matrix is mat3(model)
+    // up to a scale factor that the fragment shader normalizes away
+    Normal = mat3(aModel) * aNormal;
+
+    gl_Position = projection * view * vec4(FragPos, 1.0);
+    TexCoord = vec3(aTexCoord, aLayer);
+}
@@ -0,0 +1,13 @@
+#version 330 core
+in vec3 Color;
+
+out vec4 FragColor;
+
+void main()
+{
+    // Round sprite with a soft edge
+    float distance = length(gl_PointCoord - vec2(0.5)) * 2.0;
+    if (distance > 1.0)
+        discard;
+    FragColor = vec4(Color, 1.0 - smoothstep(0.5, 1.0, distance));
+}
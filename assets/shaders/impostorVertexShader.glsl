@@ -0,0 +1,25 @@
+#version 330 core
+layout (location = 0) in vec3 aPos;
+layout (location = 1) in float aLayer; // Layer of the body's texture in the texture array
+
+out vec3 Color;
+
+uniform sampler2DArray bodyTextures;
+uniform float pointSize; // Pixels
+
+layout (std140) uniform FrameData // Shared per-frame data, see rendering/shaderProgram.FrameUniforms
+{
+    mat4 projection;
+    mat4 view;
+    vec4 viewPos;        // Camera position (xyz)
+    vec4 lightDirection; // Direction TO the light source, normalized (xyz)
+    vec4 lightColor;     // Color of the light (rgb)
+};
+
+void main()
+{
+    // The LOD is clamped to the last mip level, 1x1: the texture's average color
+    Color = textureLod(bodyTextures, vec3(0.5, 0.5, aLayer), 32.0).rgb * lightColor.rgb;
+    gl_Position = projection * view * vec4(aPos, 1.0);
+    gl_PointSize = pointSize;
+}
@@ -0,0 +1,10 @@
+#version 330 core
+uniform vec3 orbitColor;
+uniform float orbitOpacity;
+
+out vec4 FragColor;
+
+void main()
+{
+    FragColor = vec4(orbitColor, orbitOpacity);
+}
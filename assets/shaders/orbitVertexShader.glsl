@@ -0,0 +1,16 @@
+#version 330 core
+layout (location = 0) in vec3 aPos;
+
+layout (std140) uniform FrameData // Shared per-frame data, see rendering/shaderProgram.FrameUniforms
+{
+    mat4 projection;
+    mat4 view;
+    vec4 viewPos;        // Camera position (xyz)
+    vec4 lightDirection; // Direction TO the light source, normalized (xyz)
+    vec4 lightColor;     // Color of the light (rgb)
+};
+
+void main()
+{
+    gl_Position = projection * view * vec4(aPos, 1.0);
+}
@@ -0,0 +1,12 @@
+#version 330 core
+in float Fade;
+
+uniform vec3 trailColor;
+uniform float trailOpacity;
+
+out vec4 FragColor;
+
+void main()
+{
+    FragColor = vec4(trailColor, trailOpacity * Fade);
+}
@@ -0,0 +1,28 @@
+#version 330 core
+layout (location = 0) in vec3 aPos;
+
+// The trail buffer is slot-major: vertex (slot * numBodies + body), see rendering/trailRenderer.py
+uniform int numBodies;
+uniform int trailLength; // Slots in the ring
+uniform int head;        // Slot holding the newest point
+uniform int count;       // Slots filled so far
+
+layout (std140) uniform FrameData // Shared per-frame data, see rendering/shaderProgram.FrameUniforms
+{
+    mat4 projection;
+    mat4 view;
+    vec4 viewPos;        // Camera position (xyz)
+    vec4 lightDirection; // Direction TO the light source, normalized (xyz)
+    vec4 lightColor;     // Color of the light (rgb)
+};
+
+out float Fade;
+
+void main()
+{
+    int slot = gl_VertexID / numBodies;
+    int age = (head - slot + trailLength) % trailLength; // 0 for the newest point
+    Fade = 1.0 - float(age) / float(max(count, 1));
+
+    gl_Position = projection * view * vec4(aPos, 1.0);
+}
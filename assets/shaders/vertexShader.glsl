@@ -8,13 +8,21 @@ out vec3 Normal;
 out vec3 FragPos;
 
 uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
+uniform mat3 normalMatrix; // transpose(inverse(mat3(model))), computed on the CPU once per draw
+
+layout (std140) uniform FrameData // Shared per-frame data, see rendering/shaderProgram.FrameUniforms
+{
+    mat4 projection;
+    mat4 view;
+    vec4 viewPos;        // Camera position (xyz)
+    vec4 lightDirection; // Direction TO the light source, normalized (xyz)
+    vec4 lightColor;     // Color of the light (rgb)
+};
 
 void main()
 {
     FragPos = vec3(model * vec4(aPos, 1.0));
-    Normal = mat3(transpose(inverse(model))) * aNormal; // Transform normal to world space
+    Normal = normalMatrix * aNormal; // Transform normal to world space
     
     gl_Position = projection * view * vec4(FragPos, 1.0); // Use FragPos (world space) here
     TexCoord = aTexCoord;
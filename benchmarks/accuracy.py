@@ -0,0 +1,202 @@
+# benchmarks/accuracy.py
+#
+# Accuracy vs throughput of every integrator and step size, against the JPL ephemeris:
+#   python -m benchmarks.accuracy --dt 6h 1d 4d --years 1 10 40 --out results.json
+# Compares against benchmarks/baselines.json (exit status 1 on a regression, 2 when there is no
+# baseline to compare with); --update-baselines stores the current results there instead, and
+# --no-compare only measures. Horizons must stay inside the kernel's span (de432s: 1950-2050).
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+
+from config import GRAVITATIONAL_CONSTANT, BODY_CATALOG
+from physics.integrators import INTEGRATORS
+from physics.nBodySimulator import NBodySimulator
+from physics.run import SECONDS_PER_UNIT, parseDuration
+
+DEFAULT_BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+def totalEnergy(positions, velocities, masses):
+    kinetic = 0.5 * np.sum(masses * np.einsum('ij,ij->i', velocities, velocities))
+    i, j = np.triu_indices(len(masses), k=1)
+    distances = np.linalg.norm(positions[i] - positions[j], axis=1)
+    return kinetic - GRAVITATIONAL_CONSTANT * np.sum(masses[i] * masses[j] / distances)
+
+class EphemerisReference:
+    """
+    Barycentric states of the catalog bodies from the ephemeris, at the start epoch plus any
+    number of simulated seconds (through the on-disk ephemeris cache, so reruns are cheap).
+    Every body, the Sun included, starts from its ephemeris state so the comparison is fair.
+    """
+    def __init__(self, catalog, epoch, ephemeris=None):
+        self.catalog = catalog
+        self.epoch = epoch
+        self.ephemeris = ephemeris or catalog.ephemeris # Kernel name or path to a local .bsp file
+        self.ephemerisNames = [name.lower() for name in catalog.names]
+
+    def statesAt(self, seconds):
+        from astropy.time import TimeDelta
+        from entities.ephemerisCache import getBodyStates
+        return getBodyStates(self.ephemerisNames, self.epoch + TimeDelta(seconds, format="sec"), self.ephemeris)
+
+    def bodiesAt(self, seconds):
+        from entities.bodyStore import BodyStore
+        positions, velocities = self.statesAt(seconds)
+        return BodyStore(self.catalog.names, self.catalog.masses, self.catalog.radii, positions, velocities,
+                         self.catalog.texturePaths, self.catalog.flags).bodies
+
+def benchmarkIntegrator(reference, integrator, dt, horizonsYears, log=sys.stderr):
+    """
+    Runs one integrator at step `dt` through each horizon in turn (one continuous run) and
+    returns a result per horizon: timing, and position errors against the ephemeris.
+    """
+    simulator = NBodySimulator(reference.bodiesAt(0.0), dt, integrator=integrator)
+    initialEnergy = totalEnergy(simulator.positions, simulator.velocities, simulator.masses)
+    results = []
+    stepsDone = 0
+    wallTime = 0.0
+    for years in sorted(horizonsYears):
+        targetSteps = max(1, round(years * SECONDS_PER_UNIT["y"] / dt))
+        started = time.perf_counter()
+        for _ in range(targetSteps - stepsDone):
+            simulator.update()
+        wallTime += time.perf_counter() - started
+        stepsDone = targetSteps
+
+        # Compare at the exact simulated time reached, not the nominal horizon
+        referencePositions, _ = reference.statesAt(simulator.time)
+        errors = np.linalg.norm(simulator.positions - referencePositions, axis=1) / 1000.0 # km
+        energy = totalEnergy(simulator.positions, simulator.velocities, simulator.masses)
+        results.append({
+            "years": years,
+            "simulated_seconds": simulator.time,
+            "steps": stepsDone,
+            "wall_time": wallTime,
+            "steps_per_second": stepsDone / max(wallTime, 1e-9),
+            "max_error_km": float(errors.max()),
+            "median_error_km": float(np.median(errors)),
+            "errors_km": dict(zip(reference.catalog.names, errors.tolist())),
+            "relative_energy_error": float(abs((energy - initialEnergy) / initialEnergy)),
+        })
+        print(f"  {simulator.integrator.name:>15} dt={dt:>9.0f}s {years:>6g}y: {results[-1]['steps_per_second']:9.0f} steps/s, "
+              f"max error {results[-1]['max_error_km']:.3e} km", file=log)
+    simulator.close()
+    return results
+
+def baselineKey(integrator, dt, years):
+    return f"{integrator}@{dt:g}s@{years:g}y"
+
+def flattenResults(report):
+    return {baselineKey(run["integrator"], run["dt"], horizon["years"]): horizon
+            for run in report["runs"] for horizon in run["horizons"]}
+
+def compareWithBaselines(report, baselines, speedTolerance, errorTolerance):
+    """
+    Regressions of `report` against stored `baselines` (same layout): throughput lower by more
+    than `speedTolerance` or maximum position error larger by more than `errorTolerance`
+    (both fractions). Returns a list of human-readable messages.
+    """
+    current = flattenResults(report)
+    regressions = []
+    for key, baseline in flattenResults(baselines).items():
+        result = current.get(key)
+        if result is None:
+            continue
+        if result["steps_per_second"] < baseline["steps_per_second"] * (1.0 - speedTolerance):
+            regressions.append(f"{key}: {result['steps_per_second']:.0f} steps/s, baseline {baseline['steps_per_second']:.0f}")
+        if result["max_error_km"] > baseline["max_error_km"] * (1.0 + errorTolerance):
+            regressions.append(f"{key}: max error {result['max_error_km']:.3e} km, baseline {baseline['max_error_km']:.3e}")
+    return regressions
+
+def missingBaselines(report, baselines):
+    # Keys of `report` results that `baselines` has nothing to compare with
+    stored = flattenResults(baselines)
+    return [key for key in flattenResults(report) if key not in stored]
+
+def ephemerisName(ephemeris):
+    # 'de432s' for both 'de432s' and a local kernel file such as /data/de432s.bsp
+    return os.path.splitext(os.path.basename(ephemeris))[0].lower()
+
+def buildArgumentParser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.accuracy",
+                                     description="Benchmark integrators for speed and accuracy against the JPL ephemeris.")
+    parser.add_argument("--integrators", nargs="+", default=list(INTEGRATORS), help="Integrators to run (default: all)")
+    parser.add_argument("--dt", nargs="+", type=parseDuration, default=[parseDuration(text) for text in ("6h", "1d", "4d")],
+                        help="Step sizes (default 6h 1d 4d)")
+    parser.add_argument("--years", nargs="+", type=float, default=[1.0, 10.0, 40.0], help="Comparison horizons (default 1 10 40)")
+    parser.add_argument("--epoch", default="2000-01-01T12:00:00", help="Start epoch (default J2000, so results are comparable)")
+    parser.add_argument("--catalog", default=BODY_CATALOG, help=f"Body catalog; every body must be in the ephemeris (default {BODY_CATALOG})")
+    parser.add_argument("--ephemeris", help="Ephemeris name or local .bsp kernel to compare against (default: the catalog's)")
+    parser.add_argument("--out", default="-", help="JSON results file, or '-' for stdout (default)")
+    parser.add_argument("--baselines", default=DEFAULT_BASELINES, help="Stored baselines to compare against")
+    parser.add_argument("--update-baselines", action="store_true", help="Store these results as the new baselines")
+    parser.add_argument("--no-compare", action="store_true", help="Only measure; skip the comparison with the baselines")
+    parser.add_argument("--speed-tolerance", type=float, default=0.2, help="Allowed throughput drop (default 0.2 = 20%%)")
+    parser.add_argument("--error-tolerance", type=float, default=0.1, help="Allowed maximum error growth (default 0.1 = 10%%)")
+    return parser
+
+def main(argv=None):
+    args = buildArgumentParser().parse_args(argv)
+    if not (args.update_baselines or args.no_compare or os.path.exists(args.baselines)):
+        # Checked before the (long) runs rather than silently skipping the comparison after them
+        print(f"ERROR no baselines at {args.baselines}; run with --update-baselines on a reference machine "
+              f"to create them, or pass --no-compare to only measure", file=sys.stderr)
+        return 2
+    from astropy.time import Time
+    from entities.catalog import loadCatalog
+
+    catalog = loadCatalog(args.catalog)
+    reference = EphemerisReference(catalog, Time(args.epoch), args.ephemeris)
+    report = {
+        "epoch": args.epoch,
+        "ephemeris": ephemerisName(reference.ephemeris),
+        "bodies": catalog.names,
+        "machine": {"platform": platform.platform(), "processor": platform.processor(),
+                    "python": platform.python_version(), "numpy": np.__version__},
+        "runs": [],
+    }
+    for integrator in args.integrators:
+        for dt in args.dt:
+            horizons = benchmarkIntegrator(reference, integrator, dt, args.years)
+            report["runs"].append({"integrator": integrator, "dt": dt, "horizons": horizons})
+
+    if args.out == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baselines:
+        with open(args.baselines, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baselines written to {args.baselines}", file=sys.stderr)
+        return 0
+    if args.no_compare:
+        return 0
+
+    with open(args.baselines) as f:
+        baselines = json.load(f)
+    if baselines.get("ephemeris") != report["ephemeris"]:
+        print(f"WARNING baselines were recorded against {baselines.get('ephemeris')}, this run uses {report['ephemeris']}; "
+              f"errors include the difference between the two kernels", file=sys.stderr)
+    missing = missingBaselines(report, baselines)
+    for key in missing:
+        print(f"WARNING no baseline for {key}", file=sys.stderr)
+    if len(missing) == len(flattenResults(report)):
+        print(f"ERROR none of these results are in {args.baselines}; nothing was compared", file=sys.stderr)
+        return 2
+    regressions = compareWithBaselines(report, baselines, args.speed_tolerance, args.error_tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    if not regressions:
+        print("No regressions against the baselines", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
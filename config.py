@@ -9,9 +9,51 @@ FPS = 60
 SIMULATION_TIME_STEP_REAL = 3600 * 24 # 1 day in seconds (real-world time step for physics calculations)
 TIME_WARP = 500.0                   # How many times faster the simulation runs than real-time (e.g., 100x, 1000x, 10000x)
 SIMULATION_TIME_STEP = SIMULATION_TIME_STEP_REAL * TIME_WARP # Effective time step for the simulator
+PHYSICS_STEPS_PER_SECOND = FPS      # Simulator steps per real second on the simulation thread (None = as fast as possible)
+
+# History and replay
+HISTORY_CAPACITY = 8192             # Recent physics steps kept in RAM for scrubbing back (H key) in live mode
+REPLAY_SPEED = SIMULATION_TIME_STEP * FPS # Simulated seconds per real second when replaying (matches live speed)
+CHECKPOINT_EVERY_STEPS = 3600       # Physics steps between checkpoints with --checkpoint (a minute at 60 steps/s)
+
+# Encounters (physics/encounters.py)
+ENCOUNTER_RADIUS_FACTOR = 10.0      # Close approach: centres within this many times the sum of the radii
+MERGE_ON_IMPACT = False             # Merge colliding bodies (conserving momentum) instead of only logging the impact
 
 GRAVITATIONAL_CONSTANT = 6.67430e-11 # G constant in m^3 kg^-1 s^-2
 
+# Initial conditions
+BODY_CATALOG = "assets/catalogs/solarSystem.yaml" # Bodies, rings and where their initial states come from
+EPHEMERIS = "de432s"                # JPL ephemeris used for initial body states
+EPHEMERIS_CACHE_DIR = "cache/ephemeris" # Queried states are cached here per (ephemeris, epoch, bodies); None disables
+
+# Integrator used by NBodySimulator: "leapfrog" (2nd order), "yoshida4" or "forest-ruth" (4th order),
+# or "wisdom-holman" (mixed-variable map, allows steps of a sizeable fraction of an orbit),
+# or "block-leapfrog" (leapfrog with individual power-of-two time steps per body)
+INTEGRATOR = "leapfrog"
+
+# Individual (block) time steps for "block-leapfrog"
+BLOCK_TIMESTEP_ETA = 0.05       # Body step <= ETA * its shortest two-body dynamical time (~125 steps per orbit)
+BLOCK_TIMESTEP_MAX_LEVEL = 12   # Finest step is SIMULATION_TIME_STEP / 2^MAX_LEVEL
+
+# Barnes-Hut tree code (used instead of the direct sum for large body counts)
+BARNES_HUT_THETA = 0.5          # Opening angle: smaller is more accurate, larger is faster (keep <= 1.0)
+BARNES_HUT_MIN_BODIES = 4096    # Switch from the O(N^2) direct sum to the tree at this many bodies
+BARNES_HUT_LEAF_SIZE = 8        # Maximum bodies per tree leaf
+
+# Multi-core force evaluation: worker processes sharing state through shared memory (0 = off)
+PHYSICS_WORKERS = 0
+PARALLEL_MIN_TARGETS = 2048     # Smaller evaluations stay in-process (pool round trips would dominate)
+
+# Orbit trails
+TRAIL_LENGTH = 512                  # Points kept per body
+TRAIL_SAMPLE_INTERVAL = 3600 * 24 * 2 # Simulated seconds between trail points (512 points = ~2.8 years)
+
+# Kepler fast-forward and orbit previews (physics/fastForward.py)
+FAST_FORWARD_INTERVAL = 3600 * 24 * 365.25 * 10 # Simulated seconds skipped per press of F (10 years)
+ORBIT_PREVIEW_SAMPLES = 256         # Points per predicted orbit (O key)
+ORBIT_PREVIEW_MAX_SPAN = 3600 * 24 * 365.25 * 200 # Longest orbit drawn; covers Neptune's 165-year period
+
 # Scaling factors for rendering. Adjust these carefully!
 # To make solar system fit in view, positions and radii need scaling.
 # 1 AU is approx 1.5e11 meters. If scaled by 1e9, 1 AU becomes 150 units.
@@ -25,5 +67,14 @@ CAMERA_SPEED = 20.0 # Units per second (adjust based on POSITION_SCALE_FACTOR)
 MOUSE_SENSITIVITY = 0.1 # For camera rotation
 
 # Sphere procedural generation settings (for planets/moon)
-SPHERE_SEGMENTS_X = 64 # Longitude segments
-SPHERE_SEGMENTS_Y = 32 # Latitude segments
\ No newline at end of file
+SPHERE_LODS = ((8, 4), (16, 8), (32, 16), (64, 32), (128, 64), (256, 128)) # (longitude, latitude) segments of each level of detail
+SPHERE_LOD_PIXELS_PER_SEGMENT = 8.0 # Longest on-screen edge before a body switches to the next finer sphere
+IMPOSTOR_SCREEN_RADIUS = 1.0 # Bodies smaller than this on screen (pixels) are drawn as point sprites instead of spheres
+IMPOSTOR_POINT_SIZE = 2.0 # Width of those point sprites, pixels
+# Body texture tiers (rendering/textureManager.py); textures are equirectangular, tiers are width x width/2
+TEXTURE_LOW_TIER_WIDTH = 256 # Always resident for every body, as layers of one texture array
+TEXTURE_TIER_WIDTHS = (512, 1024, 2048) # Higher tiers, streamed in for bodies large enough on screen
+TEXTURE_VRAM_BUDGET_MB = 256 # High tiers beyond this evict the least recently visible ones
+TEXTURE_UPLOADS_PER_FRAME = 1 # High-tier uploads per frame (each one stalls the frame a little)
+TEXTURE_CACHE_DIR = "cache/textures" # Decoded textures with their mip chains, memory-mapped on later runs; None disables
+TEXTURE_DECODE_WORKERS = 0 # Threads decoding textures (0 = one per CPU)
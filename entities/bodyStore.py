@@ -0,0 +1,82 @@
+# entities/bodyStore.py
+
+import numpy as np
+from .celestialBody import CelestialBody
+
+# Bits of BodyStore.flags
+FLAG_LIGHT_SOURCE = 1 # The body lights the scene (the Sun)
+FLAG_MERGED = 2       # Absorbed in a collision: massless, zero radius, ignored by encounter checks
+
+class BodyStore:
+    """
+    Per-body data as contiguous columns, one row per body:
+      positions (N, 3), velocities (N, 3)  float64, meters and m/s
+      masses (N,), radii (N,)              float64, kg and meters
+      textureIds (N,), flags (N,)          uint32
+      names, texturePaths                  lists
+    Physics kernels and the renderer work on the columns directly; `bodies` holds one
+    CelestialBody handle per row for code that wants to address a single body.
+    Columns are updated in place and never reallocated, so views of them stay valid.
+    """
+    def __init__(self, names, masses, radii, positions, velocities, texturePaths=None, flags=None):
+        numBodies = len(names)
+        self.names = list(names)
+        self.masses = np.array(masses, dtype=np.float64).reshape(numBodies)
+        self.radii = np.array(radii, dtype=np.float64).reshape(numBodies)
+        self.positions = np.array(positions, dtype=np.float64).reshape(numBodies, 3)
+        self.velocities = np.array(velocities, dtype=np.float64).reshape(numBodies, 3)
+        self.texturePaths = list(texturePaths) if texturePaths is not None else [None] * numBodies
+        self.textureIds = np.zeros(numBodies, dtype=np.uint32)
+        self.flags = np.zeros(numBodies, dtype=np.uint32) if flags is None else np.array(flags, dtype=np.uint32).reshape(numBodies)
+
+        self.bodies = []
+        for i in range(numBodies):
+            body = CelestialBody.__new__(CelestialBody)
+            body._attach(self, i)
+            self.bodies.append(body)
+
+    @classmethod
+    def fromBodies(cls, bodies):
+        """
+        The store behind `bodies`. If they are exactly the rows of one store, in order, that
+        store is returned as is; otherwise their values are gathered into a new store and
+        the handles are rebound to it.
+        """
+        bodies = list(bodies)
+        if bodies:
+            store = bodies[0].store
+            if len(store) == len(bodies) and all(body.store is store and body.index == i for i, body in enumerate(bodies)):
+                return store
+
+        store = cls([body.name for body in bodies], [body.mass for body in bodies], [body.radius for body in bodies],
+                    np.reshape([body.position for body in bodies], (-1, 3)),
+                    np.reshape([body.velocity for body in bodies], (-1, 3)),
+                    [body.texturePath for body in bodies], [body.flags for body in bodies])
+        store.textureIds[:] = [body.textureId for body in bodies]
+        for i, body in enumerate(bodies):
+            body._attach(store, i)
+        store.bodies = bodies
+        return store
+
+    @classmethod
+    def fromCatalog(cls, catalog, epoch):
+        # The bodies of a BodyCatalog (see entities/catalog.py) at their initial states at `epoch`
+        positions, velocities = catalog.initialStates(epoch)
+        return cls(catalog.names, catalog.masses, catalog.radii, positions, velocities,
+                   catalog.texturePaths, catalog.flags)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.bodies)
+
+    def __getitem__(self, index):
+        return self.bodies[index]
+
+    def indexOf(self, name):
+        # Row of the body called `name`, or None
+        try:
+            return self.names.index(name)
+        except ValueError:
+            return None
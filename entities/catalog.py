@@ -0,0 +1,87 @@
+# entities/catalog.py
+
+import numpy as np
+import yaml
+
+from config import BODY_CATALOG, EPHEMERIS
+from .ephemerisCache import getBodyStates
+from .bodyStore import FLAG_LIGHT_SOURCE
+from .ringData import RingData
+
+class BodyCatalog:
+    """
+    A scenario loaded from a catalog file (see assets/catalogs/solarSystem.yaml), packed into
+    arrays: names, masses (N,), radii (N,), texturePaths, flags (N,), and what initialStates() needs to
+    build the (N, 3) initial positions and velocities at any epoch.
+    """
+    def __init__(self, entries, rings=(), ephemeris=EPHEMERIS, source="<catalog>"):
+        self.source = source
+        self.ephemeris = ephemeris
+        for entry in entries:
+            missing = [key for key in ("name", "mass", "radius") if key not in entry]
+            if missing:
+                raise ValueError(f"{source}: body {entry.get('name', '?')} is missing {', '.join(missing)}")
+        self.names = [str(entry["name"]) for entry in entries]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"{source}: body names must be unique")
+        indexOf = {name: i for i, name in enumerate(self.names)}
+
+        self.masses = np.array([float(entry["mass"]) for entry in entries])
+        self.radii = np.array([float(entry["radius"]) for entry in entries])
+        self.texturePaths = [entry.get("texture") for entry in entries]
+        self.flags = np.array([FLAG_LIGHT_SOURCE if entry.get("lightSource") else 0 for entry in entries], dtype=np.uint32)
+
+        # Explicit states (relative to the parent, if any) and the entries to look up instead
+        self.positions = np.zeros((len(entries), 3))
+        self.velocities = np.zeros((len(entries), 3))
+        self.parentIndex = np.full(len(entries), -1, dtype=np.int64)
+        ephemerisIndex, self.ephemerisNames = [], []
+        for i, entry in enumerate(entries):
+            if "parent" in entry:
+                parent = indexOf.get(entry["parent"], len(entries))
+                if parent >= i:
+                    raise ValueError(f"{source}: parent '{entry['parent']}' of '{self.names[i]}' must be listed before it")
+                self.parentIndex[i] = parent
+            if "position" in entry or "velocity" in entry:
+                self.positions[i] = np.asarray(entry.get("position", (0.0, 0.0, 0.0)), dtype=np.float64)
+                self.velocities[i] = np.asarray(entry.get("velocity", (0.0, 0.0, 0.0)), dtype=np.float64)
+            elif self.parentIndex[i] >= 0:
+                raise ValueError(f"{source}: '{self.names[i]}' has a parent but no position/velocity")
+            else:
+                ephemerisIndex.append(i)
+                self.ephemerisNames.append(str(entry.get("ephemeris", self.names[i].lower())))
+        self.ephemerisIndex = np.array(ephemerisIndex, dtype=np.int64)
+        self.childIndex = np.flatnonzero(self.parentIndex >= 0)
+
+        self.rings = []
+        for ring in rings:
+            if ring["body"] not in indexOf:
+                raise ValueError(f"{source}: ring attached to unknown body '{ring['body']}'")
+            self.rings.append(RingData(ring["innerRadius"], ring["outerRadius"], ring.get("texture"),
+                                       ring.get("tilt", 0.0), bodyName=ring["body"]))
+
+    def __len__(self):
+        return len(self.names)
+
+    def initialStates(self, epoch):
+        """
+        Barycentric (positions, velocities) of every body at `epoch` (an astropy Time), as (N, 3)
+        arrays in meters and m/s. All ephemeris bodies are resolved in one (cached) lookup.
+        """
+        positions = self.positions.copy()
+        velocities = self.velocities.copy()
+        if len(self.ephemerisIndex):
+            positions[self.ephemerisIndex], velocities[self.ephemerisIndex] = \
+                getBodyStates(self.ephemerisNames, epoch, self.ephemeris)
+        # Parents precede their children, so one pass in catalog order resolves nested systems
+        for i in self.childIndex:
+            positions[i] += positions[self.parentIndex[i]]
+            velocities[i] += velocities[self.parentIndex[i]]
+        return positions, velocities
+
+def loadCatalog(path=BODY_CATALOG):
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    if not data.get("bodies"):
+        raise ValueError(f"{path}: catalog has no bodies")
+    return BodyCatalog(data["bodies"], data.get("rings") or (), data.get("ephemeris", EPHEMERIS), source=path)
@@ -1,18 +1,85 @@
 # entities/celestialBody.py
 
-import numpy as np
-
 class CelestialBody:
+    """
+    Lightweight handle to one row of a BodyStore (see entities/bodyStore.py): every attribute
+    reads or writes the store's columns in place, so the simulator, the renderer and the
+    handles all share one copy of the state.
+    Constructing a CelestialBody directly creates a single-row store for it; NBodySimulator
+    gathers such bodies into one store (rebinding the handles) when it is created.
+    """
+    __slots__ = ("_store", "_index")
+
     def __init__(self, name, mass, radius, initial_position, initial_velocity, texturePath=None):
-        self.name = name
-        self.mass = float(mass) # kg
-        self.radius = float(radius) # meters
-        self.position = np.array(initial_position, dtype=np.float64) # meters
-        self.velocity = np.array(initial_velocity, dtype=np.float64) # meters/second
-        self.texturePath = texturePath
-        self.textureId = 0 # OpenGL texture ID, set after loading
-        # For Verlet integration: velocity at half time step
-        self.velocity_half_step = np.array(initial_velocity, dtype=np.float64)
+        from .bodyStore import BodyStore
+        store = BodyStore([name], [mass], [radius], [initial_position], [initial_velocity], [texturePath])
+        self._attach(store, 0)
+        store.bodies[0] = self
+
+    def _attach(self, store, index):
+        self._store = store
+        self._index = index
+
+    @property
+    def store(self):
+        return self._store
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def name(self):
+        return self._store.names[self._index]
+
+    @property
+    def mass(self):
+        return float(self._store.masses[self._index]) # kg
+
+    @mass.setter
+    def mass(self, value):
+        self._store.masses[self._index] = value
+
+    @property
+    def radius(self):
+        return float(self._store.radii[self._index]) # meters
+
+    @radius.setter
+    def radius(self, value):
+        self._store.radii[self._index] = value
+
+    # Row views: reading returns a view into the store, assigning writes in place.
+    @property
+    def position(self):
+        return self._store.positions[self._index] # meters
+
+    @position.setter
+    def position(self, value):
+        self._store.positions[self._index] = value
+
+    @property
+    def velocity(self):
+        return self._store.velocities[self._index] # meters/second
+
+    @velocity.setter
+    def velocity(self, value):
+        self._store.velocities[self._index] = value
+
+    @property
+    def texturePath(self):
+        return self._store.texturePaths[self._index]
+
+    @property
+    def textureId(self):
+        return int(self._store.textureIds[self._index]) # OpenGL texture ID, 0 until loaded
+
+    @textureId.setter
+    def textureId(self, value):
+        self._store.textureIds[self._index] = value
+
+    @property
+    def flags(self):
+        return int(self._store.flags[self._index])
 
     def __repr__(self):
-        return f"CelestialBody(Name='{self.name}', Mass={self.mass:.2e} kg, Radius={self.radius:.2e} m, Pos={self.position}, Vel={self.velocity})"
\ No newline at end of file
+        return f"CelestialBody(Name='{self.name}', Mass={self.mass:.2e} kg, Radius={self.radius:.2e} m, Pos={self.position}, Vel={self.velocity})"
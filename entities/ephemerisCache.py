@@ -0,0 +1,88 @@
+# entities/ephemerisCache.py
+
+import hashlib
+import json
+import os
+import numpy as np
+
+from config import EPHEMERIS, EPHEMERIS_CACHE_DIR
+
+def cacheKey(ephemeris, epoch, bodyNames):
+    # The epoch is keyed by its exact TDB Julian date pair, so equal instants hit the same entry
+    # whatever scale or format they were given in
+    tdb = epoch.tdb
+    key = {"ephemeris": ephemeris, "jd1": float(tdb.jd1), "jd2": float(tdb.jd2), "bodies": list(bodyNames)}
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _kernelStates(kernel, chains, epoch):
+    # Barycentric states from a JPL SPK kernel for bodies given as chains of (center, target)
+    # segments. Each distinct segment (e.g. solar system barycentre -> Earth-Moon barycentre,
+    # shared by the Earth and the Moon) is evaluated once, then every body's chain is summed
+    # in one matrix product. Returns (2, N, 3): positions in km, velocities in km/day.
+    tdb = epoch.tdb
+    segments = list(dict.fromkeys(pair for chain in chains for pair in chain))
+    segmentStates = np.empty((len(segments), 2, 3))
+    for k, pair in enumerate(segments):
+        segment = kernel[pair]
+        if segment.data_type == 3: # Type 3 segments hold both position and velocity
+            segmentStates[k] = np.reshape(segment.compute(tdb.jd1, tdb.jd2), (2, 3))
+        else:
+            segmentStates[k] = np.reshape(segment.compute_and_differentiate(tdb.jd1, tdb.jd2), (2, 3))
+
+    columns = {pair: k for k, pair in enumerate(segments)}
+    chainMatrix = np.zeros((len(chains), len(segments)))
+    for body, chain in enumerate(chains):
+        chainMatrix[body, [columns[pair] for pair in chain]] = 1.0
+    return np.einsum('bs,svi->vbi', chainMatrix, segmentStates)
+
+def queryEphemeris(bodyNames, epoch, ephemeris=EPHEMERIS):
+    """
+    Barycentric states of `bodyNames` at `epoch` straight from the ephemeris.
+    With a JPL kernel (e.g. de432s) all bodies are evaluated together from the kernel's
+    segments (see _kernelStates); the built-in ephemeris, or names the kernel does not
+    cover, fall back to astropy's one call per body.
+    Returns (positions, velocities) as (N, 3) arrays in meters and m/s.
+    """
+    from astropy import units
+    from astropy.coordinates import get_body_barycentric_posvel, solar_system_ephemeris
+    from astropy.coordinates.solar_system import BODY_NAME_TO_KERNEL_SPEC
+
+    with solar_system_ephemeris.set(ephemeris):
+        kernel = solar_system_ephemeris.kernel
+        chains = [BODY_NAME_TO_KERNEL_SPEC.get(name.lower()) for name in bodyNames]
+        if kernel is not None and all(chains):
+            states = _kernelStates(kernel, chains, epoch)
+            return states[0] * 1000.0, states[1] * (1000.0 / 86400.0)
+        states = [get_body_barycentric_posvel(name, epoch) for name in bodyNames]
+    positions = units.Quantity([position.xyz for position, _ in states]).to_value(units.m)
+    velocities = units.Quantity([velocity.xyz for _, velocity in states]).to_value(units.m / units.s)
+    return positions.reshape(-1, 3), velocities.reshape(-1, 3)
+
+def getBodyStates(bodyNames, epoch, ephemeris=EPHEMERIS, cacheDir=EPHEMERIS_CACHE_DIR):
+    """
+    Like queryEphemeris, but reuses the result of an earlier query for the same
+    (ephemeris, epoch, bodies) from `cacheDir`. Each entry is a single (2, N, 3) float64 .npy file.
+    Pass cacheDir=None to bypass the cache.
+    """
+    if not cacheDir:
+        return queryEphemeris(bodyNames, epoch, ephemeris)
+
+    path = os.path.join(cacheDir, cacheKey(ephemeris, epoch, bodyNames) + ".npy")
+    try:
+        states = np.load(path)
+        if states.shape == (2, len(bodyNames), 3):
+            return states[0], states[1]
+    except (OSError, ValueError):
+        pass # Missing or unreadable entry: query and rewrite it
+
+    positions, velocities = queryEphemeris(bodyNames, epoch, ephemeris)
+    try:
+        os.makedirs(cacheDir, exist_ok=True)
+        # Write then rename, so a concurrent or interrupted run never sees a partial file
+        temporaryPath = f"{path}.{os.getpid()}.tmp"
+        with open(temporaryPath, "wb") as f:
+            np.save(f, np.stack([positions, velocities]))
+        os.replace(temporaryPath, path)
+    except OSError as e:
+        print(f"Warning: could not write ephemeris cache {path}: {e}")
+    return positions, velocities
@@ -0,0 +1,36 @@
+# entities/testParticles.py
+
+import numpy as np
+from config import GRAVITATIONAL_CONSTANT
+
+ASTRONOMICAL_UNIT_M = 1.495978707e11 # meters
+
+def generateAsteroidBelt(count, centralBody, innerRadius=2.1 * ASTRONOMICAL_UNIT_M,
+                         outerRadius=3.3 * ASTRONOMICAL_UNIT_M, maxInclinationDegrees=10.0, seed=None):
+    """
+    Generates `count` test particles on circular orbits around `centralBody` (usually the Sun),
+    with orbital radii uniform in [innerRadius, outerRadius] (meters) and inclinations up to
+    `maxInclinationDegrees`. Defaults approximate the main asteroid belt.
+    Returns (positions, velocities) as (count, 3) arrays for NBodySimulator.addTestParticles.
+    """
+    rng = np.random.default_rng(seed)
+    radius = rng.uniform(innerRadius, outerRadius, count)
+    longitude = rng.uniform(0.0, 2.0 * np.pi, count)
+    inclination = np.radians(rng.uniform(-maxInclinationDegrees, maxInclinationDegrees, count))
+    node = rng.uniform(0.0, 2.0 * np.pi, count)
+
+    # Position and direction of motion in the orbital plane, then tilted about the line of nodes
+    inPlanePosition = np.stack([np.cos(longitude), np.sin(longitude), np.zeros(count)], axis=1)
+    inPlaneDirection = np.stack([-np.sin(longitude), np.cos(longitude), np.zeros(count)], axis=1)
+
+    def rotate(vectors):
+        # Rotation by `inclination` about the x axis followed by `node` about the z axis
+        x, y, z = vectors[:, 0], vectors[:, 1], vectors[:, 2]
+        y, z = y * np.cos(inclination) - z * np.sin(inclination), y * np.sin(inclination) + z * np.cos(inclination)
+        x, y = x * np.cos(node) - y * np.sin(node), x * np.sin(node) + y * np.cos(node)
+        return np.stack([x, y, z], axis=1)
+
+    circularSpeed = np.sqrt(GRAVITATIONAL_CONSTANT * centralBody.mass / radius)
+    positions = centralBody.position + rotate(inPlanePosition) * radius[:, np.newaxis]
+    velocities = centralBody.velocity + rotate(inPlaneDirection) * circularSpeed[:, np.newaxis]
+    return positions, velocities
@@ -1,27 +1,75 @@
 # main.py
 
-import glfw
-from OpenGL.GL import *
-import numpy as np
-import glm
-
-from config import WINDOW_WIDTH, WINDOW_HEIGHT, SIMULATION_TIME_STEP, INITIAL_CAMERA_POSITION, \
-                   POSITION_SCALE_FACTOR, RADIUS_SCALE_FACTOR, TIME_WARP
-from physics.nBodySimulator import NBodySimulator
-from rendering.windowManager import WindowManager
-from rendering.camera import Camera
-from rendering.shaderProgram import ShaderProgram
-from entities.planetData import getSolarSystemBodies
-from rendering.meshLoader import loadObjMesh # Now implicitly generates procedural sphere
-from rendering.textureLoader import loadTexture
-from rendering.ringRenderer import RingRenderer
-from entities.ringData import getSaturnRingData
+import argparse
+import threading
+from startupProfiler import startupProfiler
+
+with startupProfiler.section("import numpy, glfw, OpenGL, glm"):
+    import glfw
+    from OpenGL.GL import *
+    import numpy as np
+    import glm
+
+with startupProfiler.section("import app modules"):
+    from config import WINDOW_WIDTH, WINDOW_HEIGHT, SIMULATION_TIME_STEP, INITIAL_CAMERA_POSITION, \
+                       POSITION_SCALE_FACTOR, RADIUS_SCALE_FACTOR, TIME_WARP, PHYSICS_STEPS_PER_SECOND, BODY_CATALOG, \
+                       HISTORY_CAPACITY, REPLAY_SPEED, TEXTURE_LOW_TIER_WIDTH, TEXTURE_TIER_WIDTHS, \
+                       TEXTURE_VRAM_BUDGET_MB, TEXTURE_UPLOADS_PER_FRAME, CHECKPOINT_EVERY_STEPS, TRAIL_LENGTH, TRAIL_SAMPLE_INTERVAL, \
+                       MERGE_ON_IMPACT, FAST_FORWARD_INTERVAL, ORBIT_PREVIEW_SAMPLES, ORBIT_PREVIEW_MAX_SPAN, \
+                       SPHERE_LODS, SPHERE_LOD_PIXELS_PER_SEGMENT, IMPOSTOR_SCREEN_RADIUS, IMPOSTOR_POINT_SIZE
+    from physics.nBodySimulator import NBodySimulator
+    from physics.simulationThread import SimulationThread
+    from physics.trajectoryIO import TrajectoryFile, TrajectoryRingBuffer, TrajectoryWriter
+    from physics.replay import TrajectoryReplay
+    from physics.checkpoint import CheckpointWriter, PeriodicCheckpointer, loadCheckpoint
+    from physics.encounters import EncounterMonitor
+    from physics.fastForward import predictOrbits
+    from rendering.windowManager import WindowManager
+    from rendering.camera import Camera
+    from rendering.shaderProgram import ShaderProgram, FrameUniforms
+    from rendering.meshLoader import loadSphereLods
+    from rendering.bodyRenderer import BodyRenderer
+    from rendering.impostorRenderer import ImpostorRenderer
+    from rendering.textureManager import TextureManager
+    from rendering.textureLoader import prefetchTextures
+    from rendering.ringRenderer import RingRenderer
+    from rendering.trailRenderer import TrailRenderer
+    from rendering.orbitRenderer import OrbitRenderer
+    from entities.bodyStore import BodyStore, FLAG_LIGHT_SOURCE, FLAG_MERGED
+# astropy (through entities.planetData) is only imported on the body loader thread
 
 class SolarSystemApp:
-    def __init__(self):
+    def __init__(self, profileStartup=False, catalogPath=BODY_CATALOG, recordPath=None, replayPath=None,
+                 checkpointPath=None, resumePath=None):
+        self.profileStartup = profileStartup
+        self.catalogPath = catalogPath
+        self.recordPath = recordPath # Write every physics step to this trajectory file
+        self.replayPath = replayPath # Play this trajectory file back instead of simulating
+        self.checkpointPath = checkpointPath # Save the simulator state here every CHECKPOINT_EVERY_STEPS steps
+        self.resumePath = resumePath # Start from this checkpoint instead of the ephemeris
+
+        # 0. Load Celestial Body Data in the background: importing astropy and reading the
+        # ephemeris are the slowest part of startup, and need no OpenGL context
+        self.celestialBodies = None
+        self.catalog = None
+        self.epochText = None # Initial epoch, ISO format
+        self.recording = None # TrajectoryFile being replayed
+        self.simulator = None
+        self.simulationThread = None
+        self.history = None # Recent physics steps, for scrubbing back in live mode
+        self.recordWriter = None
+        self.checkpointWriter = None
+        self.replay = None # TrajectoryReplay driving the view, if any (replay or history mode)
+        self._loaded = False
+        self._loaderError = None
+        loader = self._loadRecording if replayPath else self._loadCheckpoint if resumePath else self._loadBodies
+        self._bodyLoader = threading.Thread(target=loader, name="BodyLoader", daemon=True)
+        self._bodyLoader.start()
+
         # 1. Initialize GLFW and Window
-        self.windowManager = WindowManager(WINDOW_WIDTH, WINDOW_HEIGHT, "Solar System Simulator")
-        self.window = self.windowManager.getWindow()
+        with startupProfiler.section("create window"):
+            self.windowManager = WindowManager(WINDOW_WIDTH, WINDOW_HEIGHT, "Solar System Simulator")
+            self.window = self.windowManager.getWindow()
 
         # Set up OpenGL viewport and initial settings
         glfw.make_context_current(self.window)
@@ -29,53 +77,238 @@ class SolarSystemApp:
         glEnable(GL_DEPTH_TEST)
         glEnable(GL_BLEND) # Enable blending for transparency (for rings)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA) # Standard alpha blending
+        glEnable(GL_PROGRAM_POINT_SIZE) # Impostor shaders set gl_PointSize
         glClearColor(0.0, 0.0, 0.0, 1.0) # Black background for space
 
+        # Show the (empty) window right away rather than after everything has loaded
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        self.windowManager.swapBuffers()
+        startupProfiler.mark("window shown")
+
         # Set up callbacks for input
         self.camera = Camera(INITIAL_CAMERA_POSITION)
         self.windowManager.registerKeyCallback(self.camera.key_input_callback)
         self.windowManager.registerMouseCallback(self.camera.mouse_input_callback)
+        self.windowManager.registerKeyCallback(self._replayKeyCallback)
         # Mouse cursor is set to disabled in camera for FPS controls:
         # glfw.set_input_mode(self.window, glfw.CURSOR, glfw.CURSOR_DISABLED)
 
         # 2. Load Shaders
-        self.shaderProgram = ShaderProgram("assets/shaders/vertexShader.glsl", "assets/shaders/fragmentShader.glsl")
+        with startupProfiler.section("shader compile"):
+            self.shaderProgram = ShaderProgram("assets/shaders/vertexShader.glsl", "assets/shaders/fragmentShader.glsl")
+            # Bodies are drawn instanced with their own program; rings keep the plain one
+            self.bodyShaderProgram = ShaderProgram("assets/shaders/bodyVertexShader.glsl", "assets/shaders/bodyFragmentShader.glsl")
+            # Projection, view, camera and light, shared by all programs (FrameData uniform block)
+            self.frameUniforms = FrameUniforms()
 
         # Set up lighting uniforms that are constant (or depend on camera/sun)
         # These are initial values, you might need to fine-tune them
-        self.shaderProgram.use()
-        self.shaderProgram.setUniform1f("ambientStrength", 0.1) # Global ambient light
-        self.shaderProgram.setUniform1f("diffuseStrength", 0.8) # How much diffuse light contributes
-        self.shaderProgram.setUniform1f("specularStrength", 0.5) # How much specular highlight contributes
-        self.shaderProgram.setUniform1f("shininess", 32.0) # Shininess of the material (e.g., plastic-like)
-        self.shaderProgram.setUniformVec3("lightColor", glm.vec3(1.0, 1.0, 1.0)) # White light
-        self.shaderProgram.unuse()
+        for program in (self.shaderProgram, self.bodyShaderProgram):
+            program.use()
+            program.setUniform1f("ambientStrength", 0.1) # Global ambient light
+            program.setUniform1f("diffuseStrength", 0.8) # How much diffuse light contributes
+            program.setUniform1f("specularStrength", 0.5) # How much specular highlight contributes
+            program.setUniform1f("shininess", 32.0) # Shininess of the material (e.g., plastic-like)
+            program.unuse()
 
-        # 3. Load Celestial Body Data
-        self.celestialBodies = getSolarSystemBodies()
-        self.simulator = NBodySimulator(self.celestialBodies, SIMULATION_TIME_STEP)
+        # 3. Generate Mesh
+        # Procedural spheres at several levels of detail, shared by all bodies
+        with startupProfiler.section("mesh generation"):
+            self.sphereMeshes = loadSphereLods(SPHERE_LODS)
 
-        # 4. Generate Mesh and Load Textures
-        # We now generate a single sphere mesh procedurally to be reused for all bodies
-        self.sphereMesh = loadObjMesh() # Call without path, or with dummy path if loadObjMesh checks it
+        self.bodyStore = None
+        self.bodyRenderer = None
+        self.impostorRenderer = None
+        self.textureManager = None
+        self.ringRenderers = {} # Body name -> RingRenderer
+        self.trailRenderer = None
+        self.showTrails = True
+        self.orbitRenderer = None
+        self.showOrbits = False
+        self.orbitsTime = None # Simulated time of the state the shown orbits were predicted from
+        self.lastFrameTime = glfw.get_time()
 
-        for body in self.celestialBodies:
-            body.textureId = loadTexture(body.texturePath)
+    def _prefetchTextures(self):
+        # Starts decoding the catalog's textures on worker threads while the bodies load;
+        # _finishLoading then only has to upload them
+        prefetchTextures(self.catalog.texturePaths, (TEXTURE_LOW_TIER_WIDTH, TEXTURE_LOW_TIER_WIDTH // 2))
+        prefetchTextures([ring.texturePath for ring in self.catalog.rings])
 
-        # 5. Initialize Ring Renderer (for Saturn)
-        self.ringRenderer = None
-        saturn_body = next((body for body in self.celestialBodies if body.name == "Saturn"), None)
-        if saturn_body:
-            ring_data = getSaturnRingData()
-            self.ringRenderer = RingRenderer(ring_data.innerRadius * RADIUS_SCALE_FACTOR,
-                                             ring_data.outerRadius * RADIUS_SCALE_FACTOR,
-                                             ring_data.texturePath,
-                                             segments=128) # Higher segments for smoother rings
-            # Pass ring tilt to ring renderer if needed, or handle in its render method
-            self.saturn_ring_tilt = ring_data.tiltDegrees
+    def _loadBodies(self):
+        # Runs on the body loader thread
+        try:
+            with startupProfiler.section("import astropy"):
+                from entities.planetData import defaultEpoch, getSolarSystemBodies
+                from entities.catalog import loadCatalog
+            with startupProfiler.section("catalog"):
+                self.catalog = loadCatalog(self.catalogPath)
+            self._prefetchTextures()
+            with startupProfiler.section("ephemeris"):
+                epoch = defaultEpoch()
+                self.celestialBodies = getSolarSystemBodies(epoch, self.catalog)
+                self.epochText = epoch.isot
+        except Exception as e:
+            self._loaderError = e
 
+    def _loadCheckpoint(self):
+        # Runs on the body loader thread when resuming: the whole simulator comes from the checkpoint
+        try:
+            from entities.catalog import loadCatalog
+            with startupProfiler.section("catalog"):
+                self.catalog = loadCatalog(self.catalogPath)
+            self._prefetchTextures()
+            with startupProfiler.section("load checkpoint"):
+                self.simulator, extra = loadCheckpoint(self.resumePath)
+            self.celestialBodies = self.simulator.bodies
+            self.epochText = extra.get("epoch")
+        except Exception as e:
+            self._loaderError = e
 
-        self.lastFrameTime = glfw.get_time()
+    def _loadRecording(self):
+        # Runs on the body loader thread in replay mode: bodies come from the file, textures and
+        # rings from the catalog (matched by name), and astropy is never imported
+        try:
+            from entities.catalog import loadCatalog
+            with startupProfiler.section("catalog"):
+                self.catalog = loadCatalog(self.catalogPath)
+            self._prefetchTextures()
+            with startupProfiler.section("open recording"):
+                self.recording = TrajectoryFile(self.replayPath)
+            metadata = self.recording.metadata
+            names = metadata["bodies"]
+            catalogIndex = [self.catalog.names.index(name) if name in self.catalog.names else None for name in names]
+            radii = metadata.get("radii") or [self.catalog.radii[i] if i is not None else 0.0 for i in catalogIndex]
+            store = BodyStore(names, metadata.get("masses", [0.0] * len(names)), radii,
+                              self.recording.records[0]["positions"], np.zeros((len(names), 3)),
+                              [self.catalog.texturePaths[i] if i is not None else None for i in catalogIndex],
+                              [self.catalog.flags[i] if i is not None else 0 for i in catalogIndex])
+            self.celestialBodies = store.bodies
+        except Exception as e:
+            self._loaderError = e
+
+    def _finishLoading(self):
+        """
+        Once the body loader thread is done, uploads textures and starts the simulation
+        (or the replay). Returns False while the bodies are still loading.
+        """
+        if self._bodyLoader.is_alive():
+            return False
+        if self._loaderError:
+            raise self._loaderError
+
+        store = self.bodyStore = BodyStore.fromBodies(self.celestialBodies)
+        self.renderPositions = store.positions.copy()
+        # The body lighting the scene: flagged in the catalog, or else the one named Sun
+        lightSources = np.flatnonzero(store.flags & FLAG_LIGHT_SOURCE)
+        self.sunIndex = int(lightSources[0]) if len(lightSources) else store.indexOf("Sun")
+
+        # 4. Load Textures
+        with startupProfiler.section("texture load"):
+            # All body textures as layers of one texture array, for the instanced draw
+            # Only the low tier now; larger ones are streamed in as bodies fill the screen
+            self.textureManager = TextureManager(store.texturePaths, TEXTURE_LOW_TIER_WIDTH, TEXTURE_TIER_WIDTHS,
+                                                 TEXTURE_VRAM_BUDGET_MB * 1024 * 1024, TEXTURE_UPLOADS_PER_FRAME)
+            self.bodyRenderer = BodyRenderer(self.sphereMeshes, self.bodyShaderProgram,
+                                             self.textureManager.arrayTextureId, self.textureManager.layers,
+                                             SPHERE_LOD_PIXELS_PER_SEGMENT)
+            self.impostorRenderer = ImpostorRenderer(self.textureManager.arrayTextureId, self.textureManager.layers,
+                                                     IMPOSTOR_POINT_SIZE)
+
+            # 5. Initialize Ring Renderers (Saturn's, and any others in the catalog)
+            bodyNames = {body.name for body in self.celestialBodies}
+            for ring_data in self.catalog.rings:
+                if ring_data.bodyName in bodyNames:
+                    self.ringRenderers[ring_data.bodyName] = RingRenderer(ring_data.innerRadius * RADIUS_SCALE_FACTOR,
+                                                                          ring_data.outerRadius * RADIUS_SCALE_FACTOR,
+                                                                          ring_data.texturePath,
+                                                                          segments=128, # Higher segments for smoother rings
+                                                                          tiltDegrees=ring_data.tiltDegrees)
+
+        # Orbit trails for every body, streamed to the GPU one point per body per frame
+        self.trailRenderer = TrailRenderer(len(store), TRAIL_LENGTH, TRAIL_SAMPLE_INTERVAL)
+        # Predicted orbits from the live state (O key); recordings have no velocities to predict from
+        if self.recording is None:
+            self.orbitRenderer = OrbitRenderer(len(store), ORBIT_PREVIEW_SAMPLES)
+
+        if self.recording is not None:
+            # Replay mode: no physics at all, the view follows the recorded samples
+            self.replay = TrajectoryReplay(self.recording, REPLAY_SPEED)
+        else:
+            if self.simulator is None:
+                self.simulator = NBodySimulator(self.celestialBodies, SIMULATION_TIME_STEP)
+            self.history = TrajectoryRingBuffer(len(store), HISTORY_CAPACITY)
+            # Encounters are checked first so the other recorders see the state after any merge
+            self.encounterMonitor = EncounterMonitor(self.simulator, mergeOnImpact=MERGE_ON_IMPACT, onEvent=print)
+            recorders = [self.encounterMonitor, self.history]
+            if self.recordPath:
+                metadata = {
+                    "bodies": list(store.names),
+                    "masses": store.masses.tolist(),
+                    "radii": store.radii.tolist(),
+                    "epoch": self.epochText,
+                    "start_time": self.simulator.time,
+                    "dt": self.simulator.time_step,
+                    "integrator": self.simulator.integrator.name,
+                    "steps_per_sample": 1,
+                }
+                self.recordWriter = TrajectoryWriter(open(self.recordPath, "wb"), len(store), True, metadata)
+                self.recordWriter.append(self.simulator.time, self.simulator.positions, self.simulator.velocities)
+                recorders.append(self.recordWriter)
+            if self.checkpointPath:
+                # State is copied on the physics thread between steps and written on another
+                self.checkpointWriter = CheckpointWriter(self.checkpointPath)
+                recorders.append(PeriodicCheckpointer(self.simulator, self.checkpointWriter, CHECKPOINT_EVERY_STEPS,
+                                                      extra={"epoch": self.epochText}))
+            self.history.append(self.simulator.time, self.simulator.positions)
+            # Physics runs on its own thread; rendering reads interpolated snapshots of it
+            self.simulationThread = SimulationThread(self.simulator, PHYSICS_STEPS_PER_SECOND, recorders=recorders)
+            self.simulationThread.start()
+        self._loaded = True
+        return True
+
+    def _replayKeyCallback(self, key, action, mods):
+        # H: switch between the live simulation and its recent history (live mode only)
+        # P: play/pause, Left/Right: seek back/forward 2%, Up/Down: double/halve the speed
+        # T: show/hide orbit trails, O: show/hide predicted orbits (live mode)
+        # F: jump ahead FAST_FORWARD_INTERVAL on Kepler orbits, then carry on simulating (live mode)
+        if action not in (glfw.PRESS, glfw.REPEAT) or not self._loaded:
+            return
+        if key == glfw.KEY_T and action == glfw.PRESS:
+            self.showTrails = not self.showTrails
+            return
+        if key == glfw.KEY_O and action == glfw.PRESS and self.orbitRenderer:
+            self.showOrbits = not self.showOrbits
+            self.orbitsTime = None
+            return
+        if key == glfw.KEY_F and action == glfw.PRESS and self.simulationThread and self.replay is None:
+            self.simulationThread.requestFastForward(FAST_FORWARD_INTERVAL)
+            print(f"Fast-forwarding {FAST_FORWARD_INTERVAL / (86400.0 * 365.25):.0f} years")
+            return
+        if key == glfw.KEY_H and action == glfw.PRESS and self.history is not None:
+            if self.replay is None:
+                _, latest = self.history.timeRange()
+                self.replay = TrajectoryReplay(self.history, REPLAY_SPEED, startTime=latest)
+                self.replay.playing = False
+            else:
+                self.replay = None
+                print("Live")
+                return
+        elif self.replay is None:
+            return
+        elif key == glfw.KEY_P and action == glfw.PRESS:
+            self.replay.togglePlaying()
+        elif key == glfw.KEY_LEFT:
+            self.replay.seekFraction(-0.02)
+        elif key == glfw.KEY_RIGHT:
+            self.replay.seekFraction(0.02)
+        elif key == glfw.KEY_UP and action == glfw.PRESS:
+            self.replay.speed *= 2.0
+        elif key == glfw.KEY_DOWN and action == glfw.PRESS:
+            self.replay.speed *= 0.5
+        else:
+            return
+        print(f"Replay: day {self.replay.time / 86400.0:.1f}, {self.replay.speed / 86400.0:.1f} days/s, "
+              f"{'playing' if self.replay.playing else 'paused'}")
 
     def run(self):
         while not glfw.window_should_close(self.window):
@@ -87,77 +320,152 @@ class SolarSystemApp:
             self.windowManager.pollEvents() # Polls GLFW events
             self.camera.processKeyboardInput(self.window, deltaTime) # Process continuous key presses
 
-            # Update simulation state
-            self.simulator.update()
+            if not self._loaded and not self._finishLoading():
+                # Still loading: keep the window responsive with empty frames
+                glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+                self.windowManager.swapBuffers()
+                continue
+
+            if self.simulationThread and self.simulationThread.error:
+                raise self.simulationThread.error
+            if self.replay is not None:
+                # Recorded state at the playhead
+                self.replay.advance(deltaTime)
+                positions = self.replay.positions(out=self.renderPositions)
+                simulatedTime = self.replay.time
+            else:
+                # Latest simulation state, interpolated between the last two physics steps
+                positions, simulatedTime = self.simulationThread.interpolatedPositions(out=self.renderPositions)
 
             # Render scene
-            self._renderScene()
+            self._renderScene(positions, simulatedTime)
 
             # Swap buffers
             self.windowManager.swapBuffers()
 
-    def _renderScene(self):
+            if self.profileStartup:
+                startupProfiler.mark("first scene frame")
+                startupProfiler.report()
+                self.profileStartup = False
+
+    def _renderScene(self, positions, simulatedTime):
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
         projection = self.camera.getProjectionMatrix(WINDOW_WIDTH, WINDOW_HEIGHT)
         view = self.camera.getViewMatrix()
 
-        self.shaderProgram.use()
-        self.shaderProgram.setUniformMat4("projection", projection)
-        self.shaderProgram.setUniformMat4("view", view)
-        self.shaderProgram.setUniformVec3("viewPos", self.camera.position)
-
+        scaledPositions = positions * POSITION_SCALE_FACTOR
         # Get Sun's position for lighting
-        sun_body = next((body for body in self.celestialBodies if body.name == "Sun"), None)
-        if sun_body:
+        lightDirection = (0.0, 0.0, 0.0)
+        if self.sunIndex is not None:
             # Light direction is from fragment to sun. Assuming sun is source.
             # If Sun is at [0,0,0], light direction from any point is normalized(-FragPos).
             # If sun moves, it's normalize(sun_pos_scaled - FragPos_scaled).
             # For simplicity, assume distant light from the direction of sun.
             # Let's use the sun's actual scaled position as the light's position.
-            scaled_sun_position = sun_body.position * POSITION_SCALE_FACTOR
-            self.shaderProgram.setUniformVec3("lightDirection", glm.normalize(glm.vec3(scaled_sun_position[0], scaled_sun_position[1], scaled_sun_position[2]))) # Direction from origin to sun
+            scaled_sun_position = scaledPositions[self.sunIndex]
+            lightDirection = glm.normalize(glm.vec3(scaled_sun_position[0], scaled_sun_position[1], scaled_sun_position[2])) # Direction from origin to sun
 
             # For the Sun, it emits light, so it should appear fully lit
             # We can handle this by sending different uniforms or drawing it with a separate "unlit" shader.
             # For now, it will be lit by itself, which looks okay.
 
-        # Render each celestial body
-        for body in self.celestialBodies:
-            scaled_position = body.position * POSITION_SCALE_FACTOR
-            scaled_radius = body.radius * RADIUS_SCALE_FACTOR
+        # Camera and light for every program in one uniform buffer update
+        self.frameUniforms.update(projection, view, self.camera.position, lightDirection, (1.0, 1.0, 1.0)) # White light
 
-            modelMatrix = glm.mat4(1.0)
-            modelMatrix = glm.translate(modelMatrix, glm.vec3(scaled_position[0], scaled_position[1], scaled_position[2]))
-            modelMatrix = glm.scale(modelMatrix, glm.vec3(scaled_radius, scaled_radius, scaled_radius))
+        # Culling: bodies outside the view frustum are skipped, and those under
+        # IMPOSTOR_SCREEN_RADIUS pixels are drawn as point sprites in one call
+        scaledRadii = self.bodyStore.radii * RADIUS_SCALE_FACTOR
+        screenRadii = self.camera.screenRadii(scaledPositions, scaledRadii, WINDOW_HEIGHT)
+        visible = self.camera.spheresInFrustum(scaledPositions, scaledRadii, WINDOW_WIDTH / WINDOW_HEIGHT) \
+                  & ((self.bodyStore.flags & FLAG_MERGED) == 0)
+        spheres = visible & (screenRadii >= IMPOSTOR_SCREEN_RADIUS)
+        self.impostorRenderer.update(scaledPositions, np.flatnonzero(visible & ~spheres))
+        self.impostorRenderer.render()
 
-            self.shaderProgram.setUniformMat4("model", modelMatrix)
-            
-            glActiveTexture(GL_TEXTURE0)
-            glBindTexture(GL_TEXTURE_2D, body.textureId)
+        # Texture tiers and sphere detail follow on-screen size: bodies with a high tier resident are
+        # drawn on their own, all the others with one instanced draw call per sphere level of detail
+        screenRadii = np.where(spheres, screenRadii, 0.0) # Culled bodies neither want nor keep high tiers
+        textureIds = self.textureManager.update(screenRadii)
+        highTier = np.flatnonzero(spheres & (textureIds != 0))
+        self.bodyRenderer.update(scaledPositions, scaledRadii, screenRadii, np.flatnonzero(spheres & (textureIds == 0)))
+        self.bodyRenderer.render()
+        self.bodyRenderer.renderTextured(self.shaderProgram, scaledPositions, scaledRadii, screenRadii, highTier, textureIds)
 
-            self.sphereMesh.draw()
+        # Render the bodies' rings (Saturn)
+        for bodyName, ringRenderer in self.ringRenderers.items():
+            # RingRenderer will handle its own model matrix creation based on the body's position
+            ringPosition = scaledPositions[self.bodyStore.indexOf(bodyName)]
+            if self.camera.spheresInFrustum(ringPosition[np.newaxis], np.array([ringRenderer.outerRadius]),
+                                            WINDOW_WIDTH / WINDOW_HEIGHT)[0]:
+                ringRenderer.render(self.shaderProgram, ringPosition)
+        self.shaderProgram.unuse()
 
-            # Render Saturn's rings
-            if body.name == "Saturn" and self.ringRenderer:
-                # RingRenderer will handle its own model matrix creation based on Saturn's position
-                self.ringRenderer.render(self.shaderProgram, projection, view, modelMatrix)
+        # Orbit trails, after the opaque bodies so they blend over them
+        self.trailRenderer.update(scaledPositions, simulatedTime)
+        if self.showTrails:
+            self.trailRenderer.render()
 
-        self.shaderProgram.unuse()
-        glBindTexture(GL_TEXTURE_2D, 0) # Unbind texture after rendering
+        if self.showOrbits and self.replay is None:
+            # Re-predicted whenever the physics thread publishes a new step
+            latestPositions, latestVelocities, latestTime = self.simulationThread.latestState()
+            if latestTime != self.orbitsTime:
+                orbits = predictOrbits(latestPositions, latestVelocities, self.simulator.masses, ORBIT_PREVIEW_SAMPLES,
+                                       ORBIT_PREVIEW_MAX_SPAN)
+                self.orbitRenderer.update(orbits * POSITION_SCALE_FACTOR)
+                self.orbitsTime = latestTime
+            self.orbitRenderer.render()
 
     def shutdown(self):
-        if self.sphereMesh:
-            self.sphereMesh.delete()
+        if self.simulationThread:
+            self.simulationThread.stop()
+        if self.checkpointWriter:
+            self.checkpointWriter.request(self.simulator, {"epoch": self.epochText}) # Final state
+            self.checkpointWriter.close()
+        if self.simulator:
+            self.simulator.close()
+        if self.recordWriter:
+            self.recordWriter.close()
+            self.recordWriter.stream.close()
+        for mesh in self.sphereMeshes:
+            mesh.delete()
         if self.shaderProgram:
             self.shaderProgram.delete()
-        if self.ringRenderer:
-            self.ringRenderer.delete()
-        for body in self.celestialBodies:
-            if body.textureId:
-                glDeleteTextures(1, [body.textureId])
+        if self.bodyShaderProgram:
+            self.bodyShaderProgram.delete()
+        if self.frameUniforms:
+            self.frameUniforms.delete()
+        if self.bodyRenderer:
+            self.bodyRenderer.delete()
+        if self.impostorRenderer:
+            self.impostorRenderer.delete()
+        if self.textureManager:
+            self.textureManager.delete()
+        for ringRenderer in self.ringRenderers.values():
+            ringRenderer.delete()
+        if self.trailRenderer:
+            self.trailRenderer.delete()
+        if self.orbitRenderer:
+            self.orbitRenderer.delete()
         self.windowManager.terminate()
 
 if __name__ == "__main__":
-    app = SolarSystemApp()
-    app.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Real-time solar system simulator.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print a breakdown of startup time (imports, ephemeris, mesh, textures, shaders) once the first frame is drawn")
+    parser.add_argument("--catalog", default=BODY_CATALOG, help=f"Body catalog to load (default {BODY_CATALOG})")
+    parser.add_argument("--record", default=None, metavar="PATH", help="Record every physics step to a trajectory file")
+    parser.add_argument("--replay", default=None, metavar="PATH",
+                        help="Play back a trajectory file (from --record or python -m physics.run) instead of simulating")
+    parser.add_argument("--checkpoint", default=None, metavar="PATH",
+                        help=f"Save the simulator state every {CHECKPOINT_EVERY_STEPS} steps and on exit")
+    parser.add_argument("--resume", default=None, metavar="PATH", help="Continue from a checkpoint instead of the ephemeris")
+    args = parser.parse_args()
+
+    app = SolarSystemApp(profileStartup=args.profile_startup, catalogPath=args.catalog,
+                         recordPath=args.record, replayPath=args.replay,
+                         checkpointPath=args.checkpoint, resumePath=args.resume)
+    try:
+        app.run()
+    finally:
+        app.shutdown()
\ No newline at end of file
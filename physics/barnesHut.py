@@ -0,0 +1,208 @@
+# physics/barnesHut.py
+
+import numpy as np
+
+# Bits of Morton code per axis; the tree can therefore be at most this many levels deep.
+MORTON_BITS = 21
+
+# Targets walked through the tree at once. Bounds the size of the (target, node) frontier.
+TARGETS_PER_BLOCK = 4096
+
+def _spreadBits(values):
+    # Inserts two zero bits between each of the low 21 bits: b2 b1 b0 -> b2 0 0 b1 0 0 b0
+    v = values.astype(np.uint64)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1f00000000ffff)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1f0000ff0000ff)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100f00f00f00f00f)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10c30c30c30c30c3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+def concatenateRanges(starts, counts):
+    # [start_0 .. start_0+count_0) ++ [start_1 .. start_1+count_1) ++ ... as one index array
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(np.asarray(starts, dtype=np.int64) - offsets, counts) + np.arange(total, dtype=np.int64)
+
+def _accumulate(out, targetIndex, weights, separation):
+    # out[t] += sum over pairs with that target of weights * separation
+    numTargets = len(out)
+    for axis in range(3):
+        out[:, axis] += np.bincount(targetIndex, weights=weights * separation[:, axis], minlength=numTargets)
+
+class Octree:
+    """
+    Linear octree over a set of point masses, built from array state in one pass.
+
+    Bodies are sorted by Morton code so every node owns a contiguous range of the sorted
+    arrays; nodes are stored level by level so the children of a node are contiguous too.
+    """
+    # Everything the tree walk reads; see toArrays/fromArrays
+    ARRAY_FIELDS = ("sortedPositions", "sortedMasses", "nodeStart", "nodeCount", "nodeFirstChild",
+                    "nodeChildCount", "nodeWidth", "nodeMass", "nodeCenterOfMass", "nodeOffset")
+
+    def __init__(self, positions, masses, leafSize=8):
+        positions = np.asarray(positions, dtype=np.float64)
+        masses = np.asarray(masses, dtype=np.float64)
+        numBodies = len(positions)
+        if numBodies == 0:
+            raise ValueError("Cannot build an octree without bodies")
+
+        # Root cell: the bounding cube of all bodies
+        lower = positions.min(axis=0)
+        rootWidth = float((positions.max(axis=0) - lower).max())
+        if rootWidth == 0.0:
+            rootWidth = 1.0
+        rootWidth *= 1.0 + 1e-9 # keep the farthest body strictly inside the cube
+
+        cellsPerAxis = 1 << MORTON_BITS
+        cellCoords = ((positions - lower) * (cellsPerAxis / rootWidth)).astype(np.int64)
+        np.clip(cellCoords, 0, cellsPerAxis - 1, out=cellCoords)
+        codes = (_spreadBits(cellCoords[:, 0]) << np.uint64(2)) | \
+                (_spreadBits(cellCoords[:, 1]) << np.uint64(1)) | \
+                _spreadBits(cellCoords[:, 2])
+
+        self.order = np.argsort(codes, kind='stable')
+        codes = codes[self.order]
+        cellCoords = cellCoords[self.order]
+        self.sortedPositions = positions[self.order]
+        self.sortedMasses = masses[self.order]
+
+        # Split nodes level by level until they hold at most `leafSize` bodies
+        levelStarts = [np.zeros(1, dtype=np.int64)]
+        levelCounts = [np.array([numBodies], dtype=np.int64)]
+        levelDepths = [np.zeros(1, dtype=np.int64)]
+        parentLinks = [] # (parent index, first child index, child count) per level
+        numNodes = 1
+        currentIndex = np.zeros(1, dtype=np.int64)
+        for depth in range(MORTON_BITS):
+            split = levelCounts[-1] > leafSize
+            if not split.any():
+                break
+            parentStarts = levelStarts[-1][split]
+            parentCounts = levelCounts[-1][split]
+            parentIndex = currentIndex[split]
+
+            bodyIndex = concatenateRanges(parentStarts, parentCounts)
+            parentOfBody = np.repeat(parentIndex, parentCounts)
+            childKeys = codes[bodyIndex] >> np.uint64(3 * (MORTON_BITS - depth - 1))
+
+            boundary = np.empty(len(bodyIndex), dtype=bool)
+            boundary[0] = True
+            boundary[1:] = (childKeys[1:] != childKeys[:-1]) | (parentOfBody[1:] != parentOfBody[:-1])
+            boundaryAt = np.flatnonzero(boundary)
+
+            childStarts = bodyIndex[boundaryAt]
+            childCounts = np.diff(np.append(boundaryAt, len(bodyIndex)))
+            childParents = parentOfBody[boundaryAt]
+            childIndex = numNodes + np.arange(len(childStarts), dtype=np.int64)
+
+            parents, firstOfParent, childrenPerParent = np.unique(childParents, return_index=True, return_counts=True)
+            parentLinks.append((parents, childIndex[firstOfParent], childrenPerParent))
+
+            levelStarts.append(childStarts)
+            levelCounts.append(childCounts)
+            levelDepths.append(np.full(len(childStarts), depth + 1, dtype=np.int64))
+            currentIndex = childIndex
+            numNodes += len(childStarts)
+
+        self.nodeStart = np.concatenate(levelStarts)
+        self.nodeCount = np.concatenate(levelCounts)
+        nodeDepth = np.concatenate(levelDepths)
+        self.nodeFirstChild = np.full(numNodes, -1, dtype=np.int64)
+        self.nodeChildCount = np.zeros(numNodes, dtype=np.int64)
+        for parents, firstChild, childCount in parentLinks:
+            self.nodeFirstChild[parents] = firstChild
+            self.nodeChildCount[parents] = childCount
+
+        # Cell geometry, recovered from the integer coordinates of any body in the cell
+        self.nodeWidth = rootWidth / (2.0 ** nodeDepth)
+        cellIndex = cellCoords[self.nodeStart] >> (MORTON_BITS - nodeDepth)[:, np.newaxis]
+        nodeCenter = lower + (cellIndex + 0.5) * self.nodeWidth[:, np.newaxis]
+
+        # Monopole moments, summed over each node's own range (pairs of reduceat bounds)
+        bounds = np.empty(2 * numNodes, dtype=np.int64)
+        bounds[0::2] = self.nodeStart
+        bounds[1::2] = self.nodeStart + self.nodeCount
+        paddedMasses = np.append(self.sortedMasses, 0.0)
+        paddedMoments = np.vstack([self.sortedPositions * self.sortedMasses[:, np.newaxis], np.zeros((1, 3))])
+        self.nodeMass = np.add.reduceat(paddedMasses, bounds)[0::2]
+        moments = np.add.reduceat(paddedMoments, bounds, axis=0)[0::2]
+
+        self.nodeCenterOfMass = nodeCenter.copy()
+        hasMass = self.nodeMass > 0.0
+        self.nodeCenterOfMass[hasMass] = moments[hasMass] / self.nodeMass[hasMass, np.newaxis]
+        # Offset between the centre of mass and the cell centre, used by the opening test
+        self.nodeOffset = np.linalg.norm(self.nodeCenterOfMass - nodeCenter, axis=1)
+
+    def toArrays(self):
+        # The tree as plain arrays, e.g. to hand to other processes
+        return {field: getattr(self, field) for field in self.ARRAY_FIELDS}
+
+    @classmethod
+    def fromArrays(cls, arrays):
+        # Rebuilds a walkable tree from toArrays() output without re-sorting anything
+        tree = cls.__new__(cls)
+        for field in cls.ARRAY_FIELDS:
+            setattr(tree, field, arrays[field])
+        return tree
+
+    def computeAccelerations(self, targetPositions, G, theta, out=None):
+        """
+        Accelerations at `targetPositions` (T, 3) from the bodies in the tree.
+
+        A node is treated as a point mass at its centre of mass when
+        |x - com| > width / theta + |com - cell centre|, otherwise it is opened;
+        leaves that must be opened are summed directly. Zero separations contribute nothing.
+        For theta <= 1 a node is never accepted by a target inside its own cell.
+        """
+        targetPositions = np.asarray(targetPositions, dtype=np.float64)
+        if out is None:
+            out = np.empty((len(targetPositions), 3), dtype=np.float64)
+        out.fill(0.0)
+
+        for start in range(0, len(targetPositions), TARGETS_PER_BLOCK):
+            stop = min(start + TARGETS_PER_BLOCK, len(targetPositions))
+            self._walk(targetPositions[start:stop], out[start:stop], theta)
+
+        out *= G
+        return out
+
+    def _walk(self, targets, out, theta):
+        # Frontier of (target, node) pairs still to be resolved, starting at the root
+        pairTarget = np.arange(len(targets), dtype=np.int64)
+        pairNode = np.zeros(len(targets), dtype=np.int64)
+
+        while len(pairTarget):
+            separation = self.nodeCenterOfMass[pairNode] - targets[pairTarget]
+            distanceSquared = np.einsum('ij,ij->i', separation, separation)
+            openingDistance = self.nodeWidth[pairNode] / theta + self.nodeOffset[pairNode]
+            accepted = distanceSquared > openingDistance * openingDistance
+
+            if accepted.any():
+                weights = self.nodeMass[pairNode[accepted]] * distanceSquared[accepted] ** -1.5
+                _accumulate(out, pairTarget[accepted], weights, separation[accepted])
+
+            opened = ~accepted
+            isLeaf = self.nodeFirstChild[pairNode] < 0
+
+            leafPairs = opened & isLeaf
+            if leafPairs.any():
+                leafNodes = pairNode[leafPairs]
+                counts = self.nodeCount[leafNodes]
+                bodyIndex = concatenateRanges(self.nodeStart[leafNodes], counts)
+                bodyTarget = np.repeat(pairTarget[leafPairs], counts)
+                bodySeparation = self.sortedPositions[bodyIndex] - targets[bodyTarget]
+                bodyDistanceSquared = np.einsum('ij,ij->i', bodySeparation, bodySeparation)
+                with np.errstate(divide='ignore'):
+                    weights = bodyDistanceSquared ** -1.5
+                weights[bodyDistanceSquared == 0.0] = 0.0
+                weights *= self.sortedMasses[bodyIndex]
+                _accumulate(out, bodyTarget, weights, bodySeparation)
+
+            innerPairs = opened & ~isLeaf
+            innerNodes = pairNode[innerPairs]
+            childCounts = self.nodeChildCount[innerNodes]
+            pairTarget = np.repeat(pairTarget[innerPairs], childCounts)
+            pairNode = concatenateRanges(self.nodeFirstChild[innerNodes], childCounts)
@@ -0,0 +1,145 @@
+# physics/checkpoint.py
+
+import json
+import os
+import threading
+import numpy as np
+
+from config import PHYSICS_WORKERS
+from entities.bodyStore import BodyStore
+from physics.integrators import getIntegrator
+from physics.nBodySimulator import NBodySimulator
+
+# A checkpoint is an uncompressed .npz archive: one array per state column plus 'metadata',
+# UTF-8 JSON (body names, time, integrator settings, ...) stored as a uint8 array.
+CHECKPOINT_VERSION = 1
+_ARRAY_FIELDS = ("positions", "velocities", "masses", "radii", "flags", "particle_positions", "particle_velocities")
+
+def captureCheckpoint(simulator, extra=None):
+    """
+    Copies everything needed to continue `simulator` bit-for-bit. Call it between steps (on the
+    thread that steps the simulator); the result can then be written out on any thread.
+    Integrators leave positions and velocities synchronised at the end of a step, so there
+    is no half-step state to save, and cached accelerations are recomputed identically.
+    """
+    store = simulator.store
+    arrays = {
+        "positions": store.positions.copy(),
+        "velocities": store.velocities.copy(),
+        "masses": store.masses.copy(),
+        "radii": store.radii.copy(),
+        "flags": store.flags.copy(),
+        "particle_positions": simulator.particle_positions.copy(),
+        "particle_velocities": simulator.particle_velocities.copy(),
+    }
+    metadata = {
+        "version": CHECKPOINT_VERSION,
+        "names": list(store.names),
+        "texture_paths": list(store.texturePaths),
+        "time": simulator.time,
+        "time_step": simulator.time_step,
+        "integrator": simulator.integrator.name,
+        "integrator_settings": simulator.integrator.settings(),
+        "theta": simulator.theta,
+        "tree_threshold": simulator.tree_threshold,
+        "extra": extra or {}, # Caller data, e.g. the initial epoch
+    }
+    return arrays, metadata
+
+def writeCheckpoint(path, checkpoint):
+    # Written to a temporary file and renamed, so a crash mid-write keeps the previous checkpoint
+    arrays, metadata = checkpoint
+    temporaryPath = f"{path}.{os.getpid()}.tmp"
+    with open(temporaryPath, "wb") as f:
+        np.savez(f, metadata=np.frombuffer(json.dumps(metadata).encode("utf-8"), dtype=np.uint8), **arrays)
+    os.replace(temporaryPath, path)
+
+def saveCheckpoint(simulator, path, extra=None):
+    writeCheckpoint(path, captureCheckpoint(simulator, extra))
+
+def loadCheckpoint(path, workers=PHYSICS_WORKERS):
+    """
+    Rebuilds the simulator saved in a checkpoint file.
+    Returns (simulator, extra), where `extra` is what was passed to saveCheckpoint.
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        metadata = json.loads(archive["metadata"].tobytes().decode("utf-8"))
+        if metadata.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{path}: unsupported checkpoint version {metadata.get('version')}")
+        arrays = {field: archive[field] for field in _ARRAY_FIELDS}
+
+    store = BodyStore(metadata["names"], arrays["masses"], arrays["radii"], arrays["positions"], arrays["velocities"],
+                      metadata["texture_paths"], arrays["flags"])
+    integrator = getIntegrator(metadata["integrator"])
+    if metadata["integrator_settings"]:
+        integrator = type(integrator)(**metadata["integrator_settings"])
+
+    simulator = NBodySimulator(store, metadata["time_step"], integrator=integrator, theta=metadata["theta"],
+                               tree_threshold=metadata["tree_threshold"], workers=workers)
+    if len(arrays["particle_positions"]):
+        simulator.addTestParticles(arrays["particle_positions"], arrays["particle_velocities"])
+    simulator.time = metadata["time"]
+    return simulator, metadata["extra"]
+
+class CheckpointWriter(threading.Thread):
+    """
+    Writes checkpoints on a background thread so the simulation loop only pays for copying
+    the state. If a new checkpoint is requested while one is still being written, only the
+    newest pending one is kept. Errors are kept in `error` and raised again by close().
+    """
+    def __init__(self, path):
+        super().__init__(name="CheckpointWriter", daemon=True)
+        self.path = path
+        self.error = None
+        self.checkpointsWritten = 0
+        self._pending = None
+        self._closing = False
+        self._condition = threading.Condition()
+        self.start()
+
+    def request(self, simulator, extra=None):
+        checkpoint = captureCheckpoint(simulator, extra)
+        with self._condition:
+            self._pending = checkpoint
+            self._condition.notify()
+
+    def run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closing:
+                    self._condition.wait()
+                checkpoint, self._pending = self._pending, None
+                if checkpoint is None:
+                    return
+            try:
+                writeCheckpoint(self.path, checkpoint)
+                self.checkpointsWritten += 1
+            except Exception as e:
+                self.error = e
+
+    def close(self):
+        # Writes any pending checkpoint, then stops the thread
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        self.join()
+        if self.error:
+            raise self.error
+
+class PeriodicCheckpointer:
+    """
+    Requests a checkpoint of `simulator` every `everySteps` calls to append(). It has the
+    recorder interface, so it can be handed to SimulationThread(recorders=...) or called after
+    each step of a batch loop; the state is captured there, between steps.
+    """
+    def __init__(self, simulator, writer, everySteps, extra=None):
+        self.simulator = simulator
+        self.writer = writer
+        self.everySteps = max(1, int(everySteps))
+        self.extra = extra
+        self._steps = 0
+
+    def append(self, time, positions, velocities=None):
+        self._steps += 1
+        if self._steps % self.everySteps == 0:
+            self.writer.request(self.simulator, self.extra)
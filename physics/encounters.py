@@ -0,0 +1,221 @@
+# physics/encounters.py
+
+import numpy as np
+
+from config import ENCOUNTER_RADIUS_FACTOR
+from entities.bodyStore import FLAG_MERGED
+from physics.barnesHut import concatenateRanges
+
+APPROACH = "approach"
+IMPACT = "impact"
+
+def _selfOverlaps(lower, upper):
+    # Sweep and prune over one set of intervals: all pairs (i, j), i != j, that overlap
+    order = np.argsort(lower, kind='stable')
+    sortedLower = lower[order]
+    # Everything after i in sweep order whose interval starts before i's ends overlaps it
+    ends = np.searchsorted(sortedLower, upper[order], side='right')
+    counts = ends - np.arange(1, len(order) + 1)
+    first = np.repeat(np.arange(len(order)), counts)
+    second = concatenateRanges(np.arange(1, len(order) + 1), counts)
+    return order[first], order[second]
+
+def _crossOverlaps(lowerA, upperA, lowerB, upperB):
+    # Sweep and prune between two sets: all (a, b) whose intervals overlap. Each pair is found
+    # from whichever interval starts first, so no pair is reported twice.
+    orderA = np.argsort(lowerA, kind='stable')
+    orderB = np.argsort(lowerB, kind='stable')
+    sortedA, sortedB = lowerA[orderA], lowerB[orderB]
+
+    # b starting inside a (lowerA <= lowerB <= upperA)
+    starts = np.searchsorted(sortedB, lowerA, side='left')
+    counts = np.searchsorted(sortedB, upperA, side='right') - starts
+    pairA = [np.repeat(np.arange(len(lowerA)), counts)]
+    pairB = [orderB[concatenateRanges(starts, counts)]]
+
+    # a starting inside b (lowerB < lowerA <= upperB)
+    starts = np.searchsorted(sortedA, lowerB, side='right')
+    counts = np.searchsorted(sortedA, upperB, side='right') - starts
+    pairA.append(orderA[concatenateRanges(starts, counts)])
+    pairB.append(np.repeat(np.arange(len(lowerB)), counts))
+    return np.concatenate(pairA), np.concatenate(pairB)
+
+def _sweptIntervals(positions, velocities, reach, axis, dt):
+    # Extent along `axis` of each object over the last step (moving back by v*dt), padded by `reach`
+    now = positions[:, axis]
+    before = now - velocities[:, axis] * dt
+    return np.minimum(now, before) - reach, np.maximum(now, before) + reach
+
+def _closestApproach(positions, velocities, first, second, dt):
+    # Minimum separation of each pair over the last step, assuming straight-line relative motion,
+    # and when it happened (in [-dt, 0] relative to now)
+    separation = positions[second] - positions[first]
+    relativeVelocity = velocities[second] - velocities[first]
+    speedSquared = np.einsum('ij,ij->i', relativeVelocity, relativeVelocity)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offset = -np.einsum('ij,ij->i', separation, relativeVelocity) / speedSquared
+    offset = np.clip(np.nan_to_num(offset, nan=0.0, posinf=0.0, neginf=0.0), -dt, 0.0)
+    closest = separation + relativeVelocity * offset[:, np.newaxis]
+    return np.sqrt(np.einsum('ij,ij->i', closest, closest)), offset
+
+class EncounterEvent:
+    __slots__ = ("time", "kind", "first", "second", "distance", "merged")
+
+    def __init__(self, time, kind, first, second, distance, merged=False):
+        self.time = time         # Simulated seconds
+        self.kind = kind         # APPROACH or IMPACT
+        self.first = first       # Body names; test particles are 'particle <index>'
+        self.second = second
+        self.distance = distance # Closest separation of the centres, meters
+        self.merged = merged     # Whether the impact merged the two
+
+    def toDict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return (f"EncounterEvent({self.kind} {self.first} - {self.second} at t={self.time:.0f} s, "
+                f"{self.distance / 1000.0:.0f} km{', merged' if self.merged else ''})")
+
+class EncounterMonitor:
+    """
+    Finds close approaches and impacts after each step of an NBodySimulator.
+
+    Two objects approach when their centres come within `radiusFactor` times the sum of their
+    radii, and impact when within the sum itself (test particles have zero radius). Candidate
+    pairs come from sweep and prune along the axis where the objects are most spread out,
+    using each object's swept extent over the step, so the cost stays near-linear in the number
+    of objects and fast flybys between two steps are not missed. Test particles are only
+    checked against bodies, never against each other.
+
+    Each approach and each impact is logged once, when it starts. With `mergeOnImpact`, colliding bodies merge
+    into the more massive one (conserving mass and momentum, and volume for the radius) and
+    test particles that hit a body are removed. Absorbed bodies keep their row, flagged
+    FLAG_MERGED with zero mass and radius, so array shapes never change.
+
+    It has the recorder interface: call append() after every step, or pass the monitor to
+    SimulationThread(recorders=...). Events are kept in `events` and passed to `onEvent`.
+    """
+    def __init__(self, simulator, radiusFactor=ENCOUNTER_RADIUS_FACTOR, mergeOnImpact=False, onEvent=None):
+        self.simulator = simulator
+        self.radiusFactor = radiusFactor
+        self.mergeOnImpact = mergeOnImpact
+        self.onEvent = onEvent
+        self.events = []
+        self._activeApproaches = set()
+        self._activeImpacts = set()
+
+    def append(self, time, positions=None, velocities=None):
+        self.check()
+
+    @staticmethod
+    def _key(kind, first, second):
+        # Body pairs come out of the sweep in either order; particle pairs are (particle, body)
+        first, second = int(first), int(second)
+        return (kind, min(first, second), max(first, second)) if kind == "body" else (kind, first, second)
+
+    def _emit(self, event):
+        self.events.append(event)
+        if self.onEvent:
+            self.onEvent(event)
+
+    def _candidatePairs(self, dt):
+        # (body pairs, (particle, body) pairs) whose swept extents overlap along the sweep axis
+        simulator = self.simulator
+        store = simulator.store
+        active = np.flatnonzero((store.flags & FLAG_MERGED) == 0)
+        reach = store.radii[active] * self.radiusFactor
+        axis = int(np.argmax(np.ptp(simulator.positions[active], axis=0))) if len(active) > 1 else 0
+
+        lower, upper = _sweptIntervals(simulator.positions[active], simulator.velocities[active], reach, axis, dt)
+        first, second = _selfOverlaps(lower, upper)
+        bodyPairs = (active[first], active[second])
+
+        particlePairs = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        if len(simulator.particle_positions):
+            particleLower, particleUpper = _sweptIntervals(simulator.particle_positions, simulator.particle_velocities,
+                                                           0.0, axis, dt)
+            particles, bodies = _crossOverlaps(particleLower, particleUpper, lower, upper)
+            particlePairs = (particles, active[bodies])
+        return bodyPairs, particlePairs
+
+    def check(self):
+        simulator = self.simulator
+        store = simulator.store
+        dt = simulator.time_step
+        (first, second), (particles, particleBodies) = self._candidatePairs(dt)
+
+        distance, offset = _closestApproach(simulator.positions, simulator.velocities, first, second, dt)
+        contact = store.radii[first] + store.radii[second]
+        particleDistance, particleOffset = _closestApproach(
+            np.concatenate([simulator.particle_positions, simulator.positions]),
+            np.concatenate([simulator.particle_velocities, simulator.velocities]),
+            particles, particleBodies + len(simulator.particle_positions), dt)
+        particleContact = store.radii[particleBodies]
+
+        # Approaches: log those that were not already in progress after the previous step
+        approaching = set()
+        for kind, pairs, distances, offsets, limits in (
+                ("body", (first, second), distance, offset, contact),
+                ("particle", (particles, particleBodies), particleDistance, particleOffset, particleContact)):
+            within = np.flatnonzero((distances <= limits * self.radiusFactor) & (distances > limits))
+            for k in within:
+                key = self._key(kind, pairs[0][k], pairs[1][k])
+                approaching.add(key)
+                if key not in self._activeApproaches:
+                    self._emit(EncounterEvent(simulator.time + offsets[k], APPROACH, self._name(kind, pairs[0][k]),
+                                              store.names[pairs[1][k]], float(distances[k])))
+        self._activeApproaches = approaching
+
+        # Impacts, earliest first; without merging, bodies that stay in contact are not reported again
+        impacting = set()
+        impacts = np.flatnonzero(distance <= contact)
+        for k in impacts[np.argsort(offset[impacts], kind='stable')]:
+            i, j = int(first[k]), int(second[k])
+            if (store.flags[i] | store.flags[j]) & FLAG_MERGED:
+                continue # One of them was absorbed earlier this step
+            key = self._key("body", i, j)
+            impacting.add(key)
+            if key in self._activeImpacts:
+                continue
+            if self.mergeOnImpact:
+                self._merge(i, j)
+            self._emit(EncounterEvent(simulator.time + offset[k], IMPACT, store.names[i], store.names[j],
+                                      float(distance[k]), merged=self.mergeOnImpact))
+
+        particleImpacts = np.flatnonzero(particleDistance <= particleContact)
+        for k in particleImpacts:
+            key = self._key("particle", particles[k], particleBodies[k])
+            impacting.add(key)
+            if key not in self._activeImpacts:
+                self._emit(EncounterEvent(simulator.time + particleOffset[k], IMPACT, self._name("particle", particles[k]),
+                                          store.names[particleBodies[k]], float(particleDistance[k]), merged=self.mergeOnImpact))
+        self._activeImpacts = impacting
+        if self.mergeOnImpact and len(particleImpacts):
+            # Particle indices shift once the impactors are removed
+            simulator.removeTestParticles(np.unique(particles[particleImpacts]))
+            self._activeApproaches = {key for key in self._activeApproaches if key[0] == "body"}
+            self._activeImpacts = {key for key in self._activeImpacts if key[0] == "body"}
+
+    def _name(self, kind, index):
+        return f"particle {index}" if kind == "particle" else self.simulator.store.names[index]
+
+    def _merge(self, i, j):
+        # Perfectly inelastic merge of bodies i and j into the more massive one
+        simulator = self.simulator
+        store = simulator.store
+        survivor, absorbed = (i, j) if store.masses[i] >= store.masses[j] else (j, i)
+        m1, m2 = store.masses[survivor], store.masses[absorbed]
+        total = m1 + m2
+        if total > 0.0:
+            store.positions[survivor] = (m1 * store.positions[survivor] + m2 * store.positions[absorbed]) / total
+            store.velocities[survivor] = (m1 * store.velocities[survivor] + m2 * store.velocities[absorbed]) / total
+        store.masses[survivor] = total
+        store.radii[survivor] = np.cbrt(store.radii[survivor] ** 3 + store.radii[absorbed] ** 3)
+
+        # The absorbed row rides along with the survivor as an inert, invisible tracer
+        store.masses[absorbed] = 0.0
+        store.radii[absorbed] = 0.0
+        store.flags[absorbed] |= FLAG_MERGED
+        store.positions[absorbed] = store.positions[survivor]
+        store.velocities[absorbed] = store.velocities[survivor]
+        simulator.massesChanged()
@@ -0,0 +1,172 @@
+# physics/ensemble.py
+#
+# Monte-Carlo ensembles: M perturbed copies of one system advanced together.
+# python -m physics.ensemble --members 256 --years 100 --dt 1d --processes 4 --out summary.json
+
+import argparse
+import json
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from config import GRAVITATIONAL_CONSTANT, INTEGRATOR
+from physics.gravity import computeBatchedAccelerations
+from physics.integrators import CompositionIntegrator, getIntegrator
+
+def perturbInitialConditions(positions, velocities, members, positionSigma, velocitySigma, seed=None):
+    """
+    Stacks `members` copies of an (N, 3) initial state into (M, N, 3) arrays, adding Gaussian
+    noise with standard deviations `positionSigma` (m) and `velocitySigma` (m/s) per component.
+    Member 0 is left unperturbed as the nominal solution.
+    """
+    rng = np.random.default_rng(seed)
+    positions = np.asarray(positions, dtype=np.float64)
+    velocities = np.asarray(velocities, dtype=np.float64)
+    ensemblePositions = np.repeat(positions[np.newaxis], members, axis=0)
+    ensembleVelocities = np.repeat(velocities[np.newaxis], members, axis=0)
+    ensemblePositions[1:] += rng.normal(0.0, positionSigma, ensemblePositions[1:].shape)
+    ensembleVelocities[1:] += rng.normal(0.0, velocitySigma, ensembleVelocities[1:].shape)
+    return ensemblePositions, ensembleVelocities
+
+class EnsembleSimulator:
+    """
+    Advances M copies of an N-body system in lock-step on (M, N, 3) arrays, with one batched
+    force kernel per kick instead of M separate simulators. Works with the drift/kick
+    composition integrators ('leapfrog', 'yoshida4', 'forest-ruth').
+    """
+    def __init__(self, positions, velocities, masses, time_step, integrator=INTEGRATOR):
+        self.positions = np.array(positions, dtype=np.float64)
+        self.velocities = np.array(velocities, dtype=np.float64)
+        self.masses = np.asarray(masses, dtype=np.float64)
+        self.time_step = time_step
+        self.integrator = getIntegrator(integrator)
+        if not isinstance(self.integrator, CompositionIntegrator):
+            raise ValueError(f"Ensembles need a drift/kick integrator, not '{self.integrator.name}'")
+        self.time = 0.0
+
+        self._accelerations = np.zeros_like(self.positions)
+        self._accelerations_valid = False
+        self.initial_energies = self.energies()
+        self.initial_angular_momenta = self.angularMomenta()
+
+    def drift(self, h):
+        self.positions += self.velocities * h
+        self._accelerations_valid = False
+
+    def kick(self, h):
+        if not self._accelerations_valid:
+            computeBatchedAccelerations(self.positions, self.masses, GRAVITATIONAL_CONSTANT, out=self._accelerations)
+            self._accelerations_valid = True
+        self.velocities += self._accelerations * h
+
+    def update(self):
+        self.integrator.step(self, self.time_step)
+        self.time += self.time_step
+
+    def energies(self):
+        # Total energy of each member, (M,)
+        kinetic = 0.5 * np.einsum('j,mjk,mjk->m', self.masses, self.velocities, self.velocities)
+        separation = self.positions[:, np.newaxis, :, :] - self.positions[:, :, np.newaxis, :]
+        distance = np.sqrt(np.einsum('mijk,mijk->mij', separation, separation))
+        i, j = np.triu_indices(len(self.masses), k=1)
+        potential = -GRAVITATIONAL_CONSTANT * np.sum(self.masses[i] * self.masses[j] / distance[:, i, j], axis=1)
+        return kinetic + potential
+
+    def angularMomenta(self):
+        # Total angular momentum vector of each member, (M, 3)
+        return np.einsum('j,mjk->mk', self.masses, np.cross(self.positions, self.velocities))
+
+    def summary(self):
+        """
+        Per-member statistics as a dict of arrays with leading dimension M:
+        relative energy and angular momentum drift since the start, and each body's
+        distance from its position in member 0 (the nominal, unperturbed run).
+        """
+        angularMomentumDrift = np.linalg.norm(self.angularMomenta() - self.initial_angular_momenta, axis=1)
+        return {
+            "time": np.full(len(self.positions), self.time),
+            "relative_energy_error": np.abs((self.energies() - self.initial_energies) / self.initial_energies),
+            "relative_angular_momentum_error": angularMomentumDrift / np.linalg.norm(self.initial_angular_momenta, axis=1),
+            "deviation_from_nominal": np.linalg.norm(self.positions - self.positions[0], axis=2),
+        }
+
+def _runShard(positions, velocities, masses, time_step, numSteps, integrator):
+    simulator = EnsembleSimulator(positions, velocities, masses, time_step, integrator)
+    for _ in range(numSteps):
+        simulator.update()
+    summary = simulator.summary()
+    return summary, simulator.positions, simulator.velocities
+
+def runEnsemble(positions, velocities, masses, time_step, numSteps, integrator=INTEGRATOR, processes=1):
+    """
+    Runs an (M, N, 3) ensemble for `numSteps` steps, optionally sharded across `processes`
+    worker processes (each advancing a contiguous slice of members in one batch).
+    The deviation from nominal is measured against member 0 of the whole ensemble.
+    Returns (summary, final positions, final velocities).
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    velocities = np.asarray(velocities, dtype=np.float64)
+    processes = max(1, min(processes, len(positions)))
+    if processes == 1:
+        return _runShard(positions, velocities, masses, time_step, numSteps, integrator)
+
+    bounds = np.linspace(0, len(positions), processes + 1).astype(int)
+    with ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(_runShard, positions[start:stop], velocities[start:stop], masses,
+                               time_step, numSteps, integrator)
+                   for start, stop in zip(bounds[:-1], bounds[1:])]
+        results = [future.result() for future in futures]
+
+    summary = {key: np.concatenate([result[0][key] for result in results]) for key in results[0][0]}
+    finalPositions = np.concatenate([result[1] for result in results])
+    finalVelocities = np.concatenate([result[2] for result in results])
+    summary["deviation_from_nominal"] = np.linalg.norm(finalPositions - finalPositions[0], axis=2)
+    return summary, finalPositions, finalVelocities
+
+def main(argv=None):
+    from physics.run import parseDuration, loadInitialBodies, SECONDS_PER_UNIT
+
+    parser = argparse.ArgumentParser(prog="python -m physics.ensemble", description="Run an ensemble of perturbed solar systems.")
+    parser.add_argument("--members", type=int, default=64, help="Ensemble size, including the nominal member (default 64)")
+    parser.add_argument("--years", type=float, default=1.0, help="Simulated span in years (default 1)")
+    parser.add_argument("--dt", type=parseDuration, default=parseDuration("1d"), help="Time step, e.g. 6h (default 1d)")
+    parser.add_argument("--position-sigma", type=float, default=1e3, help="Position noise per component in meters (default 1e3)")
+    parser.add_argument("--velocity-sigma", type=float, default=1e-3, help="Velocity noise per component in m/s (default 1e-3)")
+    parser.add_argument("--integrator", default=INTEGRATOR, help=f"Drift/kick integrator name (default {INTEGRATOR})")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to shard members across (default 1)")
+    parser.add_argument("--catalog", default=None, help="Body catalog file (default: config.BODY_CATALOG)")
+    parser.add_argument("--epoch", default=None, help="Initial epoch, any astropy Time string (default: today, 00:00 UTC)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for the perturbations")
+    parser.add_argument("--out", default="-", help="JSON summary file, or '-' for stdout (default)")
+    args = parser.parse_args(argv)
+
+    bodies, epoch = loadInitialBodies(args.epoch, args.catalog)
+    masses = np.array([body.mass for body in bodies])
+    positions, velocities = perturbInitialConditions([body.position for body in bodies], [body.velocity for body in bodies],
+                                                     args.members, args.position_sigma, args.velocity_sigma, args.seed)
+    numSteps = math.ceil(args.years * SECONDS_PER_UNIT["y"] / args.dt)
+
+    started = time.perf_counter()
+    summary, _, _ = runEnsemble(positions, velocities, masses, args.dt, numSteps, args.integrator, args.processes)
+    elapsed = time.perf_counter() - started
+    print(f"{args.members} members x {numSteps} steps in {elapsed:.2f} s "
+          f"({args.members * numSteps / max(elapsed, 1e-9):.0f} member-steps/s)", file=sys.stderr)
+
+    report = {
+        "bodies": [body.name for body in bodies],
+        "epoch": epoch.isot,
+        "dt": args.dt,
+        "steps": numSteps,
+        "integrator": args.integrator,
+        "members": {key: value.tolist() for key, value in summary.items()},
+    }
+    if args.out == "-":
+        json.dump(report, sys.stdout)
+    else:
+        with open(args.out, "w") as f:
+            json.dump(report, f)
+
+if __name__ == "__main__":
+    main()
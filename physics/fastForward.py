@@ -0,0 +1,204 @@
+# physics/fastForward.py
+
+import numpy as np
+
+from config import GRAVITATIONAL_CONSTANT
+from physics.kepler import keplerDrift
+
+def assignPrimaries(positions, masses):
+    """
+    The body each body orbits: the heavier body with the smallest Hill sphere that contains it,
+    or else the most massive body (the central body, whose own primary is -1). Moons therefore
+    orbit their planet and planets the Sun.
+    Returns (primaries, hillRadii); the central body's Hill radius is infinite.
+    """
+    numBodies = len(masses)
+    order = np.argsort(-masses, kind='stable')
+    central = order[0]
+    primaries = np.full(numBodies, central)
+    primaries[central] = -1
+    hillRadii = np.zeros(numBodies)
+    hillRadii[central] = np.inf
+
+    # Heaviest first, so every candidate primary already has its Hill radius
+    for rank in range(1, numBodies):
+        body = order[rank]
+        heavier = order[1:rank]
+        distances = np.linalg.norm(positions[heavier] - positions[body], axis=1)
+        containing = heavier[distances < hillRadii[heavier]]
+        if len(containing):
+            primaries[body] = containing[np.argmin(hillRadii[containing])]
+        primary = primaries[body]
+        if masses[primary] > 0.0:
+            distance = np.linalg.norm(positions[body] - positions[primary])
+            hillRadii[body] = distance * np.cbrt(masses[body] / (3.0 * masses[primary]))
+    return primaries, hillRadii
+
+def assignParticlePrimaries(particlePositions, positions, primaries, hillRadii):
+    # Primaries of test particles, chosen the same way as for bodies (one pass per body)
+    central = np.flatnonzero(primaries < 0)[0]
+    particlePrimaries = np.full(len(particlePositions), central)
+    smallest = np.full(len(particlePositions), np.inf)
+    for body in np.flatnonzero((primaries >= 0) & (hillRadii > 0.0)):
+        distances = np.linalg.norm(particlePositions - positions[body], axis=1)
+        inside = (distances < hillRadii[body]) & (hillRadii[body] < smallest)
+        particlePrimaries[inside] = body
+        smallest[inside] = hillRadii[body]
+    return particlePrimaries
+
+def _coincidentTracers(positions, masses):
+    # Massless rows sitting exactly on a massive one, like bodies absorbed in a merge (see
+    # physics/encounters.py), which ride along with the survivor: (tracers, their hosts)
+    _, groups = np.unique(positions, axis=0, return_inverse=True)
+    groups = groups.ravel()
+    hostOfGroup = np.full(groups.max() + 1, -1)
+    massive = np.flatnonzero(masses > 0.0)
+    hostOfGroup[groups[massive]] = massive
+    tracers = np.flatnonzero((masses == 0.0) & (hostOfGroup[groups] >= 0))
+    return tracers, hostOfGroup[groups[tracers]]
+
+def _depths(primaries):
+    # Levels of the primary hierarchy: 0 for the central body, 1 for its satellites, ...
+    depths = np.full(len(primaries), -1)
+    depths[primaries < 0] = 0
+    while (depths < 0).any():
+        pending = np.flatnonzero(depths < 0)
+        ready = depths[primaries[pending]] >= 0
+        depths[pending[ready]] = depths[primaries[pending[ready]]] + 1
+    return depths
+
+def keplerPropagate(positions, velocities, masses, dt, particlePositions=None, particleVelocities=None):
+    """
+    Moves the bodies `dt` seconds along osculating two-body orbits, with one vectorized Kepler
+    solve per level of the primary hierarchy (see assignPrimaries), so the cost is O(N)
+    whatever `dt` is. Each body's subsystem (the body plus everything orbiting it, e.g. Earth
+    and Moon) orbits its primary as a whole, and satellites orbit their primary, so the
+    barycentre of every subsystem, the whole system included, moves as it would under the full
+    dynamics, less the interactions between siblings. Test particles orbit their primaries as
+    massless bodies. Massless bodies sitting on a massive one (merged bodies) are left out of
+    the hierarchy and moved with it.
+    Returns new (positions, velocities, particlePositions, particleVelocities).
+    """
+    if particlePositions is None:
+        particlePositions = np.zeros((0, 3))
+        particleVelocities = np.zeros((0, 3))
+    tracers, hosts = _coincidentTracers(positions, masses)
+    if len(tracers):
+        kept = np.setdiff1d(np.arange(len(masses)), tracers)
+        newPositions = np.empty_like(positions)
+        newVelocities = np.empty_like(velocities)
+        newPositions[kept], newVelocities[kept], newParticlePositions, newParticleVelocities = keplerPropagate(
+            positions[kept], velocities[kept], masses[kept], dt, particlePositions, particleVelocities)
+        newPositions[tracers] = newPositions[hosts]
+        newVelocities[tracers] = newVelocities[hosts]
+        return newPositions, newVelocities, newParticlePositions, newParticleVelocities
+    primaries, hillRadii = assignPrimaries(positions, masses)
+    particlePrimaries = assignParticlePrimaries(particlePositions, positions, primaries, hillRadii)
+    depths = _depths(primaries)
+    levels = [np.flatnonzero(depths == depth) for depth in range(depths.max() + 1)]
+
+    # Mass and barycentre of each body's subsystem, accumulated from the deepest level up
+    subsystemMasses = masses.copy()
+    subsystemMoments = masses[:, np.newaxis] * positions
+    subsystemMomenta = masses[:, np.newaxis] * velocities
+    for members in reversed(levels[1:]):
+        np.add.at(subsystemMasses, primaries[members], subsystemMasses[members])
+        np.add.at(subsystemMoments, primaries[members], subsystemMoments[members])
+        np.add.at(subsystemMomenta, primaries[members], subsystemMomenta[members])
+    massive = subsystemMasses > 0.0
+    barycentres = positions.copy()
+    barycentreVelocities = velocities.copy()
+    barycentres[massive] = subsystemMoments[massive] / subsystemMasses[massive, np.newaxis]
+    barycentreVelocities[massive] = subsystemMomenta[massive] / subsystemMasses[massive, np.newaxis]
+
+    # Top down: the central subsystem (the whole system) drifts uniformly; at each level the
+    # satellites' subsystems orbit their primary body, which is then placed so that its own
+    # subsystem's barycentre is where the level above moved it
+    newBarycentres = barycentres + barycentreVelocities * dt
+    newBarycentreVelocities = barycentreVelocities.copy()
+    newPositions = newBarycentres.copy()
+    newVelocities = newBarycentreVelocities.copy()
+    for members in levels[1:]:
+        parents = primaries[members]
+        relativePositions, relativeVelocities = keplerDrift(barycentres[members] - positions[parents],
+                                                            barycentreVelocities[members] - velocities[parents],
+                                                            GRAVITATIONAL_CONSTANT * (masses[parents] + subsystemMasses[members]), dt)
+        moments = np.zeros_like(positions)
+        momenta = np.zeros_like(velocities)
+        np.add.at(moments, parents, subsystemMasses[members, np.newaxis] * relativePositions)
+        np.add.at(momenta, parents, subsystemMasses[members, np.newaxis] * relativeVelocities)
+        parentSet = np.unique(parents)
+        newPositions[parentSet] = newBarycentres[parentSet] - moments[parentSet] / subsystemMasses[parentSet, np.newaxis]
+        newVelocities[parentSet] = newBarycentreVelocities[parentSet] - momenta[parentSet] / subsystemMasses[parentSet, np.newaxis]
+        newBarycentres[members] = newPositions[parents] + relativePositions
+        newBarycentreVelocities[members] = newVelocities[parents] + relativeVelocities
+        newPositions[members] = newBarycentres[members]   # Final for bodies without satellites
+        newVelocities[members] = newBarycentreVelocities[members]
+
+    newParticlePositions = particlePositions.copy()
+    newParticleVelocities = particleVelocities.copy()
+    if len(particlePositions):
+        relativePositions, relativeVelocities = keplerDrift(particlePositions - positions[particlePrimaries],
+                                                            particleVelocities - velocities[particlePrimaries],
+                                                            GRAVITATIONAL_CONSTANT * masses[particlePrimaries], dt)
+        newParticlePositions = newPositions[particlePrimaries] + relativePositions
+        newParticleVelocities = newVelocities[particlePrimaries] + relativeVelocities
+    return newPositions, newVelocities, newParticlePositions, newParticleVelocities
+
+def fastForward(simulator, interval):
+    """
+    Jumps `simulator` ahead by `interval` simulated seconds on Kepler orbits instead of
+    stepping the integrator. Interactions between planets are ignored for the jump, so use it
+    to skip ahead, not for accuracy. The state is written back in place, so stepping the
+    simulator afterwards hands back to the N-body integrator at the destination.
+    """
+    positions, velocities, particlePositions, particleVelocities = keplerPropagate(
+        simulator.positions, simulator.velocities, simulator.masses, interval,
+        simulator.particle_positions, simulator.particle_velocities)
+    simulator.positions[:] = positions
+    simulator.velocities[:] = velocities
+    simulator.particle_positions[:] = particlePositions
+    simulator.particle_velocities[:] = particleVelocities
+    simulator.time += interval
+    simulator.invalidateAccelerations()
+
+def predictOrbits(positions, velocities, masses, numSamples, maxSpan):
+    """
+    Orbit previews: `numSamples` points along each body's osculating orbit about its primary,
+    placed around the primary's current position (closed ellipses for bound orbits). Each orbit
+    covers one period, capped at `maxSpan` seconds (unbound orbits use `maxSpan`). The central
+    body's samples all sit at its position, and merged bodies share their survivor's orbit.
+    Returns a (numBodies, numSamples, 3) array.
+    """
+    tracers, hosts = _coincidentTracers(positions, masses)
+    if len(tracers):
+        kept = np.setdiff1d(np.arange(len(masses)), tracers)
+        predicted = np.empty((len(masses), numSamples, 3))
+        predicted[kept] = predictOrbits(positions[kept], velocities[kept], masses[kept], numSamples, maxSpan)
+        predicted[tracers] = predicted[hosts]
+        return predicted
+
+    primaries, _ = assignPrimaries(positions, masses)
+    predicted = np.repeat(positions[:, np.newaxis, :], numSamples, axis=1)
+    orbiting = np.flatnonzero(primaries >= 0)
+    if len(orbiting) == 0:
+        return predicted
+
+    parents = primaries[orbiting]
+    relativePositions = positions[orbiting] - positions[parents]
+    relativeVelocities = velocities[orbiting] - velocities[parents]
+    mu = GRAVITATIONAL_CONSTANT * (masses[parents] + masses[orbiting])
+    alpha = (2.0 / np.linalg.norm(relativePositions, axis=1)
+             - np.einsum('ij,ij->i', relativeVelocities, relativeVelocities) / mu)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        period = np.where(alpha > 0.0, 2.0 * np.pi / (np.sqrt(mu) * alpha ** 1.5), np.inf)
+    span = np.minimum(period, maxSpan)
+
+    # Every (body, sample) pair in one Kepler solve
+    fractions = np.linspace(0.0, 1.0, numSamples)
+    times = (span[:, np.newaxis] * fractions).ravel()
+    samplePositions, _ = keplerDrift(np.repeat(relativePositions, numSamples, axis=0),
+                                     np.repeat(relativeVelocities, numSamples, axis=0),
+                                     np.repeat(mu, numSamples), times)
+    predicted[orbiting] = positions[parents][:, np.newaxis, :] + samplePositions.reshape(len(orbiting), numSamples, 3)
+    return predicted
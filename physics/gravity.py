@@ -0,0 +1,111 @@
+# physics/gravity.py
+
+import numpy as np
+
+# Upper bound on the number of (target, source) pairs evaluated in one broadcasted block.
+# Keeps the temporary (targets, sources, 3) arrays at a few tens of MB for large N.
+MAX_PAIRS_PER_BLOCK = 1 << 20
+
+def computeAccelerations(targetPositions, sourcePositions, sourceMasses, G, out=None):
+    """
+    Direct-sum gravitational accelerations felt by `targetPositions` (T, 3) due to
+    point masses at `sourcePositions` (S, 3) with masses `sourceMasses` (S,).
+
+    a_i = G * sum_j m_j * r_ij / |r_ij|^3, with r_ij = x_j - x_i.
+    Pairs at zero separation (e.g. a body acting on itself when targets and sources
+    are the same array) contribute nothing.
+    Returns a (T, 3) float64 array (written into `out` if given).
+    """
+    targetPositions = np.asarray(targetPositions, dtype=np.float64)
+    sourcePositions = np.asarray(sourcePositions, dtype=np.float64)
+    sourceMasses = np.asarray(sourceMasses, dtype=np.float64)
+
+    numTargets = len(targetPositions)
+    numSources = len(sourcePositions)
+    if out is None:
+        out = np.empty((numTargets, 3), dtype=np.float64)
+    if numTargets == 0:
+        return out
+    if numSources == 0:
+        out.fill(0.0)
+        return out
+
+    blockSize = max(1, MAX_PAIRS_PER_BLOCK // numSources)
+    for start in range(0, numTargets, blockSize):
+        stop = min(start + blockSize, numTargets)
+        # r_ij for every target in the block against every source: (B, S, 3)
+        separation = sourcePositions[np.newaxis, :, :] - targetPositions[start:stop, np.newaxis, :]
+        distanceSquared = np.einsum('ijk,ijk->ij', separation, separation)
+
+        # m_j / |r_ij|^3, zeroed where the separation vanishes
+        with np.errstate(divide='ignore'):
+            weights = distanceSquared ** -1.5
+        weights[distanceSquared == 0.0] = 0.0
+        weights *= sourceMasses
+
+        np.einsum('ij,ijk->ik', weights, separation, out=out[start:stop])
+
+    out *= G
+    return out
+
+def computeDynamicalTimescales(targetPositions, targetMasses, sourcePositions, sourceMasses, G):
+    """
+    Shortest two-body dynamical time of each target, min_j sqrt(|r_ij|^3 / (G (m_i + m_j))),
+    i.e. the orbital period / 2*pi of the tightest pair it belongs to. Small for bodies in
+    close encounters or tight satellite orbits. Zero separations are ignored; targets with
+    no sources get an infinite timescale. Returns a (T,) array of seconds.
+    """
+    targetPositions = np.asarray(targetPositions, dtype=np.float64)
+    targetMasses = np.asarray(targetMasses, dtype=np.float64)
+    sourcePositions = np.asarray(sourcePositions, dtype=np.float64)
+    sourceMasses = np.asarray(sourceMasses, dtype=np.float64)
+
+    numTargets = len(targetPositions)
+    timescales = np.full(numTargets, np.inf)
+    numSources = len(sourcePositions)
+    if numTargets == 0 or numSources == 0:
+        return timescales
+
+    blockSize = max(1, MAX_PAIRS_PER_BLOCK // numSources)
+    for start in range(0, numTargets, blockSize):
+        stop = min(start + blockSize, numTargets)
+        separation = sourcePositions[np.newaxis, :, :] - targetPositions[start:stop, np.newaxis, :]
+        distanceSquared = np.einsum('ijk,ijk->ij', separation, separation)
+        pairMass = targetMasses[start:stop, np.newaxis] + sourceMasses[np.newaxis, :]
+
+        # Compare squared timescales, r^3 / (G M), and take the root once per target
+        squared = distanceSquared ** 1.5 / (G * pairMass)
+        squared[distanceSquared == 0.0] = np.inf
+        timescales[start:stop] = np.sqrt(squared.min(axis=1))
+    return timescales
+
+def computeBatchedAccelerations(positions, masses, G, out=None):
+    """
+    Direct-sum accelerations for M independent systems at once: `positions` is (M, N, 3),
+    `masses` is (N,) (shared) or (M, N). Every body of a member feels every other body
+    of the same member. Returns an (M, N, 3) array (written into `out` if given).
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    numMembers, numBodies, _ = positions.shape
+    masses = np.broadcast_to(np.asarray(masses, dtype=np.float64), (numMembers, numBodies))
+    if out is None:
+        out = np.empty_like(positions)
+    if numMembers == 0 or numBodies == 0:
+        return out
+
+    blockSize = max(1, MAX_PAIRS_PER_BLOCK // (numBodies * numBodies))
+    for start in range(0, numMembers, blockSize):
+        stop = min(start + blockSize, numMembers)
+        # r_ij within each member: (B, N, N, 3)
+        separation = positions[start:stop, np.newaxis, :, :] - positions[start:stop, :, np.newaxis, :]
+        distanceSquared = np.einsum('mijk,mijk->mij', separation, separation)
+
+        with np.errstate(divide='ignore'):
+            weights = distanceSquared ** -1.5
+        weights[distanceSquared == 0.0] = 0.0
+        weights *= masses[start:stop, np.newaxis, :]
+
+        np.einsum('mij,mijk->mik', weights, separation, out=out[start:stop])
+
+    out *= G
+    return out
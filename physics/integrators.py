@@ -1,65 +1,222 @@
 # physics/integrators.py
 
 import numpy as np
+from config import GRAVITATIONAL_CONSTANT, BLOCK_TIMESTEP_ETA, BLOCK_TIMESTEP_MAX_LEVEL
+from physics.gravity import computeAccelerations, computeDynamicalTimescales
+from physics.kepler import keplerDrift
 
-def integrateVerlet(body, acceleration_at_t, dt):
+DRIFT = "drift"
+KICK = "kick"
+
+class Integrator:
+    """
+    Advances a whole system by one step of size dt.
+
+    The system (see NBodySimulator) exposes its state as arrays (`positions`, `velocities`,
+    `masses`, `particle_positions`, `particle_velocities`) plus the two sub-step operators
+    `drift(h)`, x += v*h for everything, and `kick(h)`, v += a(x)*h for everything.
+    Integrators that need raw accelerations use `accelerations()` (cached, everything) or
+    `accelerationsFor(body_indices, particle_indices)` (a subset).
+    """
+    name = None
+
+    def step(self, system, dt):
+        raise NotImplementedError
+
+    def settings(self):
+        # Constructor arguments that reproduce this integrator, e.g. for checkpoints
+        return {}
+
+class CompositionIntegrator(Integrator):
+    """
+    Symplectic integrator written as a fixed sequence of drift/kick sub-steps,
+    each a fraction of dt. Consecutive kicks at the same positions reuse the
+    system's cached accelerations, so a trailing kick and the next step's leading
+    kick cost one force evaluation.
+    """
+    def __init__(self, name, sequence):
+        self.name = name
+        self.sequence = tuple(sequence)
+
+    def step(self, system, dt):
+        for operator, fraction in self.sequence:
+            if operator == DRIFT:
+                system.drift(fraction * dt)
+            else:
+                system.kick(fraction * dt)
+
+# Yoshida (1990) / Forest & Ruth (1990) triple-jump weights for 4th order
+_W1 = 1.0 / (2.0 - 2.0 ** (1.0 / 3.0))
+_W0 = -(2.0 ** (1.0 / 3.0)) / (2.0 - 2.0 ** (1.0 / 3.0))
+
+# Kick-drift-kick leapfrog (velocity Verlet), 2nd order, one force evaluation per step
+LEAPFROG = CompositionIntegrator("leapfrog", [
+    (KICK, 0.5), (DRIFT, 1.0), (KICK, 0.5),
+])
+
+# Three KDK leapfrogs of length w1, w0, w1 with the adjacent kicks merged:
+# 4th order, three force evaluations per step
+YOSHIDA4 = CompositionIntegrator("yoshida4", [
+    (KICK, _W1 / 2.0), (DRIFT, _W1), (KICK, (_W1 + _W0) / 2.0), (DRIFT, _W0),
+    (KICK, (_W0 + _W1) / 2.0), (DRIFT, _W1), (KICK, _W1 / 2.0),
+])
+
+# Same weights in drift-kick-drift (position Verlet) form as given by Forest & Ruth:
+# 4th order, three force evaluations per step
+FOREST_RUTH = CompositionIntegrator("forest-ruth", [
+    (DRIFT, _W1 / 2.0), (KICK, _W1), (DRIFT, (_W1 + _W0) / 2.0), (KICK, _W0),
+    (DRIFT, (_W0 + _W1) / 2.0), (KICK, _W1), (DRIFT, _W1 / 2.0),
+])
+
+class WisdomHolmanIntegrator(Integrator):
+    """
+    Wisdom-Holman mixed-variable map in democratic heliocentric coordinates
+    (Duncan, Levison & Lee 1998). Every body orbits the most massive one on an exact
+    Kepler orbit; only the mutual perturbations between the other bodies are integrated,
+    so steps can be a sizeable fraction of the shortest orbital period.
+    Second order, one interaction evaluation per step. The most massive body is
+    assumed to dominate (a planetary system), and the barycentre moves uniformly.
+    """
+    name = "wisdom-holman"
+
+    def step(self, system, dt):
+        masses = system.masses
+        central = int(np.argmax(masses))
+        others = np.arange(len(masses)) != central
+        centralMass = masses[central]
+        totalMass = masses.sum()
+        mu = GRAVITATIONAL_CONSTANT * centralMass
+
+        # Barycentre, then heliocentric positions and barycentric velocities
+        barycentrePosition = masses @ system.positions / totalMass
+        barycentreVelocity = masses @ system.velocities / totalMass
+        positions = np.concatenate([system.positions[others], system.particle_positions]) - system.positions[central]
+        velocities = np.concatenate([system.velocities[others], system.particle_velocities]) - barycentreVelocity
+        orbitingMasses = np.concatenate([masses[others], np.zeros(len(system.particle_positions))])
+
+        self._interactionKick(positions, velocities, orbitingMasses, dt / 2.0)
+        self._centralJump(positions, velocities, orbitingMasses, centralMass, dt / 2.0)
+        positions, velocities = keplerDrift(positions, velocities, mu, dt)
+        self._centralJump(positions, velocities, orbitingMasses, centralMass, dt / 2.0)
+        self._interactionKick(positions, velocities, orbitingMasses, dt / 2.0)
+
+        # Back to barycentric-frame positions and inertial velocities
+        barycentrePosition = barycentrePosition + barycentreVelocity * dt
+        centralPosition = barycentrePosition - orbitingMasses @ positions / totalMass
+        centralVelocity = barycentreVelocity - orbitingMasses @ velocities / centralMass
+
+        numOthers = int(others.sum())
+        system.positions[central] = centralPosition
+        system.velocities[central] = centralVelocity
+        system.positions[others] = positions[:numOthers] + centralPosition
+        system.velocities[others] = velocities[:numOthers] + barycentreVelocity
+        system.particle_positions[:] = positions[numOthers:] + centralPosition
+        system.particle_velocities[:] = velocities[numOthers:] + barycentreVelocity
+        system.invalidateAccelerations()
+
+    def _interactionKick(self, positions, velocities, orbitingMasses, h):
+        # Mutual attraction of the non-central bodies (their heliocentric separations)
+        sources = orbitingMasses > 0.0
+        accelerations = computeAccelerations(positions, positions[sources], orbitingMasses[sources],
+                                             GRAVITATIONAL_CONSTANT)
+        velocities += accelerations * h
+
+    def _centralJump(self, positions, velocities, orbitingMasses, centralMass, h):
+        # Drift caused by the central body's momentum, -sum(m_i v_i), in the kinetic term
+        positions += (orbitingMasses @ velocities) * (h / centralMass)
+
+class BlockTimestepIntegrator(Integrator):
+    """
+    Kick-drift-kick leapfrog with hierarchical power-of-two individual time steps.
+
+    At the start of every step each body and test particle is put on level k, with its own
+    step dt / 2^k no longer than `eta` times its shortest two-body dynamical time
+    (see computeDynamicalTimescales). The step is then walked in sub-steps of the finest
+    level in use: everything drifts every sub-step, but only the bodies whose own step ends
+    there get new accelerations and kicks. A tight satellite therefore no longer forces
+    its small step on every slow outer body.
+    """
+    name = "block-leapfrog"
+
+    def __init__(self, eta=BLOCK_TIMESTEP_ETA, maxLevel=BLOCK_TIMESTEP_MAX_LEVEL):
+        self.eta = eta
+        self.maxLevel = maxLevel
+        self.lastForceEvaluations = 0 # Target accelerations computed during the last step
+
+    def settings(self):
+        return {"eta": self.eta, "maxLevel": self.maxLevel}
+
+    def assignLevels(self, system, dt):
+        # Returns (body levels, particle levels) for a step of dt
+        sources = system.masses > 0.0
+        sourcePositions = system.positions[sources]
+        sourceMasses = system.masses[sources]
+        bodyTimescales = computeDynamicalTimescales(system.positions, system.masses,
+                                                    sourcePositions, sourceMasses, GRAVITATIONAL_CONSTANT)
+        particleTimescales = computeDynamicalTimescales(system.particle_positions,
+                                                        np.zeros(len(system.particle_positions)),
+                                                        sourcePositions, sourceMasses, GRAVITATIONAL_CONSTANT)
+        return self._levelsFor(bodyTimescales, dt), self._levelsFor(particleTimescales, dt)
+
+    def _levelsFor(self, timescales, dt):
+        with np.errstate(divide='ignore'):
+            levels = np.ceil(np.log2(dt / (self.eta * timescales)))
+        return np.clip(levels, 0, self.maxLevel).astype(np.int64)
+
+    def step(self, system, dt):
+        bodyLevels, particleLevels = self.assignLevels(system, dt)
+        finestLevel = int(max(bodyLevels.max(initial=0), particleLevels.max(initial=0)))
+        numSubsteps = 1 << finestLevel
+        subDt = dt / numSubsteps
+
+        # Each body's step, and how many sub-steps it spans
+        bodyStep = (dt / 2.0 ** bodyLevels)[:, np.newaxis]
+        particleStep = (dt / 2.0 ** particleLevels)[:, np.newaxis]
+        bodyStride = 1 << (finestLevel - bodyLevels)
+        particleStride = 1 << (finestLevel - particleLevels)
+
+        # Opening half kick for everyone: all steps start together
+        bodyAccelerations, particleAccelerations = system.accelerations()
+        system.velocities += bodyAccelerations * (bodyStep / 2.0)
+        system.particle_velocities += particleAccelerations * (particleStep / 2.0)
+        forceEvaluations = 0
+
+        for substep in range(1, numSubsteps + 1):
+            system.drift(subDt)
+
+            if substep == numSubsteps:
+                # Every step ends here: closing half kick, leaving accelerations cached for the next step
+                bodyAccelerations, particleAccelerations = system.accelerations()
+                system.velocities += bodyAccelerations * (bodyStep / 2.0)
+                system.particle_velocities += particleAccelerations * (particleStep / 2.0)
+                forceEvaluations += len(bodyAccelerations) + len(particleAccelerations)
+                break
+
+            # Bodies whose step ends here get their closing and next opening half kicks at once
+            activeBodies = np.flatnonzero(substep % bodyStride == 0)
+            activeParticles = np.flatnonzero(substep % particleStride == 0)
+            if len(activeBodies) == 0 and len(activeParticles) == 0:
+                continue
+            bodyAccelerations, particleAccelerations = system.accelerationsFor(activeBodies, activeParticles)
+            system.velocities[activeBodies] += bodyAccelerations * bodyStep[activeBodies]
+            system.particle_velocities[activeParticles] += particleAccelerations * particleStep[activeParticles]
+            forceEvaluations += len(activeBodies) + len(activeParticles)
+
+        self.lastForceEvaluations = forceEvaluations
+
+INTEGRATORS = {integrator.name: integrator for integrator in (
+    LEAPFROG, YOSHIDA4, FOREST_RUTH, WisdomHolmanIntegrator(), BlockTimestepIntegrator(),
+)}
+
+def getIntegrator(name):
     """
-    Applies a single step of Velocity Verlet integration to a celestial body.
-    Assumes body.position is x(t), body.velocity is v(t).
-    Needs acceleration_at_t = a(t).
-    Updates body.position to x(t+dt) and body.velocity to v(t+dt).
+    Looks up an integrator by name ('leapfrog', 'yoshida4', 'forest-ruth', 'wisdom-holman',
+    'block-leapfrog').
+    Integrator instances are passed through unchanged.
     """
-    # 1. Calculate v(t + dt/2)
-    velocity_half_step = body.velocity + acceleration_at_t * (dt / 2.0)
-
-    # 2. Calculate x(t + dt)
-    body.position = body.position + velocity_half_step * dt
-
-    # 3. Recalculate acceleration at t + dt (this needs to happen based on new positions)
-    #    For simplicity here, we assume the NBodySimulator will calculate a(t+dt)
-    #    in the *next* overall loop iteration, and it will be passed in as `acceleration_at_t`.
-    #    So, for this iteration, `acceleration_at_t` is `a(t)`.
-
-    # 4. Calculate v(t + dt)
-    #    A strict velocity Verlet needs a(t+dt) here.
-    #    Since `_calculate_all_accelerations` runs *before* this function is called for each body,
-    #    and it computes `a(t)` based on `x(t)`.
-    #    Let's refine the NBodySimulator to compute `a(t+dt)` *after* all positions are updated.
-
-    # Re-evaluating Verlet:
-    # Let's simplify and make NBodySimulator call `integrateVerlet` for each body with `a(t)`.
-    # The `body.velocity_half_step` should be the `v(t+dt/2)` from the *previous* step.
-
-    # Correct Velocity Verlet Step (inside NBodySimulator's loop, or this function called carefully):
-    # This function expects `acceleration_at_t` to be `a(t)`.
-
-    # Calculate velocity at t + dt/2
-    # `body.velocity` here is v(t)
-    # `body.velocity_half_step` will store `v(t + dt/2)`
-    body.velocity_half_step = body.velocity + acceleration_at_t * (dt / 2.0)
-
-    # Update position to t + dt
-    body.position = body.position + body.velocity_half_step * dt
-
-    # The acceleration at t+dt `a(t+dt)` will be computed in the *next* `NBodySimulator.update()` call
-    # when it re-calculates accelerations based on the new `body.position`.
-    # Then `body.velocity` (v(t)) will be updated using `v(t+dt/2)` and `a(t+dt)`.
-    # This requires a slightly different flow in `NBodySimulator`.
-
-    # Let's adjust NBodySimulator for a more direct Velocity Verlet:
-    # In NBodySimulator.update():
-    # 1. Calculate all a(t) based on x(t)
-    # 2. For each body: v(t+dt/2) = v(t) + a(t)*dt/2
-    # 3. For each body: x(t+dt) = x(t) + v(t+dt/2)*dt
-    # 4. Calculate all a(t+dt) based on x(t+dt) (new positions)
-    # 5. For each body: v(t+dt) = v(t+dt/2) + a(t+dt)*dt/2
-    # This means `_calculate_all_accelerations` must be called *twice* per step.
-
-    # For now, let's keep the `_initialize_velocities` for the first half-step,
-    # and simplify the update in `NBodySimulator`.
-
-    # Simpler Euler-like update if Verlet is causing issues:
-    # body.position += body.velocity * dt
-    # body.velocity += acceleration_at_t * dt # This is Euler, less stable for orbits
-
-    pass # This function will be integrated more directly into NBodySimulator.update()
\ No newline at end of file
+    if isinstance(name, Integrator):
+        return name
+    try:
+        return INTEGRATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown integrator '{name}'. Available: {', '.join(INTEGRATORS)}") from None
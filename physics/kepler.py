@@ -0,0 +1,117 @@
+# physics/kepler.py
+
+import numpy as np
+
+# Universal-anomaly iterations before giving up (Laguerre-Conway converges in a handful)
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-13
+
+def stumpffFunctions(z):
+    """
+    Stumpff functions C(z) and S(z) for an array of z, using series near z = 0
+    to avoid cancellation.
+    """
+    z = np.asarray(z, dtype=np.float64)
+    C = np.empty_like(z)
+    S = np.empty_like(z)
+
+    small = np.abs(z) < 1e-2
+    elliptic = (z > 0.0) & ~small
+    hyperbolic = (z < 0.0) & ~small
+
+    zs = z[small]
+    C[small] = 1.0/2.0 - zs * (1.0/24.0 - zs * (1.0/720.0 - zs * (1.0/40320.0 - zs / 3628800.0)))
+    S[small] = 1.0/6.0 - zs * (1.0/120.0 - zs * (1.0/5040.0 - zs * (1.0/362880.0 - zs / 39916800.0)))
+
+    root = np.sqrt(z[elliptic])
+    C[elliptic] = (1.0 - np.cos(root)) / z[elliptic]
+    S[elliptic] = (root - np.sin(root)) / root**3
+
+    root = np.sqrt(-z[hyperbolic])
+    C[hyperbolic] = (np.cosh(root) - 1.0) / -z[hyperbolic]
+    S[hyperbolic] = (np.sinh(root) - root) / root**3
+    return C, S
+
+def keplerDrift(positions, velocities, mu, dt):
+    """
+    Propagates (N, 3) relative positions/velocities along two-body orbits with gravitational
+    parameter `mu` (scalar or (N,)) for time `dt` (scalar or (N,)), using the universal-variable
+    formulation so elliptic, parabolic and hyperbolic orbits share one vectorized path.
+    Bound orbits are first reduced modulo their period, so `dt` may span any number of orbits.
+    Rows at zero separation have no orbit and drift in a straight line instead.
+    Returns new (positions, velocities) arrays.
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    velocities = np.asarray(velocities, dtype=np.float64)
+    numBodies = len(positions)
+    mu = np.broadcast_to(np.asarray(mu, dtype=np.float64), (numBodies,))
+    dt = np.array(np.broadcast_to(np.asarray(dt, dtype=np.float64), (numBodies,)))
+
+    coincident = ~np.any(positions, axis=1)
+    if coincident.any():
+        newPositions = positions + velocities * dt[:, np.newaxis]
+        newVelocities = velocities.copy()
+        orbiting = ~coincident
+        newPositions[orbiting], newVelocities[orbiting] = keplerDrift(positions[orbiting], velocities[orbiting],
+                                                                      mu[orbiting], dt[orbiting])
+        return newPositions, newVelocities
+
+    r0 = np.linalg.norm(positions, axis=1)
+    speedSquared = np.einsum('ij,ij->i', velocities, velocities)
+    radialVelocity = np.einsum('ij,ij->i', positions, velocities) / r0
+    alpha = 2.0 / r0 - speedSquared / mu # reciprocal semi-major axis
+    sqrtMu = np.sqrt(mu)
+
+    # Whole periods of bound orbits change nothing
+    bound = alpha > 0.0
+    period = np.full(numBodies, np.inf)
+    period[bound] = 2.0 * np.pi / (sqrtMu[bound] * alpha[bound] ** 1.5)
+    dt[bound] = np.fmod(dt[bound], period[bound])
+
+    # Initial guess for the universal anomaly
+    chi = sqrtMu * np.abs(alpha) * dt
+    unbound = ~bound
+    if unbound.any():
+        sign = np.sign(dt[unbound])
+        rv = np.einsum('ij,ij->i', positions[unbound], velocities[unbound])
+        numerator = -2.0 * mu[unbound] * alpha[unbound] * dt[unbound]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a = 1.0 / alpha[unbound]
+            denominator = rv + sign * np.sqrt(-mu[unbound] * a) * (1.0 - r0[unbound] * alpha[unbound])
+            guess = sign * np.sqrt(-a) * np.log(np.abs(numerator / denominator))
+        chi[unbound] = np.where(np.isfinite(guess), guess, sqrtMu[unbound] * dt[unbound] / r0[unbound])
+
+    # Laguerre-Conway iteration on F(chi) = 0
+    coefficient = r0 * radialVelocity / sqrtMu
+    oneMinusAlphaR0 = 1.0 - alpha * r0
+    order = 5.0
+    active = np.ones(numBodies, dtype=bool)
+    for _ in range(MAX_ITERATIONS):
+        x = chi[active]
+        z = alpha[active] * x * x
+        C, S = stumpffFunctions(z)
+        F = coefficient[active] * x * x * C + oneMinusAlphaR0[active] * x**3 * S + r0[active] * x - sqrtMu[active] * dt[active]
+        dF = coefficient[active] * x * (1.0 - z * S) + oneMinusAlphaR0[active] * x * x * C + r0[active]
+        ddF = coefficient[active] * (1.0 - z * C) + oneMinusAlphaR0[active] * x * (1.0 - z * S)
+        discriminant = np.sqrt(np.abs((order - 1.0)**2 * dF * dF - order * (order - 1.0) * F * ddF))
+        denominator = dF + np.where(dF >= 0.0, discriminant, -discriminant)
+        delta = order * F / denominator
+        chi[active] = x - delta
+
+        converged = np.abs(delta) <= TOLERANCE * np.maximum(np.abs(x), 1.0)
+        remaining = np.flatnonzero(active)
+        active[remaining[converged]] = False
+        if not active.any():
+            break
+
+    # Lagrange f and g coefficients
+    z = alpha * chi * chi
+    C, S = stumpffFunctions(z)
+    f = 1.0 - chi * chi / r0 * C
+    g = dt - chi**3 / sqrtMu * S
+    newPositions = f[:, np.newaxis] * positions + g[:, np.newaxis] * velocities
+    r = np.linalg.norm(newPositions, axis=1)
+    fDot = sqrtMu / (r * r0) * chi * (z * S - 1.0)
+    gDot = 1.0 - chi * chi / r * C
+    newVelocities = fDot[:, np.newaxis] * positions + gDot[:, np.newaxis] * velocities
+    return newPositions, newVelocities
@@ -1,120 +1,145 @@
 # physics/nBodySimulator.py
 
 import numpy as np
-from config import GRAVITATIONAL_CONSTANT
-from physics.integrators import integrateVerlet # Using Verlet for stability
+from config import GRAVITATIONAL_CONSTANT, BARNES_HUT_THETA, BARNES_HUT_MIN_BODIES, BARNES_HUT_LEAF_SIZE, INTEGRATOR, \
+                   PHYSICS_WORKERS, PARALLEL_MIN_TARGETS
+from physics.gravity import computeAccelerations
+from physics.barnesHut import Octree
+from physics.integrators import getIntegrator
+from entities.bodyStore import BodyStore
 
 class NBodySimulator:
-    def __init__(self, celestial_bodies, time_step):
-        self.bodies = celestial_bodies
-        self.time_step = time_step
-        self._initialize_velocities() # Initialize for Verlet integration
-
-    def _initialize_velocities(self):
-        # Verlet needs initial acceleration to compute first half-step velocity
-        # Compute initial accelerations
-        initial_accelerations = self._calculate_all_accelerations()
-        for i, body in enumerate(self.bodies):
-            # Compute v(t + dt/2) = v(t) + a(t) * dt/2
-            body.velocity_half_step = body.velocity + initial_accelerations[i] * (self.time_step / 2.0)
-
-    def _calculate_gravitational_force(self, body1, body2):
-        # Calculate vector from body1 to body2
-        r_vec = body2.position - body1.position
-        distance = np.linalg.norm(r_vec)
-
-        if distance == 0:
-            return np.array([0.0, 0.0, 0.0]) # Avoid division by zero if bodies overlap
-
-        # F = G * m1 * m2 / r^2
-        force_magnitude = (GRAVITATIONAL_CONSTANT * body1.mass * body2.mass) / (distance ** 2)
-
-        # Force vector direction is along r_vec
-        force_direction = r_vec / distance
-        force_vector = force_magnitude * force_direction
-        return force_vector
-
-    def _calculate_all_accelerations(self):
-        accelerations = []
-        for i, body_i in enumerate(self.bodies):
-            total_force = np.array([0.0, 0.0, 0.0])
-            for j, body_j in enumerate(self.bodies):
-                if i != j:
-                    force_ij = self._calculate_gravitational_force(body_i, body_j)
-                    total_force += force_ij
-            
-            # a = F / m
-            if body_i.mass > 0: # Avoid division by zero for massless objects (if any)
-                accelerations.append(total_force / body_i.mass)
-            else:
-                accelerations.append(np.array([0.0, 0.0, 0.0])) # No acceleration for massless bodies
-        return accelerations
+    def __init__(self, celestial_bodies, time_step, integrator=INTEGRATOR,
+                 theta=BARNES_HUT_THETA, tree_threshold=BARNES_HUT_MIN_BODIES, workers=PHYSICS_WORKERS):
+        # Structure-of-arrays state (see entities/bodyStore.py): one contiguous row per body,
+        # and each CelestialBody is a thin handle onto its row. A BodyStore can be passed directly.
+        self.store = celestial_bodies if isinstance(celestial_bodies, BodyStore) else BodyStore.fromBodies(celestial_bodies)
+        self.bodies = self.store.bodies
+        self.positions = self.store.positions
+        self.velocities = self.store.velocities
+        self.masses = self.store.masses
+        numBodies = len(self.store)
 
+        self.time_step = time_step
+        self.integrator = getIntegrator(integrator) # Name (see physics/integrators.py) or Integrator
+        self.time = 0.0 # Simulated seconds since the initial state
+        self.theta = theta # Barnes-Hut opening angle
+        self.tree_threshold = tree_threshold # Use the tree code from this many gravity sources up
+
+        # Optional multi-core backend (see physics/parallelGravity.py); call close() to release it
+        self._parallel = None
+        if workers and workers > 1:
+            from physics.parallelGravity import ParallelGravity
+            self._parallel = ParallelGravity(workers)
+
+        # Only bodies with mass source gravity; massless bodies are still moved by it.
+        self._source_indices = np.flatnonzero(self.masses > 0.0)
+
+        # Test particles (comets, asteroids, spacecraft): massless, packed in their own arrays,
+        # attracted by the massive bodies only. See addTestParticles.
+        self.particle_positions = np.zeros((0, 3), dtype=np.float64)
+        self.particle_velocities = np.zeros((0, 3), dtype=np.float64)
+
+        # Accelerations at the current positions, recomputed lazily after the positions change
+        self._accelerations = np.zeros((numBodies, 3), dtype=np.float64)
+        self._particle_accelerations = np.zeros((0, 3), dtype=np.float64)
+        self._accelerations_valid = False
+
+    def addTestParticles(self, positions, velocities):
+        """
+        Adds massless test particles with the given (M, 3) positions and velocities.
+        They feel the massive bodies but never act on anything, so the cost per step
+        is O(N_massive * N_particles). Returns the index of the first new particle.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        velocities = np.asarray(velocities, dtype=np.float64).reshape(-1, 3)
+        if positions.shape != velocities.shape:
+            raise ValueError("Test particle positions and velocities must have the same shape")
+
+        first_index = len(self.particle_positions)
+        self.particle_positions = np.concatenate([self.particle_positions, positions])
+        self.particle_velocities = np.concatenate([self.particle_velocities, velocities])
+        self._particle_accelerations = np.zeros_like(self.particle_positions)
+        self.invalidateAccelerations()
+        return first_index
+
+    def removeTestParticles(self, indices):
+        # Drops the given test particles; later particles move down to fill the gaps
+        keep = np.ones(len(self.particle_positions), dtype=bool)
+        keep[indices] = False
+        self.particle_positions = self.particle_positions[keep]
+        self.particle_velocities = self.particle_velocities[keep]
+        self._particle_accelerations = np.zeros_like(self.particle_positions)
+        self.invalidateAccelerations()
+
+    def massesChanged(self):
+        # Must be called after editing masses in place (e.g. when bodies merge)
+        self._source_indices = np.flatnonzero(self.masses > 0.0)
+        self.invalidateAccelerations()
+
+    def invalidateAccelerations(self):
+        # Must be called whenever positions are modified outside drift()
+        self._accelerations_valid = False
+
+    def _build_tree(self):
+        # O(N log N) path: rebuild the octree over the gravity sources every step
+        if len(self._source_indices) < self.tree_threshold:
+            return None
+        return Octree(self.positions[self._source_indices], self.masses[self._source_indices],
+                      leafSize=BARNES_HUT_LEAF_SIZE)
+
+    def _calculate_accelerations_from_sources(self, target_positions, tree, out=None):
+        parallel = self._parallel if len(target_positions) >= PARALLEL_MIN_TARGETS else None
+
+        if tree is not None:
+            if parallel:
+                return parallel.computeTreeAccelerations(tree, target_positions, GRAVITATIONAL_CONSTANT,
+                                                         self.theta, out=out)
+            return tree.computeAccelerations(target_positions, GRAVITATIONAL_CONSTANT, self.theta, out=out)
+
+        # a_i = G * sum_j m_j * r_ij / |r_ij|^3 for all targets in one broadcasted pass
+        source_positions = self.positions[self._source_indices]
+        source_masses = self.masses[self._source_indices]
+        if parallel:
+            return parallel.computeAccelerations(target_positions, source_positions, source_masses,
+                                                 GRAVITATIONAL_CONSTANT, out=out)
+        return computeAccelerations(target_positions, source_positions, source_masses,
+                                    GRAVITATIONAL_CONSTANT, out=out)
+
+    def accelerations(self):
+        # Returns (body accelerations, test particle accelerations) at the current positions
+        if not self._accelerations_valid:
+            tree = self._build_tree()
+            self._calculate_accelerations_from_sources(self.positions, tree, out=self._accelerations)
+            self._calculate_accelerations_from_sources(self.particle_positions, tree,
+                                                       out=self._particle_accelerations)
+            self._accelerations_valid = True
+        return self._accelerations, self._particle_accelerations
+
+    def accelerationsFor(self, body_indices, particle_indices):
+        # Accelerations of a subset of bodies and test particles at the current positions
+        tree = self._build_tree()
+        return (self._calculate_accelerations_from_sources(self.positions[body_indices], tree),
+                self._calculate_accelerations_from_sources(self.particle_positions[particle_indices], tree))
+
+    def drift(self, h):
+        # x += v * h for bodies and test particles
+        self.positions += self.velocities * h
+        self.particle_positions += self.particle_velocities * h
+        self._accelerations_valid = False
+
+    def kick(self, h):
+        # v += a(x) * h for bodies and test particles
+        body_accelerations, particle_accelerations = self.accelerations()
+        self.velocities += body_accelerations * h
+        self.particle_velocities += particle_accelerations * h
 
     def update(self):
-        # Calculate accelerations based on current positions
-        current_accelerations = self._calculate_all_accelerations()
-
-        for i, body in enumerate(self.bodies):
-            # Update position (x(t+dt) = x(t) + v(t+dt/2)*dt)
-            body.position = body.position + body.velocity_half_step * self.time_step
-
-            # Update velocity for next half-step (v(t+3dt/2) = v(t+dt/2) + a(t+dt)*dt)
-            # This 'a(t+dt)' would ideally be based on new positions, but for basic Verlet
-            # we re-calculate accelerations for the _next_ step in the loop or overall.
-            # In simple Verlet, the 'a(t)' is used for the full step.
-            # A more rigorous Verlet (velocity Verlet) calculates new 'a' based on new 'x'
-            # then uses it for the second part of velocity update.
-
-            # Simple Verlet update logic:
-            # v(t+dt) = v(t) + a(t) * dt
-            # x(t+dt) = x(t) + v(t)*dt + 0.5*a(t)*dt^2 (original formulation)
-            # Or the more common velocity Verlet:
-            # 1. v(t+dt/2) = v(t) + a(t) * dt/2 (Done in init and at end of prev update)
-            # 2. x(t+dt) = x(t) + v(t+dt/2) * dt
-            # 3. Calculate a(t+dt) based on x(t+dt)
-            # 4. v(t+dt) = v(t+dt/2) + a(t+dt) * dt/2
-
-            # Let's refine for a more standard Velocity Verlet step within the loop:
-            # If `body.velocity` is v(t) and `body.velocity_half_step` is v(t+dt/2) from previous step
-            # Then current `current_accelerations[i]` is a(t)
-            
-            # Step 1: Update full velocity for this time step, based on current acceleration
-            # This is the velocity *at* time t+dt
-            new_velocity = body.velocity_half_step + current_accelerations[i] * (self.time_step / 2.0)
-            body.velocity = new_velocity # Store current full velocity
-
-            # Step 2: Compute acceleration at new position (a(t+dt)) for next half-step velocity
-            # This is implicitly done by `_calculate_all_accelerations` at the start of the *next* `update` call.
-            # The key for Verlet is that `velocity_half_step` is maintained.
-            # Update the half-step velocity for the *next* iteration:
-            body.velocity_half_step = new_velocity + current_accelerations[i] * (self.time_step / 2.0)
-            # Note: For strict velocity Verlet, `current_accelerations[i]` here should be `a(t+dt)`,
-            # which would mean calculating accelerations *after* position update,
-            # then looping again for velocity.
-            # A simpler Verlet, as initially set up, might re-calculate all accelerations each step
-            # and apply them in a way that effectively means `a(t+dt)` is based on `x(t+dt)`.
-
-            # For now, let's assume `current_accelerations` are recalculated each step based on `body.position`
-            # and applied using the velocity Verlet concept.
-            # The line `body.velocity_half_step = new_velocity + current_accelerations[i] * (self.time_step / 2.0)`
-            # is simplified. A better implementation would recalculate `current_accelerations` *after* all positions
-            # are updated, then update final velocities.
-            # For this simple setup, the `_initialize_velocities` provides the first `v(dt/2)` and
-            # the `current_accelerations[i]` are effectively `a(t)`.
-
-            # Let's make it explicitly Velocity Verlet:
-            # 1. Calculate a(t)
-            # 2. v(t+dt/2) = v(t) + a(t) * dt/2 (stored in body.velocity_half_step)
-            # 3. x(t+dt) = x(t) + v(t+dt/2) * dt
-            # 4. Calculate a(t+dt) based on x(t+dt) (this is `next_accelerations` calculated at start of *next* step)
-            # 5. v(t+dt) = v(t+dt/2) + a(t+dt) * dt/2
-
-            # The current loop calculates `current_accelerations` (which is `a(t)` for this step)
-            # Updates `body.position` using `v(t+dt/2)`
-            # The line `body.velocity_half_step = body.velocity + current_accelerations[i] * self.time_step` from a previous draft
-            # effectively makes `body.velocity` the `v(t+dt/2)` for the *next* step, which is a common Verlet form.
-            # Let's stick to the structure that passed `body.velocity_half_step` around as the main integrator value for Verlet.
-
-            # Re-calculating the accelerations at the start of `update` and applying `integrateVerlet` per body is cleaner.
-            integrateVerlet(body, current_accelerations[i], self.time_step)
\ No newline at end of file
+        self.integrator.step(self, self.time_step)
+        self.time += self.time_step
+
+    def close(self):
+        # Stops the worker processes of the parallel backend, if any
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
@@ -0,0 +1,116 @@
+# physics/parallelGravity.py
+
+import os
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from physics.gravity import computeAccelerations
+from physics.barnesHut import Octree
+
+# Slices handed out per worker and step; a few per worker evens out uneven tree walks
+TASKS_PER_WORKER = 4
+
+# Worker-side cache of attached shared memory blocks: name -> SharedMemory
+_attachedBlocks = {}
+
+def _attach(descriptor):
+    # (block name, shape, dtype) -> ndarray view over the shared block
+    name, shape, dtype = descriptor
+    block = _attachedBlocks.get(name)
+    if block is None:
+        block = shared_memory.SharedMemory(name=name)
+        _attachedBlocks[name] = block
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+def _releaseStaleBlocks(liveNames):
+    # Blocks the parent has replaced since the last task are closed here
+    for name in [name for name in _attachedBlocks if name not in liveNames]:
+        _attachedBlocks.pop(name).close()
+
+def _runTask(task):
+    kind, descriptors, G, theta, start, stop = task
+    _releaseStaleBlocks({descriptor[0] for descriptor in descriptors.values()})
+    arrays = {key: _attach(descriptor) for key, descriptor in descriptors.items()}
+    targets = arrays.pop("targets")
+    out = arrays.pop("out")
+
+    if kind == "direct":
+        computeAccelerations(targets[start:stop], arrays["sources"], arrays["masses"], G, out=out[start:stop])
+    else:
+        tree = Octree.fromArrays(arrays)
+        tree.computeAccelerations(targets[start:stop], G, theta, out=out[start:stop])
+
+class ParallelGravity:
+    """
+    Multi-core acceleration backend. Target bodies are split into slices across a process pool;
+    positions, masses (and the Barnes-Hut tree arrays) are copied once per evaluation into
+    shared memory blocks that the workers map directly, so only a small task tuple per slice
+    crosses the process boundary. Blocks are reused between steps and only grow.
+    Call close() when done to stop the workers and free the shared memory.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        # Workers must share the parent's resource tracker; one of their own would unlink
+        # the blocks they attached to as soon as they exit.
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(self.workers)
+        self._blocks = {} # key -> SharedMemory
+
+    def _reserve(self, key, shape, dtype):
+        # Shared block for `key` large enough for the array, reallocated (doubling) if too small
+        nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        block = self._blocks.get(key)
+        if block is None or block.size < nbytes:
+            previousSize = 0
+            if block is not None:
+                previousSize = block.size
+                block.close()
+                block.unlink()
+            block = shared_memory.SharedMemory(create=True, size=max(nbytes, 2 * previousSize))
+            self._blocks[key] = block
+        return (block.name, tuple(shape), np.dtype(dtype).str)
+
+    def _share(self, key, array):
+        # Copies `array` into the shared block for `key`; returns its descriptor
+        array = np.asarray(array)
+        descriptor = self._reserve(key, array.shape, array.dtype)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=self._blocks[key].buf)[...] = array
+        return descriptor
+
+    def _run(self, kind, descriptors, numTargets, G, theta, out):
+        descriptors["out"] = self._reserve("out", (numTargets, 3), np.float64)
+        sliceSize = max(1, -(-numTargets // (self.workers * TASKS_PER_WORKER)))
+        tasks = [(kind, descriptors, G, theta, start, min(start + sliceSize, numTargets))
+                 for start in range(0, numTargets, sliceSize)]
+        self._pool.map(_runTask, tasks)
+
+        result = np.ndarray((numTargets, 3), dtype=np.float64, buffer=self._blocks["out"].buf)
+        if out is None:
+            return result.copy()
+        out[...] = result
+        return out
+
+    def computeAccelerations(self, targetPositions, sourcePositions, sourceMasses, G, out=None):
+        # Parallel equivalent of physics.gravity.computeAccelerations
+        descriptors = {
+            "targets": self._share("targets", np.asarray(targetPositions, dtype=np.float64)),
+            "sources": self._share("sources", np.asarray(sourcePositions, dtype=np.float64)),
+            "masses": self._share("masses", np.asarray(sourceMasses, dtype=np.float64)),
+        }
+        return self._run("direct", descriptors, len(targetPositions), G, None, out)
+
+    def computeTreeAccelerations(self, tree, targetPositions, G, theta, out=None):
+        # Parallel equivalent of Octree.computeAccelerations
+        descriptors = {key: self._share(key, array) for key, array in tree.toArrays().items()}
+        descriptors["targets"] = self._share("targets", np.asarray(targetPositions, dtype=np.float64))
+        return self._run("tree", descriptors, len(targetPositions), G, theta, out)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
@@ -0,0 +1,43 @@
+# physics/replay.py
+
+class TrajectoryReplay:
+    """
+    Plays back recorded samples without running any physics. `source` is a TrajectoryFile or a
+    live TrajectoryRingBuffer (see physics/trajectoryIO.py); the playhead is a simulated time,
+    advanced by `speed` simulated seconds per real second while playing, and kept inside the
+    recorded range (which keeps moving for a live buffer).
+    """
+    def __init__(self, source, speed, startTime=None):
+        self.source = source
+        self.speed = speed
+        self.playing = True
+        start, end = source.timeRange()
+        self.time = start if startTime is None else min(max(startTime, start), end)
+
+    def _clamp(self):
+        start, end = self.source.timeRange()
+        if self.time >= end:
+            self.time = end
+            self.playing = False # Stop at the end instead of looping
+        self.time = max(self.time, start)
+
+    def advance(self, realSeconds):
+        if self.playing:
+            self.time += self.speed * realSeconds
+        self._clamp()
+
+    def togglePlaying(self):
+        self.playing = not self.playing
+
+    def seek(self, simulatedSeconds):
+        # Move the playhead by a signed amount of simulated time
+        self.time += simulatedSeconds
+        self._clamp()
+
+    def seekFraction(self, fraction):
+        # Move the playhead by a signed fraction of the recorded range
+        start, end = self.source.timeRange()
+        self.seek(fraction * (end - start))
+
+    def positions(self, out=None):
+        return self.source.positionsAt(self.time, out=out)
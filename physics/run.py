@@ -0,0 +1,157 @@
+# physics/run.py
+#
+# Headless batch simulation: python -m physics.run --years 1000 --dt 1h --out traj.bin
+# Imports no windowing or OpenGL modules, so it runs on machines without a display.
+
+import argparse
+import json
+import math
+import sys
+import time
+
+from config import INTEGRATOR
+from physics.nBodySimulator import NBodySimulator
+from physics.trajectoryIO import TrajectoryWriter
+from physics.checkpoint import CheckpointWriter, PeriodicCheckpointer, loadCheckpoint
+from physics.encounters import EncounterMonitor
+from physics.fastForward import fastForward
+
+SECONDS_PER_UNIT = {
+    "s": 1.0,
+    "m": 60.0,
+    "h": 3600.0,
+    "d": 86400.0,
+    "y": 365.25 * 86400.0, # Julian year
+}
+
+def parseDuration(text):
+    """
+    Parses a duration such as '3600', '90s', '30m', '1h', '1.5d' or '10y' into seconds.
+    """
+    text = text.strip().lower()
+    unit = text[-1] if text and text[-1] in SECONDS_PER_UNIT else "s"
+    number = text[:-1] if text and text[-1] in SECONDS_PER_UNIT else text
+    try:
+        seconds = float(number) * SECONDS_PER_UNIT[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid duration '{text}' (expected e.g. 3600, 30m, 1h, 1d, 10y)") from None
+    if seconds <= 0.0:
+        raise argparse.ArgumentTypeError(f"Duration must be positive, got '{text}'")
+    return seconds
+
+def buildArgumentParser():
+    parser = argparse.ArgumentParser(prog="python -m physics.run", description="Run the N-body simulation without a window.")
+    parser.add_argument("--years", type=float, default=1.0, help="Simulated span in years (default 1)")
+    parser.add_argument("--duration", type=parseDuration, default=None, help="Simulated span as a duration, e.g. 500d (overrides --years)")
+    parser.add_argument("--dt", type=parseDuration, default=parseDuration("1d"), help="Integrator time step, e.g. 1h (default 1d)")
+    parser.add_argument("--sample-every", type=parseDuration, default=None, help="Simulated time between written samples (default: every step)")
+    parser.add_argument("--out", default="-", help="Output trajectory file, or '-' for stdout (default)")
+    parser.add_argument("--integrator", default=INTEGRATOR, help=f"Integrator name (default {INTEGRATOR})")
+    parser.add_argument("--catalog", default=None, help="Body catalog file (default: config.BODY_CATALOG)")
+    parser.add_argument("--epoch", default=None, help="Initial epoch, any astropy Time string (default: today, 00:00 UTC)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes for force evaluation (default: in-process)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Samples buffered per write (default 256)")
+    parser.add_argument("--no-velocities", action="store_true", help="Write positions only")
+    parser.add_argument("--checkpoint", default=None, metavar="PATH", help="Save the full simulator state here periodically and at the end")
+    parser.add_argument("--checkpoint-every", type=parseDuration, default=None,
+                        help="Simulated time between checkpoints (default: every 1000 steps)")
+    parser.add_argument("--fast-forward", type=parseDuration, default=None, metavar="DURATION",
+                        help="Jump this far ahead on Kepler orbits before integrating, e.g. 1000y (counts towards the span)")
+    parser.add_argument("--encounters", default=None, metavar="PATH",
+                        help="Write close approaches and impacts here, one JSON object per line")
+    parser.add_argument("--merge", action="store_true", help="Merge bodies that collide (conserving momentum) instead of only logging it")
+    parser.add_argument("--resume", default=None, metavar="PATH",
+                        help="Continue from a checkpoint (its bodies, time step and integrator are used; "
+                             "--years/--duration still count from the original start)")
+    return parser
+
+def loadInitialBodies(epochText, catalogPath=None):
+    from astropy.time import Time
+    from entities.catalog import loadCatalog
+    from entities.planetData import defaultEpoch, getSolarSystemBodies
+    epoch = Time(epochText) if epochText else defaultEpoch()
+    catalog = loadCatalog(catalogPath) if catalogPath else None
+    return getSolarSystemBodies(epoch, catalog), epoch
+
+def run(args, log=sys.stderr):
+    duration = args.duration if args.duration is not None else args.years * SECONDS_PER_UNIT["y"]
+
+    if args.resume:
+        simulator, extra = loadCheckpoint(args.resume, workers=args.workers)
+        bodies, epochText = simulator.bodies, extra.get("epoch")
+        print(f"Resuming from {args.resume} at {simulator.time / SECONDS_PER_UNIT['y']:.3f} years", file=log)
+    else:
+        bodies, epoch = loadInitialBodies(args.epoch, args.catalog)
+        simulator = NBodySimulator(bodies, args.dt, integrator=args.integrator, workers=args.workers)
+        epochText = epoch.isot
+    if args.fast_forward:
+        fastForward(simulator, args.fast_forward)
+        print(f"Fast-forwarded to {simulator.time / SECONDS_PER_UNIT['y']:.3f} years on Kepler orbits", file=log)
+    dt = simulator.time_step
+    numSteps = max(0, math.ceil((duration - simulator.time) / dt))
+    stepsPerSample = max(1, round(args.sample_every / dt)) if args.sample_every else 1
+
+    checkpointWriter = checkpointer = None
+    if args.checkpoint:
+        checkpointWriter = CheckpointWriter(args.checkpoint)
+        stepsPerCheckpoint = round(args.checkpoint_every / dt) if args.checkpoint_every else 1000
+        checkpointer = PeriodicCheckpointer(simulator, checkpointWriter, stepsPerCheckpoint, extra={"epoch": epochText})
+
+    encounterLog = open(args.encounters, "w") if args.encounters else None
+    monitor = None
+    if encounterLog or args.merge:
+        def logEncounter(event):
+            if encounterLog:
+                encounterLog.write(json.dumps(event.toDict()) + "\n")
+        monitor = EncounterMonitor(simulator, mergeOnImpact=args.merge, onEvent=logEncounter)
+
+    includeVelocities = not args.no_velocities
+    metadata = {
+        "bodies": [body.name for body in bodies],
+        "masses": [body.mass for body in bodies],
+        "radii": [body.radius for body in bodies],
+        "epoch": epochText,
+        "start_time": simulator.time,
+        "dt": dt,
+        "integrator": simulator.integrator.name,
+        "steps_per_sample": stepsPerSample,
+    }
+
+    stream = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+    writer = TrajectoryWriter(stream, len(bodies), includeVelocities, metadata, chunkSize=args.chunk_size)
+    started = time.perf_counter()
+    try:
+        writer.append(simulator.time, simulator.positions, simulator.velocities)
+        for step in range(1, numSteps + 1):
+            simulator.update()
+            if monitor:
+                monitor.check()
+            if step % stepsPerSample == 0 or step == numSteps:
+                writer.append(simulator.time, simulator.positions, simulator.velocities)
+            if checkpointer:
+                checkpointer.append(simulator.time, simulator.positions, simulator.velocities)
+        writer.close()
+        if checkpointWriter:
+            checkpointWriter.request(simulator, checkpointer.extra) # Final state
+    finally:
+        if checkpointWriter:
+            checkpointWriter.close()
+        simulator.close()
+        if encounterLog:
+            encounterLog.close()
+        if stream is not sys.stdout.buffer:
+            stream.close()
+
+    elapsed = time.perf_counter() - started
+    if monitor:
+        print(f"{len(monitor.events)} encounters logged", file=log)
+    print(f"{numSteps} steps ({simulator.time / SECONDS_PER_UNIT['y']:.3f} years) in {elapsed:.2f} s "
+          f"({numSteps / max(elapsed, 1e-9):.0f} steps/s), {writer.samplesWritten} samples written",
+          file=log)
+
+def main(argv=None):
+    args = buildArgumentParser().parse_args(argv)
+    run(args)
+
+if __name__ == "__main__":
+    main()
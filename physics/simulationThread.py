@@ -0,0 +1,129 @@
+# physics/simulationThread.py
+
+import threading
+import time
+import numpy as np
+from physics.fastForward import fastForward
+
+class SimulationThread(threading.Thread):
+    """
+    Runs an NBodySimulator on its own thread, decoupled from the render loop.
+
+    With `stepsPerSecond` set, a fixed-timestep accumulator advances the simulator that many
+    times per real second (catching up by at most `maxStepsPerTick` steps at once). With
+    `stepsPerSecond=None` it steps as fast as the CPU allows.
+    After every step the body positions are published into a pair of snapshot buffers
+    (previous, current); the renderer asks for positions interpolated between the two, so it
+    never waits on a physics step and motion stays smooth whatever the step rate.
+    Each step is also appended to every recorder in `recorders` (anything with
+    append(time, positions, velocities), e.g. a TrajectoryWriter or TrajectoryRingBuffer).
+    requestFastForward() jumps ahead on Kepler orbits (physics/fastForward.py) between two
+    steps, after which stepping carries on from the new state.
+    """
+    def __init__(self, simulator, stepsPerSecond=None, maxStepsPerTick=8, recorders=()):
+        super().__init__(name="SimulationThread", daemon=True)
+        self.simulator = simulator
+        self.stepsPerSecond = stepsPerSecond
+        self.maxStepsPerTick = maxStepsPerTick
+        self.recorders = list(recorders)
+        self.error = None # Exception that stopped the thread, if any
+
+        self._lock = threading.Lock()
+        self._stopEvent = threading.Event()
+        # Double-buffered snapshots; publishing overwrites the older one and swaps
+        self._previousPositions = simulator.positions.copy()
+        self._currentPositions = simulator.positions.copy()
+        self._currentVelocities = simulator.velocities.copy()
+        self._currentTime = simulator.time
+        self._publishedAt = time.perf_counter()
+        self._stepDuration = 1.0 / stepsPerSecond if stepsPerSecond else 0.0
+        self._pendingFastForward = 0.0
+
+    def run(self):
+        try:
+            if self.stepsPerSecond:
+                self._runFixedRate()
+            else:
+                self._runUnthrottled()
+        except Exception as e:
+            self.error = e
+
+    def _runFixedRate(self):
+        interval = 1.0 / self.stepsPerSecond
+        accumulator = 0.0
+        lastTime = time.perf_counter()
+        while not self._stopEvent.is_set():
+            now = time.perf_counter()
+            accumulator += now - lastTime
+            lastTime = now
+
+            self._applyFastForward()
+            steps = 0
+            while accumulator >= interval and steps < self.maxStepsPerTick:
+                self.simulator.update()
+                self._publish(interval)
+                accumulator -= interval
+                steps += 1
+            if steps == self.maxStepsPerTick:
+                # Physics cannot keep up: drop the backlog instead of spiralling
+                accumulator = min(accumulator, interval)
+
+            self._stopEvent.wait(max(0.0, interval - accumulator))
+
+    def _runUnthrottled(self):
+        while not self._stopEvent.is_set():
+            self._applyFastForward()
+            started = time.perf_counter()
+            self.simulator.update()
+            self._publish(time.perf_counter() - started)
+
+    def requestFastForward(self, interval):
+        # Jumps `interval` simulated seconds ahead before the next step (requests add up)
+        with self._lock:
+            self._pendingFastForward += interval
+
+    def _applyFastForward(self):
+        with self._lock:
+            interval, self._pendingFastForward = self._pendingFastForward, 0.0
+        if interval > 0.0:
+            fastForward(self.simulator, interval)
+            self._publish(0.0) # Shown at once rather than interpolated across the jump
+
+    def _publish(self, stepDuration):
+        for recorder in self.recorders:
+            recorder.append(self.simulator.time, self.simulator.positions, self.simulator.velocities)
+        with self._lock:
+            self._previousPositions, self._currentPositions = self._currentPositions, self._previousPositions
+            np.copyto(self._currentPositions, self.simulator.positions)
+            np.copyto(self._currentVelocities, self.simulator.velocities)
+            self._currentTime = self.simulator.time
+            self._publishedAt = time.perf_counter()
+            self._stepDuration = stepDuration
+
+    def interpolatedPositions(self, out=None):
+        """
+        Body positions interpolated between the last two published steps, according to how much
+        of a step has elapsed since the latest one (rendering therefore lags physics by one step).
+        Returns (positions, simulated time); positions are written into `out` if given.
+        """
+        with self._lock:
+            if self._stepDuration > 0.0:
+                alpha = min(1.0, (time.perf_counter() - self._publishedAt) / self._stepDuration)
+            else:
+                alpha = 1.0
+            if out is None:
+                out = np.empty_like(self._currentPositions)
+            np.subtract(self._currentPositions, self._previousPositions, out=out)
+            out *= alpha
+            out += self._previousPositions
+            return out, self._currentTime
+
+    def latestState(self):
+        # Copies of the last published (positions, velocities, simulated time)
+        with self._lock:
+            return self._currentPositions.copy(), self._currentVelocities.copy(), self._currentTime
+
+    def stop(self):
+        self._stopEvent.set()
+        if self.is_alive():
+            self.join()
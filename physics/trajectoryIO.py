@@ -0,0 +1,188 @@
+# physics/trajectoryIO.py
+
+import bisect
+import json
+import struct
+import threading
+import numpy as np
+
+# File layout (little-endian):
+#   header   MAGIC, then uint32 version, body count, flags, header size in bytes
+#   metadata UTF-8 JSON (body names, time step, ...) padded with spaces to the header size
+#   records  fixed-size, one per sample: float64 time, float64 positions (N, 3)
+#            and, when FLAG_VELOCITIES is set, float64 velocities (N, 3)
+MAGIC = b"SSTRAJ\x00\x01"
+VERSION = 1
+FLAG_VELOCITIES = 1
+_PREFIX = struct.Struct("<8sIIII")
+HEADER_ALIGNMENT = 64
+
+def recordDtype(numBodies, includeVelocities=True):
+    fields = [("time", "<f8"), ("positions", "<f8", (numBodies, 3))]
+    if includeVelocities:
+        fields.append(("velocities", "<f8", (numBodies, 3)))
+    return np.dtype(fields)
+
+def encodeHeader(numBodies, includeVelocities=True, metadata=None):
+    metadataBytes = json.dumps(metadata or {}).encode("utf-8")
+    headerSize = _PREFIX.size + len(metadataBytes)
+    headerSize += -headerSize % HEADER_ALIGNMENT
+    flags = FLAG_VELOCITIES if includeVelocities else 0
+    prefix = _PREFIX.pack(MAGIC, VERSION, numBodies, flags, headerSize)
+    return prefix + metadataBytes.ljust(headerSize - _PREFIX.size, b" ")
+
+def decodeHeader(data):
+    """
+    Parses a header from the start of `data` (bytes-like).
+    Returns (numBodies, includeVelocities, metadata, headerSize).
+    """
+    magic, version, numBodies, flags, headerSize = _PREFIX.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a trajectory file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported trajectory file version {version}")
+    metadata = json.loads(bytes(data[_PREFIX.size:headerSize]).decode("utf-8"))
+    return numBodies, bool(flags & FLAG_VELOCITIES), metadata, headerSize
+
+class TrajectoryWriter:
+    """
+    Streams sampled states to a binary file object (a file opened 'wb', or sys.stdout.buffer).
+    Samples are collected into a preallocated chunk of records and written out a chunk at a time.
+    """
+    def __init__(self, stream, numBodies, includeVelocities=True, metadata=None, chunkSize=256):
+        self.stream = stream
+        self.includeVelocities = includeVelocities
+        self._chunk = np.zeros(chunkSize, dtype=recordDtype(numBodies, includeVelocities))
+        self._count = 0
+        self.samplesWritten = 0
+        self.stream.write(encodeHeader(numBodies, includeVelocities, metadata))
+
+    def append(self, time, positions, velocities=None):
+        record = self._chunk[self._count]
+        record["time"] = time
+        record["positions"] = positions
+        if self.includeVelocities:
+            record["velocities"] = velocities
+        self._count += 1
+        if self._count == len(self._chunk):
+            self.flush()
+
+    def flush(self):
+        if self._count:
+            self.stream.write(self._chunk[:self._count].tobytes())
+            self.samplesWritten += self._count
+            self._count = 0
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+
+def _interpolatePositions(records, before, after, time, out):
+    # Positions linearly interpolated between records[before] and records[after]
+    t0, t1 = float(records[before]["time"]), float(records[after]["time"])
+    alpha = 0.0 if t1 <= t0 else min(1.0, max(0.0, (time - t0) / (t1 - t0)))
+    p0 = records[before]["positions"]
+    if out is None:
+        out = np.empty(p0.shape, dtype=np.float64)
+    np.subtract(records[after]["positions"], p0, out=out)
+    out *= alpha
+    out += p0
+    return out
+
+class TrajectoryRingBuffer:
+    """
+    The most recent `capacity` samples, kept in RAM in the same fixed record layout as the
+    trajectory files (see recordDtype); older samples are overwritten. Appending and reading
+    may happen on different threads.
+    """
+    def __init__(self, numBodies, capacity, includeVelocities=False):
+        self.includeVelocities = includeVelocities
+        self._records = np.zeros(capacity, dtype=recordDtype(numBodies, includeVelocities))
+        self._next = 0  # Slot the next sample goes to
+        self._count = 0 # Valid samples, at most capacity
+        self._lock = threading.Lock()
+
+    def append(self, time, positions, velocities=None):
+        with self._lock:
+            record = self._records[self._next]
+            record["time"] = time
+            record["positions"] = positions
+            if self.includeVelocities:
+                record["velocities"] = velocities
+            self._next = (self._next + 1) % len(self._records)
+            self._count = min(self._count + 1, len(self._records))
+
+    def __len__(self):
+        return self._count
+
+    def _slot(self, i):
+        # Slot holding the i-th oldest sample
+        return (self._next - self._count + i) % len(self._records)
+
+    def records(self):
+        # Copy of the buffered samples, oldest first
+        with self._lock:
+            return self._records[[self._slot(i) for i in range(self._count)]]
+
+    def timeRange(self):
+        with self._lock:
+            if self._count == 0:
+                return None
+            return float(self._records[self._slot(0)]["time"]), float(self._records[self._slot(self._count - 1)]["time"])
+
+    def positionsAt(self, time, out=None):
+        """
+        Body positions at simulated `time`, interpolated between the two nearest samples
+        (clamped to the buffered range). Written into `out` if given.
+        """
+        with self._lock:
+            if self._count == 0:
+                raise ValueError("No samples recorded yet")
+            times = self._records["time"]
+            after = bisect.bisect_right(range(self._count), time, key=lambda i: times[self._slot(i)])
+            after = min(max(after, 1), self._count - 1)
+            before = max(after - 1, 0)
+            return _interpolatePositions(self._records, self._slot(before), self._slot(after), time, out)
+
+class TrajectoryFile:
+    """
+    A trajectory file opened for random access (see readTrajectory): samples are read from
+    the memory map only when asked for, so any epoch of a long run is available at once.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.metadata, self.records = readTrajectory(path)
+        if len(self.records) == 0:
+            raise ValueError(f"{path}: trajectory has no samples")
+
+    def __len__(self):
+        return len(self.records)
+
+    def timeRange(self):
+        return float(self.records[0]["time"]), float(self.records[-1]["time"])
+
+    def positionsAt(self, time, out=None):
+        # Same as TrajectoryRingBuffer.positionsAt; the binary search touches only a few records
+        after = int(np.searchsorted(self.records["time"], time, side="right"))
+        after = min(max(after, 1), len(self.records) - 1)
+        return _interpolatePositions(self.records, max(after - 1, 0), after, time, out)
+
+def readTrajectory(path):
+    """
+    Opens a trajectory file without loading it: returns (metadata, records) where `records`
+    is a read-only memory-mapped structured array with 'time', 'positions' (and 'velocities').
+    A trailing partial record (e.g. from an interrupted run) is ignored.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        _, _, _, _, headerSize = _PREFIX.unpack(prefix)
+        f.seek(0)
+        numBodies, includeVelocities, metadata, headerSize = decodeHeader(f.read(headerSize))
+        f.seek(0, 2)
+        fileSize = f.tell()
+
+    dtype = recordDtype(numBodies, includeVelocities)
+    numRecords = (fileSize - headerSize) // dtype.itemsize
+    if numRecords == 0:
+        return metadata, np.zeros(0, dtype=dtype)
+    return metadata, np.memmap(path, dtype=dtype, mode="r", offset=headerSize, shape=(numRecords,))
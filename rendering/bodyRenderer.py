@@ -0,0 +1,135 @@
+# rendering/bodyRenderer.py
+
+import ctypes
+from OpenGL.GL import *
+import numpy as np
+import glm
+
+class BodyRenderer:
+    """
+    Draws bodies with one instanced draw call per sphere level of detail.
+
+    Each frame the per-instance data (model matrix, texture layer) of the bodies to draw is
+    built with a few NumPy operations on the position and radius columns, sorted by level of
+    detail and uploaded in one glBufferSubData; each level then draws its contiguous range of
+    instances. A body's level is the coarsest sphere whose edges are at most
+    `pixelsPerSegment` pixels long on screen. Textures are layers of a single
+    GL_TEXTURE_2D_ARRAY (the low tier of TextureManager), so nothing is rebound between
+    bodies. The few bodies with a high-tier texture are drawn one by one with renderTextured().
+    """
+    # Per-instance data: column-major model matrix ([column][row]), then the texture layer
+    INSTANCE_DTYPE = np.dtype([("model", np.float32, (4, 4)), ("layer", np.float32)])
+
+    def __init__(self, meshes, shaderProgram, textureArrayId, layers, pixelsPerSegment):
+        # meshes: unit spheres from loadSphereLods, coarsest first. shaderProgram: built from
+        # bodyVertexShader.glsl/bodyFragmentShader.glsl. These and the texture array (one layer
+        # per body) are owned by the caller
+        self.meshes = meshes
+        self.segments = np.array([mesh.segments for mesh in meshes])
+        self.pixelsPerSegment = pixelsPerSegment
+        self.numBodies = len(layers)
+        self.shaderProgram = shaderProgram
+        self.textureId = textureArrayId
+        self.layers = np.asarray(layers, dtype=np.float32)
+        self.lodCounts = np.zeros(len(meshes), dtype=np.intp) # Instances of each level this frame
+
+        self._instances = np.zeros(self.numBodies, dtype=self.INSTANCE_DTYPE)
+        self._instances["model"][:, 3, 3] = 1.0
+
+        self.instanceVbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instanceVbo)
+        glBufferData(GL_ARRAY_BUFFER, self._instances.nbytes, self._instances, GL_DYNAMIC_DRAW)
+
+        # The instance attributes live in each mesh's VAO, next to its per-vertex attributes,
+        # all reading the one instance buffer from where that level's instances start
+        self._firstInstances = [0] * len(meshes)
+        for mesh in meshes:
+            glBindVertexArray(mesh.vao)
+            self._pointInstanceAttributes(0)
+            for location in range(3, 8):
+                glEnableVertexAttribArray(location)
+                glVertexAttribDivisor(location, 1)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _pointInstanceAttributes(self, firstInstance):
+        # Instance attribute pointers of the bound VAO, starting at `firstInstance` of the bound buffer
+        stride = self.INSTANCE_DTYPE.itemsize
+        base = firstInstance * stride
+        for column in range(4):
+            glVertexAttribPointer(3 + column, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(base + column * 16))
+        glVertexAttribPointer(7, 1, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(base + 64))
+
+    def selectLods(self, screenRadii):
+        # Index into meshes for each body: the coarsest with enough segments around the on-screen equator
+        needed = 2.0 * np.pi * np.asarray(screenRadii) / self.pixelsPerSegment
+        return np.minimum(np.searchsorted(self.segments, needed), len(self.meshes) - 1)
+
+    def update(self, scaledPositions, scaledRadii, screenRadii, indices=None):
+        # Instances for the bodies at `indices` (all by default), grouped by level of detail:
+        # uniform scale by the radius, then translation
+        if indices is None:
+            indices = np.arange(self.numBodies)
+        lods = self.selectLods(screenRadii[indices])
+        indices = np.asarray(indices)[np.argsort(lods, kind='stable')]
+        self.lodCounts = np.bincount(lods, minlength=len(self.meshes))
+        count = len(indices)
+        instances = self._instances[:count]
+        models = instances["model"]
+        radii = scaledRadii[indices]
+        models[:, 0, 0] = radii
+        models[:, 1, 1] = radii
+        models[:, 2, 2] = radii
+        models[:, 3, :3] = scaledPositions[indices]
+        instances["layer"] = self.layers[indices]
+        if count:
+            glBindBuffer(GL_ARRAY_BUFFER, self.instanceVbo)
+            glBufferSubData(GL_ARRAY_BUFFER, 0, instances.nbytes, instances)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def render(self):
+        # Camera and light come from the FrameData uniform block (FrameUniforms)
+        self.shaderProgram.use()
+        self.shaderProgram.setUniform1i("bodyTextures", 0)
+
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.textureId)
+        firstInstance = 0
+        glBindBuffer(GL_ARRAY_BUFFER, self.instanceVbo)
+        for lod, count in enumerate(self.lodCounts.tolist()):
+            if count == 0:
+                continue
+            mesh = self.meshes[lod]
+            if self._firstInstances[lod] != firstInstance:
+                glBindVertexArray(mesh.vao)
+                self._pointInstanceAttributes(firstInstance)
+                self._firstInstances[lod] = firstInstance
+            mesh.drawInstanced(count)
+            firstInstance += count
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, 0)
+        self.shaderProgram.unuse()
+
+    def renderTextured(self, shaderProgram, scaledPositions, scaledRadii, screenRadii, indices, textureIds):
+        # Bodies at `indices` drawn one by one with their own GL_TEXTURE_2D (`textureIds`, per body),
+        # using the plain program (vertexShader.glsl/fragmentShader.glsl)
+        if len(indices) == 0:
+            return
+        lods = self.selectLods(screenRadii[indices])
+        shaderProgram.use()
+        shaderProgram.setUniform1i("ourTexture", 0)
+        glActiveTexture(GL_TEXTURE0)
+        for body, lod in zip(indices, lods):
+            position, radius = scaledPositions[body], float(scaledRadii[body])
+            modelMatrix = glm.scale(glm.translate(glm.mat4(1.0), glm.vec3(*position)), glm.vec3(radius, radius, radius))
+            shaderProgram.setUniformMat4("model", modelMatrix)
+            shaderProgram.setUniformMat3("normalMatrix", glm.mat3(1.0)) # Uniform scale: normals are unchanged
+            glBindTexture(GL_TEXTURE_2D, int(textureIds[body]))
+            self.meshes[lod].draw()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        shaderProgram.unuse()
+
+    def delete(self):
+        if self.instanceVbo:
+            glDeleteBuffers(1, [self.instanceVbo])
+            self.instanceVbo = None
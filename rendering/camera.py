@@ -13,6 +13,9 @@ class Camera:
         self.right = glm.vec3(1.0, 0.0, 0.0)
         self.worldUp = glm.vec3(0.0, 1.0, 0.0) # Global up direction for calculating right vector
 
+        self.fovDegrees = 45.0 # Vertical field of view
+        self.nearPlane = 0.1
+        self.farPlane = 1_000_000_000.0 # Very large to accommodate solar system scale
         self.yaw = -90.0 # Y-axis rotation (left/right). Start facing -Z.
         self.pitch = 0.0 # X-axis rotation (up/down)
 
@@ -89,5 +92,32 @@ class Camera:
         return glm.lookAt(self.position, self.position + self.front, self.up)
 
     def getProjectionMatrix(self, width, height):
-        # Far plane set very large to accommodate solar system scale
-        return glm.perspective(glm.radians(45.0), width / height, 0.1, 1_000_000_000.0) # Adjust far plane
\ No newline at end of file
+        return glm.perspective(glm.radians(self.fovDegrees), width / height, self.nearPlane, self.farPlane)
+
+    def screenRadii(self, centres, radii, viewportHeight):
+        """
+        Approximate on-screen radius in pixels of spheres (centres (N, 3), radii (N,), scene
+        units), from their depth along the view direction. Spheres behind the camera get 0.
+        """
+        focal = 0.5 * viewportHeight / np.tan(np.radians(self.fovDegrees) * 0.5)
+        depths = (np.asarray(centres) - np.asarray(self.position)) @ np.asarray(self.front)
+        with np.errstate(divide='ignore'):
+            return np.where(depths > 0.0, radii * focal / depths, 0.0)
+
+    def spheresInFrustum(self, centres, radii, aspect):
+        """
+        Which spheres (centres (N, 3), radii (N,), scene units) touch the view frustum of a
+        viewport with this aspect ratio, in one pass: each centre is taken into camera space
+        and its distance to the six planes compared with its radius. Conservative near the
+        frustum's edges, like any bounding-sphere test.
+        """
+        offsets = np.asarray(centres) - np.asarray(self.position)
+        depths = offsets @ np.asarray(self.front)
+        sides = np.abs(offsets @ np.asarray(self.right))
+        heights = np.abs(offsets @ np.asarray(self.up))
+        # Side planes through the eye, tilted by the half angles: unit normals (cos, -sin) in (side, depth)
+        halfHeight = np.radians(self.fovDegrees) * 0.5
+        halfWidth = np.arctan(np.tan(halfHeight) * aspect)
+        return ((depths > self.nearPlane - radii) & (depths < self.farPlane + radii)
+                & (sides * np.cos(halfWidth) - depths * np.sin(halfWidth) <= radii)
+                & (heights * np.cos(halfHeight) - depths * np.sin(halfHeight) <= radii))
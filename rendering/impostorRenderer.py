@@ -0,0 +1,74 @@
+# rendering/impostorRenderer.py
+
+import ctypes
+from OpenGL.GL import *
+import numpy as np
+from rendering.shaderProgram import ShaderProgram
+
+class ImpostorRenderer:
+    """
+    Bodies too small on screen for a sphere, drawn as point sprites: one GL_POINTS draw call
+    for all of them, `pointSize` pixels wide, in the average color of each body's texture
+    (the last mip level of the low-tier texture array, fetched in the vertex shader).
+    The points to draw are packed into one buffer with a single glBufferSubData per update.
+    """
+    # Per-point data: position, then the texture layer
+    POINT_DTYPE = np.dtype([("position", np.float32, 3), ("layer", np.float32)])
+
+    def __init__(self, textureArrayId, layers, pointSize=2.0):
+        # The texture array (one layer per body) is owned by the caller
+        self.numBodies = len(layers)
+        self.textureId = textureArrayId
+        self.layers = np.asarray(layers, dtype=np.float32)
+        self.pointSize = pointSize
+        self.pointCount = 0
+        self.shaderProgram = ShaderProgram("assets/shaders/impostorVertexShader.glsl", "assets/shaders/impostorFragmentShader.glsl")
+        self._points = np.zeros(self.numBodies, dtype=self.POINT_DTYPE)
+
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, self._points.nbytes, None, GL_DYNAMIC_DRAW)
+        stride = self.POINT_DTYPE.itemsize
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, None)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(1, 1, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(12))
+        glEnableVertexAttribArray(1)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def update(self, scaledPositions, indices):
+        # Points for the bodies at `indices`
+        count = len(indices)
+        points = self._points[:count]
+        points["position"] = scaledPositions[indices]
+        points["layer"] = self.layers[indices]
+        self.pointCount = count
+        if count:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferSubData(GL_ARRAY_BUFFER, 0, points.nbytes, points)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def render(self):
+        # Projection and view come from the FrameData uniform block (FrameUniforms)
+        if self.pointCount == 0:
+            return
+        self.shaderProgram.use()
+        self.shaderProgram.setUniform1i("bodyTextures", 0)
+        self.shaderProgram.setUniform1f("pointSize", self.pointSize)
+        glActiveTexture(GL_TEXTURE0)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.textureId)
+
+        glBindVertexArray(self.vao)
+        glDrawArrays(GL_POINTS, 0, self.pointCount)
+        glBindVertexArray(0)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, 0)
+        self.shaderProgram.unuse()
+
+    def delete(self):
+        if self.vao:
+            glDeleteVertexArrays(1, [self.vao])
+            glDeleteBuffers(1, [self.vbo])
+            self.shaderProgram.delete()
+            self.vao = None
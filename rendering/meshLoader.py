@@ -2,8 +2,6 @@
 
 from OpenGL.GL import *
 import numpy as np
-import glm
-import os # For checking if OBJ path exists
 
 class Mesh:
     def __init__(self):
@@ -11,8 +9,10 @@ class Mesh:
         self.vbos = []
         self.ebo = None
         self.numElements = 0
+        self.segments = 0 # Segments around the equator of a generated sphere (see loadSphereLods)
 
-    def load(self, vertices, texCoords, normals, indices):
+    def load(self, vertices, texCoords, normals, indices, segments=0):
+        self.segments = segments
         # Generar VAO
         self.vao = glGenVertexArrays(1)
         glBindVertexArray(self.vao)
@@ -57,6 +57,12 @@ class Mesh:
         glDrawElements(GL_TRIANGLES, self.numElements, GL_UNSIGNED_INT, None)
         glBindVertexArray(0)
 
+    def drawInstanced(self, instanceCount):
+        # Per-instance attributes must have been added to self.vao (see BodyRenderer)
+        glBindVertexArray(self.vao)
+        glDrawElementsInstanced(GL_TRIANGLES, self.numElements, GL_UNSIGNED_INT, None, instanceCount)
+        glBindVertexArray(0)
+
     def delete(self):
         if self.vao:
             glDeleteVertexArrays(1, [self.vao])
@@ -72,71 +78,48 @@ def generate_sphere_data(radius=1.0, segments_x=64, segments_y=32):
     segments_x: Number of segments around the equator (longitude).
     segments_y: Number of segments from pole to pole (latitude).
     """
-    vertices = []
-    normals = []
-    tex_coords = []
-    indices = []
-
-    # Generate vertices, normals, and texture coordinates
-    for y in range(segments_y + 1):
-        pitch = np.pi / segments_y * y # Angle from top pole (0 to PI)
-        for x in range(segments_x + 1):
-            yaw = 2 * np.pi / segments_x * x # Angle around equator (0 to 2*PI)
-
-            # Spherical coordinates to Cartesian
-            # Map pitch to Y-axis, yaw to XZ plane
-            px = radius * np.sin(pitch) * np.cos(yaw)
-            py = radius * np.cos(pitch)
-            pz = radius * np.sin(pitch) * np.sin(yaw)
-
-            vertices.append([px, py, pz])
-
-            # Normals are simply normalized vertex positions for a sphere centered at origin
-            norm = glm.normalize(glm.vec3(px, py, pz))
-            normals.append([norm.x, norm.y, norm.z])
-
-            # Texture coordinates (equirectangular projection)
-            u = float(x) / segments_x
-            v = 1.0 - float(y) / segments_y # Invert V to match typical equirectangular maps (0 at top, 1 at bottom)
-            tex_coords.append([u, v])
-
-    # Generate indices for triangles
-    for y in range(segments_y):
-        for x in range(segments_x):
-            # Current row, current column
-            idx0 = y * (segments_x + 1) + x
-            idx1 = idx0 + 1
-            idx2 = (y + 1) * (segments_x + 1) + x
-            idx3 = idx2 + 1
-
-            # Two triangles forming a quad
-            # Triangle 1: (Top-left, Bottom-left, Top-right)
-            indices.append(idx0)
-            indices.append(idx2)
-            indices.append(idx1)
-
-            # Triangle 2: (Top-right, Bottom-left, Bottom-right)
-            indices.append(idx1)
-            indices.append(idx2)
-            indices.append(idx3)
-            
-    return (np.array(vertices, dtype=np.float32),
-            np.array(tex_coords, dtype=np.float32),
-            np.array(normals, dtype=np.float32),
-            np.array(indices, dtype=np.uint32))
-
-
-def loadObjMesh(filePath=None):
+    # Vertex grid: rows from the top pole (pitch 0) to the bottom one (pitch PI), columns around
+    # the equator (yaw 0 to 2*PI, the seam duplicated for texture coordinates)
+    pitch = np.pi / segments_y * np.arange(segments_y + 1)
+    yaw = 2 * np.pi / segments_x * np.arange(segments_x + 1)
+    sinPitch = np.sin(pitch)[:, np.newaxis]
+    vertices = np.empty((segments_y + 1, segments_x + 1, 3))
+    vertices[:, :, 0] = radius * sinPitch * np.cos(yaw)
+    vertices[:, :, 1] = radius * np.cos(pitch)[:, np.newaxis]
+    vertices[:, :, 2] = radius * sinPitch * np.sin(yaw)
+    vertices = vertices.reshape(-1, 3)
+
+    # Normals are simply normalized vertex positions for a sphere centered at origin
+    normals = vertices / np.linalg.norm(vertices, axis=1, keepdims=True)
+
+    # Texture coordinates (equirectangular projection); V inverted so 0 is at the top
+    tex_coords = np.empty((segments_y + 1, segments_x + 1, 2))
+    tex_coords[:, :, 0] = np.arange(segments_x + 1) / segments_x
+    tex_coords[:, :, 1] = 1.0 - np.arange(segments_y + 1)[:, np.newaxis] / segments_y
+
+    # Two triangles per quad: (top-left, bottom-left, top-right), (top-right, bottom-left, bottom-right)
+    idx0 = (np.arange(segments_y)[:, np.newaxis] * (segments_x + 1) + np.arange(segments_x)).ravel()
+    idx1 = idx0 + 1
+    idx2 = idx0 + segments_x + 1
+    idx3 = idx2 + 1
+    indices = np.stack([idx0, idx2, idx1, idx1, idx2, idx3], axis=1).ravel()
+
+    return (vertices.astype(np.float32),
+            tex_coords.reshape(-1, 2).astype(np.float32),
+            normals.astype(np.float32),
+            indices.astype(np.uint32))
+
+
+def loadSphereLods(levels):
     """
-    This function is now primarily used to generate a procedural sphere.
-    The filePath argument is kept for compatibility but not strictly used for OBJ parsing.
+    One unit-sphere Mesh per (segments_x, segments_y) in `levels`, coarsest first, built once and
+    shared by every body (see BodyRenderer for the per-body choice).
     """
-    from config import SPHERE_SEGMENTS_X, SPHERE_SEGMENTS_Y
-    print(f"Generating procedural sphere with {SPHERE_SEGMENTS_X}x{SPHERE_SEGMENTS_Y} segments.")
-    vertices, tex_coords, normals, indices = generate_sphere_data(
-        radius=1.0, segments_x=SPHERE_SEGMENTS_X, segments_y=SPHERE_SEGMENTS_Y
-    )
-    
-    mesh = Mesh()
-    mesh.load(vertices, tex_coords, normals, indices)
-    return mesh
\ No newline at end of file
+    levels = sorted(levels)
+    print(f"Generating procedural spheres: {', '.join(f'{x}x{y}' for x, y in levels)} segments.")
+    meshes = []
+    for segments_x, segments_y in levels:
+        mesh = Mesh()
+        mesh.load(*generate_sphere_data(radius=1.0, segments_x=segments_x, segments_y=segments_y), segments=segments_x)
+        meshes.append(mesh)
+    return meshes
@@ -0,0 +1,63 @@
+# rendering/orbitRenderer.py
+
+from OpenGL.GL import *
+import numpy as np
+import glm
+from rendering.shaderProgram import ShaderProgram
+
+class OrbitRenderer:
+    """
+    Predicted orbits (see physics/fastForward.predictOrbits) drawn as one line strip per body.
+    The points of all bodies share one vertex buffer, body-major, replaced with a single
+    glBufferSubData per update and drawn with a single glMultiDrawArrays call.
+    """
+    def __init__(self, numBodies, numSamples, color=(0.4, 0.7, 1.0), opacity=0.35):
+        self.numBodies = numBodies
+        self.numSamples = numSamples
+        self.color = glm.vec3(*color)
+        self.opacity = opacity
+        self.shaderProgram = ShaderProgram("assets/shaders/orbitVertexShader.glsl", "assets/shaders/orbitFragmentShader.glsl")
+        self.hasData = False
+        self._upload = np.empty((numBodies, numSamples, 3), dtype=np.float32)
+        self._firsts = np.arange(numBodies, dtype=np.int32) * numSamples
+        self._counts = np.full(numBodies, numSamples, dtype=np.int32)
+
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, self._upload.nbytes, None, GL_DYNAMIC_DRAW)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+        glEnableVertexAttribArray(0)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def update(self, scaledOrbits):
+        # scaledOrbits: (numBodies, numSamples, 3), already scaled to scene units
+        self._upload[:] = scaledOrbits
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, self._upload.nbytes, self._upload)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.hasData = True
+
+    def render(self):
+        # Projection and view come from the FrameData uniform block (FrameUniforms)
+        if not self.hasData:
+            return
+        self.shaderProgram.use()
+        self.shaderProgram.setUniformVec3("orbitColor", self.color)
+        self.shaderProgram.setUniform1f("orbitOpacity", self.opacity)
+
+        glDepthMask(GL_FALSE)
+        glBindVertexArray(self.vao)
+        glMultiDrawArrays(GL_LINE_STRIP, self._firsts, self._counts, self.numBodies)
+        glBindVertexArray(0)
+        glDepthMask(GL_TRUE)
+        self.shaderProgram.unuse()
+
+    def delete(self):
+        if self.vao:
+            glDeleteVertexArrays(1, [self.vao])
+            glDeleteBuffers(1, [self.vbo])
+            self.shaderProgram.delete()
+            self.vao = None
@@ -6,10 +6,11 @@ import glm
 from rendering.textureLoader import loadTexture
 
 class RingRenderer:
-    def __init__(self, innerRadius, outerRadius, texturePath, segments=128):
+    def __init__(self, innerRadius, outerRadius, texturePath, segments=128, tiltDegrees=26.73):
         self.innerRadius = innerRadius
         self.outerRadius = outerRadius
         self.texturePath = texturePath
+        self.tiltDegrees = tiltDegrees # Axial tilt of the body the rings belong to
         self.textureId = loadTexture(texturePath)
         self.numSegments = segments
         self.vao = None
@@ -91,15 +92,16 @@ class RingRenderer:
 
         glBindVertexArray(0)
 
-    def render(self, shaderProgram, projectionMatrix, viewMatrix, saturnModelMatrix):
+    def render(self, shaderProgram, bodyPosition):
         shaderProgram.use() # Ensure shader is active for rings
 
         # The rings are flat on the XZ plane (Y=0) in their local space.
         # Saturn's axial tilt is applied by rotating around the X-axis.
-        ringModelMatrix = glm.translate(glm.mat4(1.0), glm.vec3(saturnModelMatrix[3])) # Start with Saturn's position
-        ringModelMatrix = glm.rotate(ringModelMatrix, glm.radians(-26.73), glm.vec3(1.0, 0.0, 0.0)) # Tilt of Saturn's axis
+        ringModelMatrix = glm.translate(glm.mat4(1.0), glm.vec3(*bodyPosition)) # Start with Saturn's position
+        ringModelMatrix = glm.rotate(ringModelMatrix, glm.radians(-self.tiltDegrees), glm.vec3(1.0, 0.0, 0.0)) # Tilt of Saturn's axis
 
         shaderProgram.setUniformMat4("model", ringModelMatrix)
+        shaderProgram.setUniformMat3("normalMatrix", glm.transpose(glm.inverse(glm.mat3(ringModelMatrix))))
         shaderProgram.setUniform1i("ourTexture", 0)
 
         glActiveTexture(GL_TEXTURE0)
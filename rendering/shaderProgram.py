@@ -4,9 +4,30 @@ from OpenGL.GL import *
 import numpy as np
 import glm
 
+# Binding point of the FrameData uniform block, shared by every program that declares it
+FRAME_DATA_BINDING = 0
+
 class ShaderProgram:
     def __init__(self, vertexShaderPath, fragmentShaderPath):
         self.program = self._createShaderProgram(vertexShaderPath, fragmentShaderPath)
+        self.uniformLocations = self._introspectUniforms()
+
+        blockIndex = glGetUniformBlockIndex(self.program, "FrameData")
+        if blockIndex != GL_INVALID_INDEX:
+            glUniformBlockBinding(self.program, blockIndex, FRAME_DATA_BINDING)
+
+    def _introspectUniforms(self):
+        # Name -> location of every active uniform, looked up once at link time
+        locations = {}
+        for index in range(glGetProgramiv(self.program, GL_ACTIVE_UNIFORMS)):
+            name, _, _ = glGetActiveUniform(self.program, index)
+            name = name.decode('utf-8') if isinstance(name, bytes) else name
+            if name.endswith("[0]"):
+                name = name[:-3]
+            location = glGetUniformLocation(self.program, name)
+            if location >= 0: # Uniforms inside blocks have no location
+                locations[name] = location
+        return locations
 
     def _createShaderProgram(self, vertexShaderPath, fragmentShaderPath):
         vertex_shader_code = self._loadShader(vertexShaderPath)
@@ -52,21 +73,58 @@ class ShaderProgram:
     def unuse(self):
         glUseProgram(0)
 
+    # Setting a uniform the program doesn't use (or the compiler optimized out) is a no-op,
+    # like glUniform* with location -1
     def setUniformMat4(self, name, matrix):
-        location = glGetUniformLocation(self.program, name)
-        glUniformMatrix4fv(location, 1, GL_FALSE, glm.value_ptr(matrix))
+        glUniformMatrix4fv(self.uniformLocations.get(name, -1), 1, GL_FALSE, glm.value_ptr(matrix))
+
+    def setUniformMat3(self, name, matrix):
+        glUniformMatrix3fv(self.uniformLocations.get(name, -1), 1, GL_FALSE, glm.value_ptr(matrix))
 
     def setUniformVec3(self, name, vector):
-        location = glGetUniformLocation(self.program, name)
-        glUniform3fv(location, 1, glm.value_ptr(vector))
+        glUniform3fv(self.uniformLocations.get(name, -1), 1, glm.value_ptr(vector))
 
     def setUniform1i(self, name, value):
-        location = glGetUniformLocation(self.program, name)
-        glUniform1i(location, value)
+        glUniform1i(self.uniformLocations.get(name, -1), value)
 
     def setUniform1f(self, name, value):
-        location = glGetUniformLocation(self.program, name)
-        glUniform1f(location, value)
+        glUniform1f(self.uniformLocations.get(name, -1), value)
+
+    def delete(self):
+        glDeleteProgram(self.program)
+
+class FrameUniforms:
+    """
+    Per-frame data shared by every program through the std140 uniform block
+
+        layout (std140) uniform FrameData {
+            mat4 projection; mat4 view;
+            vec4 viewPos; vec4 lightDirection; vec4 lightColor; // xyz used
+        };
+
+    bound at FRAME_DATA_BINDING. One update() per frame replaces the projection/view/camera/light
+    uniforms that were otherwise set on each program separately.
+    """
+    def __init__(self):
+        self._data = np.zeros(44, dtype=np.float32) # 2 mat4 + 3 vec4
+        self.ubo = glGenBuffers(1)
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferData(GL_UNIFORM_BUFFER, self._data.nbytes, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+        glBindBufferBase(GL_UNIFORM_BUFFER, FRAME_DATA_BINDING, self.ubo)
+
+    def update(self, projection, view, viewPos, lightDirection, lightColor):
+        data = self._data
+        data[0:16] = np.asarray(projection, dtype=np.float32).ravel() # glm matrices are column-major, as std140 wants
+        data[16:32] = np.asarray(view, dtype=np.float32).ravel()
+        data[32:35] = viewPos
+        data[36:39] = lightDirection
+        data[40:43] = lightColor
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, data.nbytes, data)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
 
     def delete(self):
-        glDeleteProgram(self.program)
\ No newline at end of file
+        if self.ubo:
+            glDeleteBuffers(1, [self.ubo])
+            self.ubo = None
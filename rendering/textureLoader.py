@@ -1,48 +1,208 @@
 # rendering/textureLoader.py
 
+import glob
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from OpenGL.GL import *
-from PIL import Image # Import Pillow
 import numpy as np
 
-def loadTexture(filePath):
+from config import TEXTURE_CACHE_DIR, TEXTURE_DECODE_WORKERS
+
+# Bump when the cached layout or the mip filter changes, so stale cache files are ignored
+TEXTURE_CACHE_VERSION = 1
+
+class TextureData:
     """
-    Loads an image file using Pillow and converts it into an OpenGL texture.
-    Returns the OpenGL texture ID.
+    Decoded RGBA pixels of a texture with its whole mip chain: `levels[k]` is a
+    (height_k, width_k, 4) uint8 array, level 0 being full size. Levels loaded from the cache
+    are views of one memory-mapped file.
     """
-    try:
-        # Load image with Pillow
-        img = Image.open(filePath)
-        
-        # Convert image to RGBA format if it's not already
-        # This handles transparency (alpha channel) for PNGs like Saturn's rings.
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        
-        # Get image data as bytes
-        img_data = np.array(list(img.getdata()), np.uint8)
-
-        texture_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, texture_id)
-
-        # Set texture wrapping parameters
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-        
-        # Set texture filtering parameters (mipmaps for minification)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-
-        # Upload the image data to the GPU
-        # Pillow's data is already top-left origin, so no need to flip `img_data` itself.
-        # OpenGL expects GL_RGBA for data that includes alpha, GL_UNSIGNED_BYTE for 8-bit per channel.
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, img.width, img.height, 0, GL_RGBA, GL_UNSIGNED_BYTE, img_data)
-        glGenerateMipmap(GL_TEXTURE_2D) # Generate mipmaps
-
-        glBindTexture(GL_TEXTURE_2D, 0) # Unbind the texture
+    def __init__(self, width, height, levels):
+        self.width = width
+        self.height = height
+        self.levels = levels
+
+def _mipSizes(width, height):
+    sizes = [(width, height)]
+    while sizes[-1] != (1, 1):
+        w, h = sizes[-1]
+        sizes.append((max(1, w // 2), max(1, h // 2)))
+    return sizes
+
+def buildMipChain(pixels):
+    # Levels down to 1x1 from an (H, W, 4) uint8 array, each the 2x2 box average of the previous
+    levels = [pixels]
+    while levels[-1].shape[:2] != (1, 1):
+        level = levels[-1].astype(np.uint16)
+        h, w = level.shape[:2]
+        if h > 1:
+            level = level[:h // 2 * 2:2] + level[1:h // 2 * 2:2]
+        else:
+            level = level * 2
+        if w > 1:
+            level = level[:, :w // 2 * 2:2] + level[:, 1:w // 2 * 2:2]
+        else:
+            level = level * 2
+        levels.append(((level + 2) // 4).astype(np.uint8))
+    return levels
+
+def _cacheKey(filePath, size):
+    stat = os.stat(filePath)
+    text = f"{os.path.abspath(filePath)}|{stat.st_mtime_ns}|{stat.st_size}|{size}|{TEXTURE_CACHE_VERSION}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _levelsFromChain(chain, width, height):
+    levels = []
+    offset = 0
+    for w, h in _mipSizes(width, height):
+        levels.append(chain[offset:offset + w * h * 4].reshape(h, w, 4))
+        offset += w * h * 4
+    return levels
+
+def decodeTexture(filePath, size=None, cacheDir=TEXTURE_CACHE_DIR):
+    """
+    RGBA pixels and mip chain of an image, resampled to `size` (width, height) if given.
+    Decoded chains are cached in `cacheDir` (None disables it) as flat .npy files that later
+    runs memory-map instead of decoding. Needs no GL context, so it runs on any thread.
+    """
+    key = _cacheKey(filePath, size) if cacheDir else None
+    if key:
+        for cachePath in glob.glob(os.path.join(cacheDir, f"{key}_*.npy")):
+            width, height = (int(n) for n in os.path.basename(cachePath)[len(key) + 1:-4].split("x"))
+            return TextureData(width, height, _levelsFromChain(np.load(cachePath, mmap_mode='r'), width, height))
+
+    from PIL import Image # Pillow is only imported once a texture has to be decoded
+    img = Image.open(filePath).convert('RGBA')
+    if size is not None and img.size != tuple(size):
+        img = img.resize(tuple(size), Image.BILINEAR)
+    levels = buildMipChain(np.asarray(img, dtype=np.uint8)) # Buffer protocol: no per-pixel Python objects
+    width, height = img.size
+
+    if key:
+        # Written to a temporary file and renamed, so a concurrent or interrupted run never sees half a file
+        cachePath = os.path.join(cacheDir, f"{key}_{width}x{height}.npy")
+        temporaryPath = f"{cachePath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(cacheDir, exist_ok=True)
+            with open(temporaryPath, "wb") as f:
+                np.save(f, np.concatenate([level.ravel() for level in levels]))
+            os.replace(temporaryPath, cachePath)
+        except OSError as e:
+            # The cache only saves decoding time: the texture is still good without it
+            print(f"Warning: could not write texture cache {cachePath}: {e}")
+            try:
+                os.remove(temporaryPath)
+            except OSError:
+                pass
+    return TextureData(width, height, levels)
+
+_decodePool = None
+_pending = {} # (path, size) -> Future of prefetched textures not yet taken
+_pendingLock = threading.Lock()
+
+def prefetchTextures(filePaths, size=None):
+    """
+    Starts decoding textures on a thread pool (Pillow and NumPy release the GIL while they
+    work), so they are ready by the time the GL thread uploads them. Paths already pending
+    and None entries are skipped.
+    """
+    global _decodePool
+    with _pendingLock:
+        if _decodePool is None:
+            _decodePool = ThreadPoolExecutor(max_workers=TEXTURE_DECODE_WORKERS or None, thread_name_prefix="TextureDecode")
+        for path in filePaths:
+            if path is not None and (path, size) not in _pending:
+                _pending[(path, size)] = _decodePool.submit(decodeTexture, path, size)
 
+def _takeTextureData(filePath, size=None):
+    # The decoded texture, from a prefetch if there is one
+    prefetchTextures([filePath], size)
+    with _pendingLock:
+        future = _pending.pop((filePath, size))
+    return future.result()
+
+def pollTexture(filePath, size=None):
+    # The decoded texture if its prefetch has finished (raising its error, if any), else None
+    with _pendingLock:
+        future = _pending.get((filePath, size))
+        if future is None or not future.done():
+            return None
+        del _pending[(filePath, size)]
+    return future.result()
+
+def uploadTexture2D(texture):
+    # Creates a GL_TEXTURE_2D from a TextureData, uploading every level of its mip chain
+    texture_id = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, texture_id)
+
+    # Set texture wrapping parameters
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+
+    # Set texture filtering parameters (mipmaps for minification)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+
+    # Upload every level of the pre-built mip chain (top-left origin, like Pillow)
+    for level, pixels in enumerate(texture.levels):
+        glTexImage2D(GL_TEXTURE_2D, level, GL_RGBA8, pixels.shape[1], pixels.shape[0], 0, GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(texture.levels) - 1)
+
+    glBindTexture(GL_TEXTURE_2D, 0) # Unbind the texture
+    return texture_id
+
+def loadTexture(filePath, size=None):
+    """
+    Loads an image file (resampled to `size` if given) and converts it into an OpenGL texture
+    with its full mip chain. Returns the OpenGL texture ID, or 0 on failure.
+    """
+    try:
+        texture_id = uploadTexture2D(_takeTextureData(filePath, size))
         print(f"Successfully loaded texture: {filePath}")
         return texture_id
 
     except Exception as e:
         print(f"Error loading texture {filePath}: {e}")
-        return 0
\ No newline at end of file
+        return 0
+
+def loadTextureArray(filePaths, width, height):
+    """
+    Loads images into the layers of one GL_TEXTURE_2D_ARRAY of `width` x `height` (images of
+    another size are resampled), so many bodies can be textured within one draw call.
+    All images are decoded in parallel; this thread only uploads. Paths that are None or fail
+    to load get a plain white layer.
+    Returns (texture ID, layer of each path).
+    """
+    uniquePaths = list(dict.fromkeys(filePaths))
+    layers = {path: i for i, path in enumerate(uniquePaths)}
+    size = (width, height)
+    prefetchTextures(uniquePaths, size)
+
+    texture_id = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D_ARRAY, texture_id)
+    glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_S, GL_REPEAT)
+    glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_T, GL_REPEAT)
+    glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    mipSizes = _mipSizes(width, height)
+    for level, (w, h) in enumerate(mipSizes):
+        glTexImage3D(GL_TEXTURE_2D_ARRAY, level, GL_RGBA8, w, h, len(uniquePaths), 0, GL_RGBA, GL_UNSIGNED_BYTE, None)
+    glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAX_LEVEL, len(mipSizes) - 1)
+
+    white = buildMipChain(np.full((height, width, 4), 255, dtype=np.uint8))
+    for path, layer in layers.items():
+        levels = white
+        if path is not None:
+            try:
+                levels = _takeTextureData(path, size).levels
+                print(f"Successfully loaded texture: {path}")
+            except Exception as e:
+                print(f"Error loading texture {path}: {e}")
+        for level, pixels in enumerate(levels):
+            glTexSubImage3D(GL_TEXTURE_2D_ARRAY, level, 0, 0, layer, pixels.shape[1], pixels.shape[0], 1,
+                            GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+
+    glBindTexture(GL_TEXTURE_2D_ARRAY, 0)
+    return texture_id, [layers[path] for path in filePaths]
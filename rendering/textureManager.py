@@ -0,0 +1,141 @@
+# rendering/textureManager.py
+
+import numpy as np
+from OpenGL.GL import *
+from rendering.textureLoader import loadTextureArray, prefetchTextures, pollTexture, uploadTexture2D
+
+def _textureBytes(width, height):
+    # RGBA8 with a full mip chain (the chain adds a third)
+    return width * height * 4 * 4 // 3
+
+class _ResidentTexture:
+    __slots__ = ("tier", "textureId", "bytes", "lastVisibleFrame")
+
+    def __init__(self, tier, textureId, bytes, lastVisibleFrame):
+        self.tier = tier
+        self.textureId = textureId
+        self.bytes = bytes
+        self.lastVisibleFrame = lastVisibleFrame
+
+class TextureManager:
+    """
+    Body textures in resolution tiers.
+
+    Every body always has the low tier: a small layer of one GL_TEXTURE_2D_ARRAY, uploaded at
+    startup (drawn by BodyRenderer in its instanced call). Each frame, update() takes the bodies'
+    on-screen radii and picks the tier whose width covers the body's circumference in pixels
+    (about one texel per pixel); bodies that need more than the low tier get a higher tier as a
+    GL_TEXTURE_2D, decoded on the texture loader's thread pool and uploaded a few per frame.
+    High tiers count against `budgetBytes` of VRAM; when a new one would exceed it, those
+    visible longest ago (and not this frame) are evicted first. If it still doesn't fit, the
+    body keeps the tier it has. Textures are equirectangular, so tiers are twice as wide as tall.
+    """
+    def __init__(self, texturePaths, lowTierWidth, tierWidths, budgetBytes, uploadsPerFrame=1):
+        self.texturePaths = list(texturePaths)
+        self.lowTierWidth = lowTierWidth
+        self.tierWidths = sorted(tierWidths)
+        self.budgetBytes = budgetBytes
+        self.uploadsPerFrame = uploadsPerFrame
+        self.arrayTextureId, self.layers = loadTextureArray(self.texturePaths, lowTierWidth, lowTierWidth // 2)
+
+        self.resident = {}   # Path -> _ResidentTexture of its high tier
+        self.requested = {}  # Path -> tier being decoded
+        self.failed = set()  # Paths whose high tiers failed to load; not retried
+        self.usedBytes = 0
+        self.frame = 0
+        uniquePaths = list(dict.fromkeys(self.texturePaths))
+        self._pathSlots = {path: i for i, path in enumerate(uniquePaths)}
+        self._bodySlots = np.array([self._pathSlots[path] for path in self.texturePaths], dtype=np.intp)
+        self._slotTextureIds = np.zeros(len(uniquePaths), dtype=np.uint32) # High tier per unique path, 0 if none
+
+    def _tierSize(self, tier):
+        width = self.tierWidths[tier]
+        return (width, width // 2)
+
+    def desiredTiers(self, screenRadii):
+        # Index into tierWidths for each body, or -1 where the low tier is enough
+        needed = 2.0 * np.pi * np.asarray(screenRadii) # Texels around the equator for ~1 texel per pixel
+        tiers = np.minimum(np.searchsorted(self.tierWidths, needed), len(self.tierWidths) - 1)
+        return np.where(needed > self.lowTierWidth, tiers, -1)
+
+    def _freeableBytes(self, exceptPath):
+        # VRAM that evicting everything not visible this frame would release
+        return sum(texture.bytes for path, texture in self.resident.items()
+                   if path != exceptPath and texture.lastVisibleFrame < self.frame)
+
+    def _fits(self, path, bytes):
+        current = self.resident[path].bytes if path in self.resident else 0
+        return self.usedBytes - current - self._freeableBytes(path) + bytes <= self.budgetBytes
+
+    def _evictFor(self, path, bytes):
+        # Evicts least recently visible high tiers until `bytes` more fit (replacing path's own tier)
+        current = self.resident[path].bytes if path in self.resident else 0
+        candidates = sorted((texture.lastVisibleFrame, other) for other, texture in self.resident.items()
+                            if other != path and texture.lastVisibleFrame < self.frame)
+        for _, other in candidates:
+            if self.usedBytes - current + bytes <= self.budgetBytes:
+                break
+            self._release(other)
+
+    def _release(self, path):
+        texture = self.resident.pop(path)
+        glDeleteTextures(1, [texture.textureId])
+        self._slotTextureIds[self._pathSlots[path]] = 0
+        self.usedBytes -= texture.bytes
+
+    def update(self, screenRadii):
+        """
+        Requests, uploads and evicts high tiers for this frame. Returns the GL_TEXTURE_2D to
+        draw each body with, or 0 for bodies drawn with their low tier from the array.
+        """
+        self.frame += 1
+        desired = self.desiredTiers(screenRadii)
+        wanted = {} # Path -> highest tier any body using it wants
+        for body in np.flatnonzero(desired >= 0):
+            path = self.texturePaths[body]
+            if path is not None and path not in self.failed:
+                wanted[path] = max(wanted.get(path, -1), int(desired[body]))
+
+        for path, tier in wanted.items():
+            resident = self.resident.get(path)
+            if resident:
+                resident.lastVisibleFrame = self.frame
+            if (resident is None or resident.tier < tier) and path not in self.requested \
+                    and self._fits(path, _textureBytes(*self._tierSize(tier))):
+                prefetchTextures([path], self._tierSize(tier))
+                self.requested[path] = tier
+
+        uploads = 0
+        for path, tier in list(self.requested.items()):
+            if uploads >= self.uploadsPerFrame:
+                break
+            size = self._tierSize(tier)
+            try:
+                texture = pollTexture(path, size)
+            except Exception as e:
+                print(f"Error loading texture {path}: {e}")
+                del self.requested[path]
+                self.failed.add(path)
+                continue
+            if texture is None:
+                continue
+            del self.requested[path]
+            bytes = _textureBytes(*size)
+            if not self._fits(path, bytes):
+                continue # Other textures became visible meanwhile; try again on a later frame
+            self._evictFor(path, bytes)
+            if path in self.resident:
+                self._release(path)
+            self.resident[path] = _ResidentTexture(tier, uploadTexture2D(texture), bytes, self.frame)
+            self._slotTextureIds[self._pathSlots[path]] = self.resident[path].textureId
+            self.usedBytes += bytes
+            uploads += 1
+
+        return self._slotTextureIds[self._bodySlots]
+
+    def delete(self):
+        for path in list(self.resident):
+            self._release(path)
+        if self.arrayTextureId:
+            glDeleteTextures(1, [self.arrayTextureId])
+            self.arrayTextureId = None
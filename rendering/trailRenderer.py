@@ -0,0 +1,126 @@
+# rendering/trailRenderer.py
+
+import ctypes
+from OpenGL.GL import *
+import numpy as np
+import glm
+from rendering.shaderProgram import ShaderProgram
+
+class TrailRenderer:
+    """
+    Fading orbit trails for many bodies, kept in a ring buffer on the GPU.
+
+    The vertex buffer holds `trailLength` slots of one point per body, slot-major
+    (vertex slot * numBodies + body), so recording a point for every body is a single
+    glBufferSubData of numBodies * 12 bytes. The newest slot is rewritten every frame with the
+    bodies' current positions, which keeps trails attached to the bodies; the ring only
+    advances once `sampleInterval` simulated seconds have passed.
+
+    A static element buffer lists every line segment, grouped by the slot it starts at. The
+    segments in use are at most two contiguous ranges of it (the one from the newest point
+    back to the oldest is skipped), drawn with a single glMultiDrawElements call.
+    Fading is computed in the vertex shader from gl_VertexID.
+    """
+    def __init__(self, numBodies, trailLength, sampleInterval, color=(0.6, 0.6, 0.7), opacity=0.6):
+        self.numBodies = numBodies
+        self.trailLength = trailLength
+        self.sampleInterval = sampleInterval # Simulated seconds between trail points
+        self.color = glm.vec3(*color)
+        self.opacity = opacity
+        self.shaderProgram = ShaderProgram("assets/shaders/trailVertexShader.glsl", "assets/shaders/trailFragmentShader.glsl")
+
+        self.head = 0      # Slot of the newest point
+        self.count = 0     # Slots filled
+        self.lastSampleTime = None
+        self._upload = np.empty((numBodies, 3), dtype=np.float32)
+
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, trailLength * numBodies * 3 * 4, None, GL_DYNAMIC_DRAW)
+        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+        glEnableVertexAttribArray(0)
+
+        # Segment (slot s -> slot s+1) of every body, grouped by s; the last group wraps to slot 0
+        slots = np.arange(trailLength, dtype=np.uint32)[:, np.newaxis]
+        bodies = np.arange(numBodies, dtype=np.uint32)[np.newaxis, :]
+        indices = np.empty((trailLength, numBodies, 2), dtype=np.uint32)
+        indices[:, :, 0] = slots * numBodies + bodies
+        indices[:, :, 1] = ((slots + 1) % trailLength) * numBodies + bodies
+        self.ebo = glGenBuffers(1)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def clear(self):
+        # Drops the history, e.g. when a replay jumps backwards
+        self.head = 0
+        self.count = 0
+        self.lastSampleTime = None
+
+    def update(self, scaledPositions, simulatedTime):
+        """
+        Records the bodies' current (already scaled) positions at `simulatedTime`: one
+        glBufferSubData of the newest slot, after advancing the ring when a sample is due.
+        """
+        if self.lastSampleTime is not None and not (
+                self.lastSampleTime <= simulatedTime <= self.lastSampleTime + self.sampleInterval * self.trailLength):
+            self.clear() # Jumped backwards, or forwards past the whole trail (fast-forward)
+        if self.lastSampleTime is None:
+            self.count = 1
+            self.lastSampleTime = simulatedTime
+        elif simulatedTime - self.lastSampleTime >= self.sampleInterval:
+            self.head = (self.head + 1) % self.trailLength
+            self.count = min(self.count + 1, self.trailLength)
+            self.lastSampleTime = simulatedTime
+
+        self._upload[:] = scaledPositions
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferSubData(GL_ARRAY_BUFFER, self.head * self._upload.nbytes, self._upload.nbytes, self._upload)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _segmentRanges(self):
+        # (first group, group count) of the segment groups in use: from the oldest slot up to the newest
+        numSegments = self.count - 1
+        oldest = (self.head - numSegments) % self.trailLength
+        firstRun = min(numSegments, self.trailLength - oldest)
+        ranges = [(oldest, firstRun)]
+        if numSegments > firstRun:
+            ranges.append((0, numSegments - firstRun))
+        return ranges
+
+    def render(self):
+        # Projection and view come from the FrameData uniform block (FrameUniforms)
+        if self.count < 2:
+            return
+        ranges = self._segmentRanges()
+        indicesPerGroup = 2 * self.numBodies
+        counts = (GLsizei * len(ranges))(*[groups * indicesPerGroup for _, groups in ranges])
+        offsets = (ctypes.c_void_p * len(ranges))(*[first * indicesPerGroup * 4 for first, _ in ranges])
+
+        self.shaderProgram.use()
+        self.shaderProgram.setUniform1i("numBodies", self.numBodies)
+        self.shaderProgram.setUniform1i("trailLength", self.trailLength)
+        self.shaderProgram.setUniform1i("head", self.head)
+        self.shaderProgram.setUniform1i("count", self.count)
+        self.shaderProgram.setUniformVec3("trailColor", self.color)
+        self.shaderProgram.setUniform1f("trailOpacity", self.opacity)
+
+        glDepthMask(GL_FALSE) # Trails are translucent: test against depth but don't write it
+        glBindVertexArray(self.vao)
+        glMultiDrawElements(GL_LINES, counts, GL_UNSIGNED_INT, offsets, len(ranges))
+        glBindVertexArray(0)
+        glDepthMask(GL_TRUE)
+        self.shaderProgram.unuse()
+
+    def delete(self):
+        if self.vao:
+            glDeleteVertexArrays(1, [self.vao])
+            glDeleteBuffers(2, [self.vbo, self.ebo])
+            self.shaderProgram.delete()
+            self.vao = None
@@ -0,0 +1,46 @@
+# startupProfiler.py
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupProfiler:
+    """
+    Records named wall-clock sections of application startup, from any thread.
+    Recording is always on (it costs a couple of perf_counter calls per section);
+    report() prints the breakdown, which main.py does for --profile-startup.
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.sections = [] # (name, thread name, start offset, duration) in seconds
+        self.marks = []    # (name, offset) for one-off milestones such as the first frame
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def section(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.sections.append((name, threading.current_thread().name, started - self.origin, finished - started))
+
+    def mark(self, name):
+        with self._lock:
+            self.marks.append((name, time.perf_counter() - self.origin))
+
+    def report(self, file=sys.stderr):
+        with self._lock:
+            sections = sorted(self.sections, key=lambda section: section[2])
+            marks = list(self.marks)
+        print("Startup profile (seconds since the first import)", file=file)
+        print(f"  {'section':<36} {'thread':<16} {'start':>8} {'duration':>9}", file=file)
+        for name, threadName, start, duration in sections:
+            print(f"  {name:<36} {threadName:<16} {start:8.3f} {duration:9.3f}", file=file)
+        for name, offset in marks:
+            print(f"  {name:<36} {'':<16} {offset:8.3f}", file=file)
+
+# Shared by every module that takes part in startup
+startupProfiler = StartupProfiler()
@@ -0,0 +1,63 @@
+# tests/test_barnesHut.py
+
+import numpy as np
+import pytest
+
+from physics.barnesHut import Octree, concatenateRanges
+from physics.gravity import computeAccelerations
+
+G = 6.674e-11
+
+def _cluster(numBodies, seed=0):
+    # A clumpy distribution: a few Gaussian clusters of unequal masses
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform(-1.0e12, 1.0e12, (8, 3))
+    positions = centres[rng.integers(0, 8, numBodies)] + rng.normal(0.0, 1.0e11, (numBodies, 3))
+    masses = rng.uniform(1.0e22, 1.0e26, numBodies)
+    return positions, masses
+
+def _relativeErrors(approximate, exact):
+    return np.linalg.norm(approximate - exact, axis=1) / np.linalg.norm(exact, axis=1)
+
+@pytest.mark.parametrize("theta, medianTolerance, tailTolerance", [(0.3, 1e-3, 5e-3), (0.5, 5e-3, 2e-2), (0.8, 2e-2, 1e-1)])
+def test_treeMatchesDirectSum(theta, medianTolerance, tailTolerance):
+    positions, masses = _cluster(3000)
+    exact = computeAccelerations(positions, positions, masses, G)
+    approximate = Octree(positions, masses, leafSize=8).computeAccelerations(positions, G, theta)
+    errors = _relativeErrors(approximate, exact)
+    assert np.median(errors) < medianTolerance
+    assert np.percentile(errors, 99) < tailTolerance
+
+def test_smallerOpeningAngleIsMoreAccurate():
+    positions, masses = _cluster(2000, seed=4)
+    exact = computeAccelerations(positions, positions, masses, G)
+    tree = Octree(positions, masses)
+    medians = [np.median(_relativeErrors(tree.computeAccelerations(positions, G, theta), exact)) for theta in (0.8, 0.5, 0.3)]
+    assert medians[0] > medians[1] > medians[2]
+
+def test_smallOpeningAngleIsExact():
+    # theta -> 0 opens every node, leaving the direct sum
+    positions, masses = _cluster(500, seed=1)
+    exact = computeAccelerations(positions, positions, masses, G)
+    approximate = Octree(positions, masses, leafSize=4).computeAccelerations(positions, G, 1e-6)
+    np.testing.assert_allclose(approximate, exact, rtol=1e-10)
+
+def test_externalTargetsAndArrayRoundTrip():
+    positions, masses = _cluster(1000, seed=2)
+    targets = np.random.default_rng(3).uniform(-3.0e12, 3.0e12, (200, 3))
+    tree = Octree(positions, masses)
+    exact = computeAccelerations(targets, positions, masses, G)
+    errors = _relativeErrors(tree.computeAccelerations(targets, G, 0.5), exact)
+    assert np.median(errors) < 1e-2 and errors.max() < 5e-2
+    np.testing.assert_array_equal(Octree.fromArrays(tree.toArrays()).computeAccelerations(targets, G, 0.5),
+                                  tree.computeAccelerations(targets, G, 0.5))
+
+def test_coincidentBodies():
+    # Bodies at the same point (e.g. merged rows) must not divide by zero
+    positions = np.zeros((20, 3))
+    positions[10:] = 1.0e11
+    accelerations = Octree(positions, np.ones(20) * 1.0e24).computeAccelerations(positions, G, 0.5)
+    assert np.isfinite(accelerations).all()
+
+def test_concatenateRanges():
+    np.testing.assert_array_equal(concatenateRanges([5, 0, 9], [2, 0, 3]), [5, 6, 9, 10, 11])
@@ -0,0 +1,73 @@
+# tests/test_catalog.py
+
+import numpy as np
+import pytest
+
+import entities.catalog
+from config import BODY_CATALOG
+from entities.bodyStore import BodyStore, FLAG_LIGHT_SOURCE
+from entities.catalog import BodyCatalog, loadCatalog
+
+def test_bundledCatalogLoads():
+    catalog = loadCatalog(BODY_CATALOG)
+    assert catalog.names[0] == "Sun" and "Earth" in catalog.names and "Moon" in catalog.names
+    assert catalog.flags[0] & FLAG_LIGHT_SOURCE
+    assert (catalog.masses > 0.0).all() and (catalog.radii > 0.0).all()
+    assert len(catalog.ephemerisNames) == len(catalog.ephemerisIndex)
+    assert all(ring.bodyName in catalog.names for ring in catalog.rings)
+
+def test_explicitStatesAreRelativeToTheirParents():
+    catalog = BodyCatalog([
+        {"name": "Star", "mass": 2.0e30, "radius": 7.0e8, "position": [1.0, 2.0, 3.0], "velocity": [0.0, 0.0, 1.0]},
+        {"name": "Planet", "mass": 6.0e24, "radius": 6.4e6, "parent": "Star", "position": [1.5e11, 0.0, 0.0],
+         "velocity": [0.0, 3.0e4, 0.0]},
+        {"name": "Moon", "mass": 7.0e22, "radius": 1.7e6, "parent": "Planet", "position": [3.8e8, 0.0, 0.0],
+         "velocity": [0.0, 1.0e3, 0.0]},
+    ])
+    positions, velocities = catalog.initialStates(epoch=None) # No ephemeris bodies: the epoch is not used
+    np.testing.assert_array_equal(positions[2], [1.0 + 1.5e11 + 3.8e8, 2.0, 3.0])
+    np.testing.assert_array_equal(velocities[2], [0.0, 3.0e4 + 1.0e3, 1.0])
+
+def test_ephemerisBodiesAreLookedUpTogether(monkeypatch):
+    calls = []
+    def fakeBodyStates(names, epoch, ephemeris):
+        calls.append((list(names), epoch, ephemeris))
+        return np.arange(len(names) * 3, dtype=np.float64).reshape(-1, 3), np.ones((len(names), 3))
+    monkeypatch.setattr(entities.catalog, "getBodyStates", fakeBodyStates)
+
+    catalog = BodyCatalog([
+        {"name": "Sun", "mass": 2.0e30, "radius": 7.0e8, "lightSource": True},
+        {"name": "Earth", "mass": 6.0e24, "radius": 6.4e6, "texture": "earth.jpg"},
+        {"name": "Satellite", "mass": 1.0e3, "radius": 10.0, "parent": "Earth", "position": [7.0e6, 0.0, 0.0]},
+        {"name": "Barycentre", "mass": 1.0, "radius": 1.0, "ephemeris": "earth-moon-barycenter"},
+    ], ephemeris="de440")
+    store = BodyStore.fromCatalog(catalog, "epoch")
+    assert calls == [(["sun", "earth", "earth-moon-barycenter"], "epoch", "de440")]
+    np.testing.assert_array_equal(store.positions[[0, 1, 3]], [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0], [6.0, 7.0, 8.0]])
+    np.testing.assert_array_equal(store.positions[2], [3.0 + 7.0e6, 4.0, 5.0])
+    np.testing.assert_array_equal(store.velocities[2], [1.0, 1.0, 1.0])
+    assert store.texturePaths == [None, "earth.jpg", None, None]
+    assert list(store.flags) == [FLAG_LIGHT_SOURCE, 0, 0, 0]
+
+@pytest.mark.parametrize("entries, message", [
+    ([{"name": "A", "mass": 1.0}], "missing radius"),
+    ([{"name": "A", "mass": 1.0, "radius": 1.0}, {"name": "A", "mass": 1.0, "radius": 1.0}], "unique"),
+    ([{"name": "A", "mass": 1.0, "radius": 1.0, "parent": "B", "position": [0, 0, 0]},
+      {"name": "B", "mass": 1.0, "radius": 1.0}], "listed before"),
+    ([{"name": "A", "mass": 1.0, "radius": 1.0},
+      {"name": "B", "mass": 1.0, "radius": 1.0, "parent": "A"}], "no position/velocity"),
+])
+def test_invalidCatalogsAreRejected(entries, message):
+    with pytest.raises(ValueError, match=message):
+        BodyCatalog(entries)
+
+def test_ringOnUnknownBodyIsRejected():
+    with pytest.raises(ValueError, match="unknown body"):
+        BodyCatalog([{"name": "A", "mass": 1.0, "radius": 1.0}],
+                    rings=[{"body": "B", "innerRadius": 1.0, "outerRadius": 2.0}])
+
+def test_catalogWithoutBodiesIsRejected(tmp_path):
+    path = tmp_path / "empty.yaml"
+    path.write_text("ephemeris: de432s\nbodies: []\n")
+    with pytest.raises(ValueError, match="no bodies"):
+        loadCatalog(str(path))
@@ -0,0 +1,99 @@
+# tests/test_checkpoint.py
+
+import json
+
+import numpy as np
+import pytest
+
+from config import GRAVITATIONAL_CONSTANT
+from entities.bodyStore import BodyStore, FLAG_MERGED
+from physics.checkpoint import CheckpointWriter, PeriodicCheckpointer, loadCheckpoint, saveCheckpoint
+from physics.integrators import BlockTimestepIntegrator
+from physics.nBodySimulator import NBodySimulator
+
+AU = 1.495978707e11
+DAY = 86400.0
+
+def _simulator(integrator):
+    # Sun, three planets (one merged away) and a few test particles
+    masses = np.array([1.989e30, 5.972e24, 6.39e23, 1.898e27])
+    radii = np.array([7.0e8, 6.4e6, 3.4e6, 7.0e7])
+    distances = np.array([0.0, 1.0, 1.52, 5.2]) * AU
+    positions = np.zeros((4, 3))
+    positions[:, 0] = distances
+    velocities = np.zeros((4, 3))
+    velocities[1:, 1] = np.sqrt(GRAVITATIONAL_CONSTANT * masses[0] / distances[1:])
+    flags = np.zeros(4, dtype=np.uint32)
+    store = BodyStore(["Sun", "Earth", "Mars", "Jupiter"], masses, radii, positions, velocities,
+                      ["sun.jpg", "earth.jpg", None, "jupiter.jpg"], flags)
+    simulator = NBodySimulator(store, DAY, integrator=integrator)
+    rng = np.random.default_rng(0)
+    angles = rng.uniform(0.0, 2.0 * np.pi, 16)
+    radiiOfOrbits = rng.uniform(2.2, 3.2, 16) * AU
+    speeds = np.sqrt(GRAVITATIONAL_CONSTANT * masses[0] / radiiOfOrbits)
+    simulator.addTestParticles(np.stack([radiiOfOrbits * np.cos(angles), radiiOfOrbits * np.sin(angles), np.zeros(16)], axis=1),
+                               np.stack([-speeds * np.sin(angles), speeds * np.cos(angles), np.zeros(16)], axis=1))
+    return simulator
+
+def _run(simulator, steps):
+    for _ in range(steps):
+        simulator.update()
+
+def _assertSameState(first, second):
+    assert first.time == second.time
+    for field in ("positions", "velocities", "masses", "particle_positions", "particle_velocities"):
+        np.testing.assert_array_equal(getattr(first, field), getattr(second, field))
+    np.testing.assert_array_equal(first.store.flags, second.store.flags)
+
+@pytest.mark.parametrize("integrator", ["leapfrog", "yoshida4", "wisdom-holman", BlockTimestepIntegrator(eta=0.01, maxLevel=4)])
+def test_reloadContinuesBitForBit(tmp_path, integrator):
+    original = _simulator(integrator)
+    _run(original, 20)
+    path = tmp_path / "state.npz"
+    saveCheckpoint(original, str(path), extra={"epoch": "2000-01-01T12:00:00"})
+
+    restored, extra = loadCheckpoint(str(path), workers=0)
+    assert extra == {"epoch": "2000-01-01T12:00:00"}
+    assert restored.integrator.name == original.integrator.name
+    assert restored.integrator.settings() == original.integrator.settings()
+    assert restored.store.names == original.store.names and restored.store.texturePaths == original.store.texturePaths
+    _run(original, 30)
+    _run(restored, 30)
+    _assertSameState(original, restored)
+
+def test_mergedBodiesSurviveReload(tmp_path):
+    original = _simulator("leapfrog")
+    original.store.flags[2] |= FLAG_MERGED
+    original.store.masses[2] = 0.0
+    original.massesChanged()
+    path = tmp_path / "merged.npz"
+    saveCheckpoint(original, str(path))
+    restored, _ = loadCheckpoint(str(path), workers=0)
+    _run(original, 10)
+    _run(restored, 10)
+    _assertSameState(original, restored)
+
+def test_unsupportedVersionIsRejected(tmp_path):
+    path = tmp_path / "old.npz"
+    saveCheckpoint(_simulator("leapfrog"), str(path))
+    with np.load(str(path)) as archive:
+        arrays = dict(archive)
+    metadata = json.loads(arrays["metadata"].tobytes().decode("utf-8"))
+    metadata["version"] = 0
+    arrays["metadata"] = np.frombuffer(json.dumps(metadata).encode("utf-8"), dtype=np.uint8)
+    np.savez(str(path), **arrays)
+    with pytest.raises(ValueError):
+        loadCheckpoint(str(path), workers=0)
+
+def test_periodicCheckpointsInBackground(tmp_path):
+    simulator = _simulator("leapfrog")
+    path = tmp_path / "periodic.npz"
+    writer = CheckpointWriter(str(path))
+    checkpointer = PeriodicCheckpointer(simulator, writer, everySteps=5)
+    for _ in range(12):
+        simulator.update()
+        checkpointer.append(simulator.time, simulator.positions)
+    writer.close()
+    assert 1 <= writer.checkpointsWritten <= 2
+    restored, _ = loadCheckpoint(str(path), workers=0)
+    assert restored.time == 10 * DAY # The latest checkpoint, taken after step 10
@@ -0,0 +1,68 @@
+# tests/test_encounters.py
+
+import numpy as np
+
+from entities.bodyStore import BodyStore, FLAG_MERGED
+from physics.encounters import APPROACH, IMPACT, EncounterMonitor, _crossOverlaps, _selfOverlaps
+from physics.nBodySimulator import NBodySimulator
+
+AU = 1.495978707e11
+
+def _simulator(separation, secondVelocity=(0.0, 29780.0, 0.0)):
+    # The Sun and two planets on the same orbit, `separation` meters apart
+    store = BodyStore(["Sun", "A", "B"], [1.989e30, 6.0e24, 6.0e23], [7.0e8, 6.4e6, 3.0e6],
+                      [[0.0, 0.0, 0.0], [AU, 0.0, 0.0], [AU + separation, 0.0, 0.0]],
+                      [[0.0, 0.0, 0.0], [0.0, 29780.0, 0.0], secondVelocity])
+    return NBodySimulator(store, 60.0)
+
+def test_sweepAndPruneMatchesBruteForce():
+    rng = np.random.default_rng(0)
+    lower = rng.uniform(0.0, 100.0, 300)
+    upper = lower + rng.uniform(0.0, 5.0, 300)
+    first, second = _selfOverlaps(lower, upper)
+    found = {(min(i, j), max(i, j)) for i, j in zip(first.tolist(), second.tolist())}
+    i, j = np.triu_indices(300, k=1)
+    overlapping = (lower[i] <= upper[j]) & (lower[j] <= upper[i])
+    assert found == set(zip(i[overlapping].tolist(), j[overlapping].tolist()))
+    assert len(found) == len(first) # No pair twice
+
+    otherLower = rng.uniform(0.0, 100.0, 200)
+    otherUpper = otherLower + rng.uniform(0.0, 5.0, 200)
+    a, b = _crossOverlaps(lower, upper, otherLower, otherUpper)
+    overlapping = (lower[:, np.newaxis] <= otherUpper) & (otherLower <= upper[:, np.newaxis])
+    assert set(zip(a.tolist(), b.tolist())) == set(zip(*np.nonzero(overlapping)))
+    assert len(a) == overlapping.sum()
+
+def test_approachIsLoggedOnce():
+    monitor = EncounterMonitor(_simulator(5.0e7)) # Within 10x the contact distance, not touching
+    for _ in range(5):
+        monitor.simulator.update()
+        monitor.append(monitor.simulator.time)
+    assert [event.kind for event in monitor.events] == [APPROACH]
+
+def test_impactWithoutMergeIsLoggedOnce():
+    monitor = EncounterMonitor(_simulator(5.0e6))
+    for _ in range(5):
+        monitor.simulator.update()
+        monitor.append(monitor.simulator.time)
+    assert [event.kind for event in monitor.events] == [IMPACT]
+    assert not monitor.events[0].merged
+
+def test_mergeConservesMassAndMomentum():
+    simulator = _simulator(5.0e6, secondVelocity=(0.0, 25000.0, 1000.0))
+    masses = simulator.masses.copy()
+    momentum = (simulator.masses[:, np.newaxis] * simulator.velocities).sum(axis=0)
+    monitor = EncounterMonitor(simulator, mergeOnImpact=True)
+    monitor.check()
+    assert [event.kind for event in monitor.events] == [IMPACT] and monitor.events[0].merged
+    assert simulator.store.flags[2] & FLAG_MERGED
+    assert simulator.masses[2] == 0.0 and simulator.masses[1] == masses[1] + masses[2]
+    np.testing.assert_allclose((simulator.masses[:, np.newaxis] * simulator.velocities).sum(axis=0), momentum, rtol=1e-12)
+
+def test_particleImpactRemovesParticle():
+    simulator = _simulator(1.0e9)
+    simulator.addTestParticles([[AU + 1.0e6, 0.0, 0.0], [2.0 * AU, 0.0, 0.0]], [[0.0, 29780.0, 0.0], [0.0, 21000.0, 0.0]])
+    monitor = EncounterMonitor(simulator, mergeOnImpact=True)
+    monitor.check()
+    assert [(event.kind, event.first, event.second) for event in monitor.events] == [(IMPACT, "particle 0", "A")]
+    assert len(simulator.particle_positions) == 1
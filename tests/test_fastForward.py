@@ -0,0 +1,50 @@
+# tests/test_fastForward.py
+
+import numpy as np
+
+from entities.bodyStore import BodyStore, FLAG_MERGED
+from physics.encounters import EncounterMonitor
+from physics.fastForward import fastForward, predictOrbits
+from physics.kepler import keplerDrift
+from physics.nBodySimulator import NBodySimulator
+
+AU = 1.495978707e11
+YEAR = 365.25 * 86400.0
+
+def _mergedSimulator():
+    # Sun and two touching planets on the same orbit, merged by one encounter check
+    store = BodyStore(["Sun", "A", "B"], [1.989e30, 6.0e24, 6.0e23], [7.0e8, 6.4e6, 3.0e6],
+                      [[0.0, 0.0, 0.0], [AU, 0.0, 0.0], [AU + 5.0e6, 0.0, 0.0]],
+                      [[0.0, 0.0, 0.0], [0.0, 29780.0, 0.0], [0.0, 29780.0, 0.0]])
+    simulator = NBodySimulator(store, 3600.0)
+    EncounterMonitor(simulator, mergeOnImpact=True).check()
+    assert store.flags[2] & FLAG_MERGED
+    return simulator
+
+def test_fastForwardAfterMerge():
+    simulator = _mergedSimulator()
+    fastForward(simulator, 3.0 * YEAR)
+    assert np.isfinite(simulator.positions).all()
+    assert np.isfinite(simulator.velocities).all()
+    # The absorbed row still rides with the survivor, which stays on its orbit
+    np.testing.assert_array_equal(simulator.positions[2], simulator.positions[1])
+    np.testing.assert_array_equal(simulator.velocities[2], simulator.velocities[1])
+    assert abs(np.linalg.norm(simulator.positions[1]) / AU - 1.0) < 0.01
+
+    # And the N-body integrator carries on from there
+    simulator.update()
+    assert np.isfinite(simulator.positions).all()
+
+def test_predictOrbitsAfterMerge():
+    simulator = _mergedSimulator()
+    orbits = predictOrbits(simulator.positions, simulator.velocities, simulator.masses, 16, 2.0 * YEAR)
+    assert np.isfinite(orbits).all()
+    np.testing.assert_array_equal(orbits[2], orbits[1])
+
+def test_keplerDriftAtZeroSeparation():
+    positions = np.array([[0.0, 0.0, 0.0], [AU, 0.0, 0.0]])
+    velocities = np.array([[1.0, 2.0, 3.0], [0.0, 29780.0, 0.0]])
+    newPositions, newVelocities = keplerDrift(positions, velocities, 1.327e20, 10.0)
+    np.testing.assert_array_equal(newPositions[0], [10.0, 20.0, 30.0])
+    np.testing.assert_array_equal(newVelocities[0], velocities[0])
+    assert np.isfinite(newPositions).all() and np.isfinite(newVelocities).all()
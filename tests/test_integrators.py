@@ -0,0 +1,77 @@
+# tests/test_integrators.py
+
+import numpy as np
+import pytest
+
+from config import GRAVITATIONAL_CONSTANT
+from entities.bodyStore import BodyStore
+from physics.integrators import INTEGRATORS, BlockTimestepIntegrator, getIntegrator
+from physics.nBodySimulator import NBodySimulator
+
+AU = 1.495978707e11
+DAY = 86400.0
+YEAR = 365.25 * DAY
+
+def _planetarySystem():
+    # Sun, Earth with its Moon, and Jupiter on circular orbits, in the barycentric frame
+    masses = np.array([1.989e30, 5.972e24, 7.35e22, 1.898e27])
+    positions = np.zeros((4, 3))
+    positions[:, 0] = [0.0, AU, AU + 3.844e8, 5.2 * AU]
+    velocities = np.zeros((4, 3))
+    velocities[1, 1] = np.sqrt(GRAVITATIONAL_CONSTANT * masses[0] / AU)
+    velocities[2, 1] = velocities[1, 1] + np.sqrt(GRAVITATIONAL_CONSTANT * masses[1] / 3.844e8)
+    velocities[3, 1] = np.sqrt(GRAVITATIONAL_CONSTANT * masses[0] / (5.2 * AU))
+    positions -= (masses[:, np.newaxis] * positions).sum(axis=0) / masses.sum()
+    velocities -= (masses[:, np.newaxis] * velocities).sum(axis=0) / masses.sum()
+    return BodyStore(["Sun", "Earth", "Moon", "Jupiter"], masses, np.full(4, 1.0e6), positions, velocities)
+
+def _totalEnergy(simulator):
+    positions, velocities, masses = simulator.positions, simulator.velocities, simulator.masses
+    i, j = np.triu_indices(len(masses), k=1)
+    kinetic = 0.5 * np.sum(masses * np.einsum('ij,ij->i', velocities, velocities))
+    return kinetic - GRAVITATIONAL_CONSTANT * np.sum(masses[i] * masses[j] / np.linalg.norm(positions[i] - positions[j], axis=1))
+
+def _relativeEnergyError(integrator, dt, duration):
+    simulator = NBodySimulator(_planetarySystem(), dt, integrator=integrator)
+    initialEnergy = _totalEnergy(simulator)
+    for _ in range(round(duration / dt)):
+        simulator.update()
+    return abs((_totalEnergy(simulator) - initialEnergy) / initialEnergy)
+
+@pytest.mark.parametrize("name", list(INTEGRATORS))
+def test_energyErrorIsBounded(name):
+    assert _relativeEnergyError(name, DAY, YEAR) < 1e-9
+
+@pytest.mark.parametrize("name", ["yoshida4", "forest-ruth"])
+def test_fourthOrderConvergence(name):
+    # Four times the step: about 4^4 = 256 times the energy error for a fourth-order method
+    ratio = _relativeEnergyError(name, DAY, 0.5 * YEAR) / _relativeEnergyError(name, DAY / 4, 0.5 * YEAR)
+    assert ratio > 64.0
+
+def test_wisdomHolmanIsExactForTwoBodies():
+    masses = np.array([1.989e30, 5.972e24])
+    speed = np.sqrt(GRAVITATIONAL_CONSTANT * masses.sum() / AU)
+    store = BodyStore(["Sun", "Earth"], masses, [7.0e8, 6.4e6], [[0.0, 0.0, 0.0], [AU, 0.0, 0.0]],
+                      [[0.0, -speed * masses[1] / masses.sum(), 0.0], [0.0, speed * masses[0] / masses.sum(), 0.0]])
+    initialSeparation = store.positions[1] - store.positions[0]
+    period = 2.0 * np.pi * np.sqrt(AU ** 3 / (GRAVITATIONAL_CONSTANT * masses.sum()))
+    simulator = NBodySimulator(store, period / 10.0, integrator="wisdom-holman") # Steps far too long for leapfrog
+    for _ in range(5):
+        simulator.update()
+    np.testing.assert_allclose(simulator.positions[1] - simulator.positions[0], -initialSeparation, atol=1.0e-6 * AU)
+    for _ in range(5):
+        simulator.update()
+    np.testing.assert_allclose(simulator.positions[1] - simulator.positions[0], initialSeparation, atol=1.0e-6 * AU)
+
+def test_blockTimestepRefinesOnlyTheMoon():
+    integrator = BlockTimestepIntegrator()
+    simulator = NBodySimulator(_planetarySystem(), 4.0 * DAY, integrator=integrator)
+    bodyLevels, _ = integrator.assignLevels(simulator, simulator.time_step)
+    assert bodyLevels[2] > bodyLevels[3] # The Moon's tight orbit needs smaller steps than Jupiter
+    simulator.update()
+    assert integrator.lastForceEvaluations < 4 * (1 << int(bodyLevels.max()))
+
+def test_unknownIntegratorIsRejected():
+    with pytest.raises(ValueError):
+        getIntegrator("euler")
+    assert getIntegrator(INTEGRATORS["leapfrog"]) is INTEGRATORS["leapfrog"]
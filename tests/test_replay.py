@@ -0,0 +1,62 @@
+# tests/test_replay.py
+
+import numpy as np
+import pytest
+
+from physics.replay import TrajectoryReplay
+from physics.trajectoryIO import TrajectoryFile, TrajectoryRingBuffer, TrajectoryWriter
+
+def _linearMotion(times):
+    # Two bodies moving in straight lines, so interpolation between samples is exact
+    start = np.array([[0.0, 0.0, 0.0], [1.0e11, 0.0, 0.0]])
+    velocity = np.array([[1.0, 2.0, 3.0], [0.0, -3.0e4, 0.0]])
+    return start + velocity * np.asarray(times, dtype=np.float64).reshape(-1, 1, 1)
+
+def test_ringBufferKeepsTheNewestSamples():
+    buffer = TrajectoryRingBuffer(2, capacity=4)
+    times = np.arange(10) * 60.0
+    for time, positions in zip(times, _linearMotion(times)):
+        buffer.append(time, positions)
+    assert len(buffer) == 4
+    assert buffer.timeRange() == (360.0, 540.0)
+    np.testing.assert_array_equal(buffer.records()["time"], times[-4:])
+    np.testing.assert_allclose(buffer.positionsAt(400.0), _linearMotion([400.0])[0])
+    np.testing.assert_array_equal(buffer.positionsAt(0.0), _linearMotion([360.0])[0]) # Clamped to the range
+
+def test_emptyRingBuffer():
+    buffer = TrajectoryRingBuffer(2, capacity=4)
+    assert buffer.timeRange() is None
+    with pytest.raises(ValueError):
+        buffer.positionsAt(0.0)
+
+def test_trajectoryFileInterpolates(tmp_path):
+    times = np.array([0.0, 60.0, 180.0, 300.0])
+    path = tmp_path / "recording.traj"
+    with open(path, "wb") as stream:
+        writer = TrajectoryWriter(stream, 2, includeVelocities=False, metadata={"names": ["a", "b"]})
+        for time, positions in zip(times, _linearMotion(times)):
+            writer.append(time, positions)
+        writer.close()
+
+    recording = TrajectoryFile(str(path))
+    assert len(recording) == 4 and recording.timeRange() == (0.0, 300.0)
+    out = np.empty((2, 3))
+    for time in (0.0, 30.0, 60.0, 123.0, 299.0, 300.0):
+        assert recording.positionsAt(time, out=out) is out
+        np.testing.assert_allclose(out, _linearMotion([time])[0], rtol=1e-12)
+
+def test_replayPlayheadStaysInRange():
+    buffer = TrajectoryRingBuffer(2, capacity=16)
+    for time in np.arange(11) * 10.0:
+        buffer.append(time, _linearMotion([time])[0])
+    replay = TrajectoryReplay(buffer, speed=20.0)
+    assert replay.time == 0.0
+    replay.advance(2.0)
+    assert replay.time == 40.0
+    np.testing.assert_allclose(replay.positions(), _linearMotion([40.0])[0])
+    replay.seekFraction(-1.0)
+    assert replay.time == 0.0
+    replay.advance(100.0)
+    assert replay.time == 100.0 and not replay.playing # Stops at the end
+    replay.togglePlaying()
+    assert replay.playing
@@ -0,0 +1,77 @@
+# tests/test_trajectoryIO.py
+
+import io
+
+import numpy as np
+import pytest
+
+from physics.trajectoryIO import TrajectoryWriter, decodeHeader, encodeHeader, readTrajectory
+
+def _samples(numSamples, numBodies, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.uniform(1.0, 100.0, numSamples))
+    return times, rng.normal(0.0, 1.0e11, (numSamples, numBodies, 3)), rng.normal(0.0, 3.0e4, (numSamples, numBodies, 3))
+
+def _write(path, times, positions, velocities=None, metadata=None, chunkSize=7):
+    with open(path, "wb") as stream:
+        writer = TrajectoryWriter(stream, positions.shape[1], includeVelocities=velocities is not None,
+                                  metadata=metadata, chunkSize=chunkSize)
+        for k, time in enumerate(times):
+            writer.append(time, positions[k], None if velocities is None else velocities[k])
+        writer.close()
+    return writer
+
+def test_roundTripWithVelocities(tmp_path):
+    times, positions, velocities = _samples(50, 9)
+    path = tmp_path / "run.traj"
+    metadata = {"names": [f"body {i}" for i in range(9)], "time_step": 60.0}
+    writer = _write(path, times, positions, velocities, metadata) # 50 samples in chunks of 7: a partial last chunk
+    assert writer.samplesWritten == 50
+
+    readMetadata, records = readTrajectory(str(path))
+    assert readMetadata == metadata
+    np.testing.assert_array_equal(records["time"], times)
+    np.testing.assert_array_equal(records["positions"], positions)
+    np.testing.assert_array_equal(records["velocities"], velocities)
+
+def test_roundTripWithoutVelocities(tmp_path):
+    times, positions, _ = _samples(10, 3)
+    path = tmp_path / "positions.traj"
+    _write(path, times, positions)
+    _, records = readTrajectory(str(path))
+    assert "velocities" not in records.dtype.names
+    np.testing.assert_array_equal(records["positions"], positions)
+
+def test_partialTrailingRecordIsIgnored(tmp_path):
+    times, positions, velocities = _samples(5, 4)
+    path = tmp_path / "interrupted.traj"
+    _write(path, times, positions, velocities)
+    with open(path, "ab") as stream:
+        stream.write(b"\0" * 20) # An interrupted write of a sixth record
+    _, records = readTrajectory(str(path))
+    assert len(records) == 5
+    np.testing.assert_array_equal(records["time"], times)
+
+def test_emptyTrajectory(tmp_path):
+    path = tmp_path / "empty.traj"
+    _write(path, [], np.zeros((0, 2, 3)))
+    metadata, records = readTrajectory(str(path))
+    assert metadata == {} and len(records) == 0
+
+def test_headerIsAlignedAndValidated():
+    header = encodeHeader(3, includeVelocities=False, metadata={"note": "x" * 100})
+    assert len(header) % 64 == 0
+    assert decodeHeader(header) == (3, False, {"note": "x" * 100}, len(header))
+    with pytest.raises(ValueError):
+        decodeHeader(b"NOTATRAJ" + header[8:])
+
+def test_writesToAnyBinaryStream():
+    times, positions, velocities = _samples(3, 2)
+    stream = io.BytesIO()
+    writer = TrajectoryWriter(stream, 2)
+    for k in range(3):
+        writer.append(times[k], positions[k], velocities[k])
+    writer.close()
+    numBodies, includeVelocities, _, headerSize = decodeHeader(stream.getvalue())
+    assert (numBodies, includeVelocities) == (2, True)
+    assert len(stream.getvalue()) == headerSize + 3 * (8 + 2 * 2 * 3 * 8)